@@ -9,9 +9,30 @@ Free to use and modify. If you share it, mention the source. Thanks!
 
 import os
 import re
+import sys
+import csv
+import json
+import asyncio
 import time
+import select
+import signal
+import struct
+import argparse
 import datetime
+import itertools
+import fnmatch
+import functools
+import collections
+import zlib
+import array
+import bisect
+import sqlite3
+import threading
+import queue
 import ctypes
+import tempfile
+import zoneinfo
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from ctypes import wintypes
 
 # ===================================
@@ -24,7 +45,110 @@ class Config:
     BOX_WIDTH = 133
     MAX_FILENAME_LENGTH = 80
     LONG_FILENAME_MAX_LENGTH = 125
-    PROGRESS_SLEEP_TIME = 0.1
+    PROGRESS_REFRESH_RATE = 10  # Rafraîchissements maximum de la barre par seconde
+
+    # Affichage des résultats : encadrés écrits en blocs, résumé au-delà d'un certain nombre de fichiers
+    RENDER_CHUNK_SIZE = 65536               # Caractères envoyés au terminal par écriture
+    RESULTS_FULL_LIST_MAX = 500             # Au-delà : répartition par jour + premiers et derniers fichiers
+    RESULTS_TOP_N = 10                      # Premiers et derniers fichiers affichés dans le résumé
+    RESULTS_SUMMARY_ROWS = 31               # Lignes de répartition maximum (par jour, sinon par mois, sinon par année)
+    RESULTS_LISTING_FILENAME = 'auto_timestamp_resultats.txt'  # Liste complète écrite quand le résumé est affiché
+    
+    # Listes de résultats en colonnes ; au-delà de ce volume en mémoire, déversement dans un fichier temporaire
+    RESULTS_SPILL_BYTES = 256 * 2**20       # 0 = jamais
+    RESULTS_SPILL_DIR = None                # None = répertoire temporaire du système
+
+    # Parcours des répertoires
+    SCAN_MAX_DEPTH = None           # None = illimité, 0 = répertoire courant uniquement
+    SCAN_SYMLINK_POLICY = 'files'   # 'skip', 'files' (liens vers fichiers) ou 'follow'
+    SCAN_ORDER = 'name'             # 'name' (tri alphabétique) ou 'none' (ordre du disque)
+    
+    # Filtres du parcours (syntaxe fnmatch ; motif sans / : nom, avec / : chemin relatif à la racine parcourue).
+    # Un répertoire exclu n'est jamais ouvert, un nom exclu n'est ni lu (stat) ni analysé
+    SCAN_INCLUDE = ()               # Vide = tous les fichiers
+    SCAN_EXCLUDE = ('~$*', '.~lock.*#', 'Thumbs.db', '.DS_Store', 'desktop.ini', '@eaDir')
+    SCAN_INCLUDE_EXTENSIONS = ()    # Ex: ('jpg', 'mp4') ; extensions comparées sans tenir compte de la casse
+    SCAN_EXCLUDE_EXTENSIONS = ('part', 'crdownload', 'tmp')  # Téléchargements et fichiers temporaires
+    SCAN_MIN_SIZE = None            # Octets
+    SCAN_MAX_SIZE = None
+    SCAN_MIN_AGE = None             # Secondes depuis la dernière modification (ex: fichiers encore en cours d'écriture)
+    SCAN_MAX_AGE = None
+    
+    # Mode idempotent : ne pas réécrire un fichier dont les dates sont déjà correctes
+    SKIP_UNCHANGED = True
+    TIMESTAMP_TOLERANCE = 1.0  # Écart maximal accepté, en secondes
+    
+    # Fuseau horaire des dates lues dans les noms : None (heure locale du système), 'UTC', '+02:00' ou nom IANA ('Europe/Paris')
+    SOURCE_TIMEZONE = None
+    
+    # Motifs de date reconnus dans les noms de fichiers, par ordre de priorité (nom, expression régulière).
+    # Chaque motif doit commencer par un chiffre, au début d'une suite de chiffres. Groupes reconnus : Y m d (date), H M S (heure), f (fraction de seconde), epoch_ms (timestamp Unix en ms).
+    # Un motif date seule et un motif heure seule se combinent (dernière date + dernière heure trouvées).
+    FILENAME_PATTERNS = [
+        ('iso_separated', r'(?P<Y>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})[ _T.-](?P<H>\d{2})[-.:h](?P<M>\d{2})[-.:m](?P<S>\d{2})(?!\d)'),
+        ('date_time_millis', r'(?P<Y>\d{4})(?P<m>\d{2})(?P<d>\d{2})_(?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2})(?P<f>\d{3})(?!\d)'),
+        ('compact_t', r'(?P<Y>\d{4})(?P<m>\d{2})(?P<d>\d{2})T(?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2})(?!\d)'),
+        ('date_time', r'(?P<Y>\d{4})(?P<m>\d{2})(?P<d>\d{2})[_ .-](?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2})(?!\d)'),
+        ('compact', r'(?P<Y>\d{4})(?P<m>\d{2})(?P<d>\d{2})(?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2})(?!\d)'),
+        ('epoch_millis', r'(?P<epoch_ms>1\d{12})(?!\d)'),
+        ('date', r'(?P<Y>\d{4})(?P<m>\d{2})(?P<d>\d{2})(?!\d)'),
+        ('time', r'(?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2})(?!\d)'),
+    ]
+    
+    # Regroupement par radical normalisé (IMG_x.jpg, IMG_x.jpg.xmp, IMG_x_BURST002.jpg...) : un seul parsing par groupe,
+    # et une annexe sans date reçoit celle lue dans les en-têtes d'un autre membre du groupe (même répertoire)
+    GROUP_BY_STEM = True
+    PARSE_MEMO_SIZE = 65536         # Radicaux mémorisés (éviction LRU)
+    # Seules ces extensions sont retirées du nom pour former le radical (sans tenir compte de la casse) : les annexes
+    # (autant que présentes, IMG_x.jpg.supplemental-metadata.json), puis une seule extension de média.
+    # Un autre point du nom (report.final.pdf, Invoice.March.pdf) fait partie du radical.
+    GROUP_SIDECAR_SUFFIXES = ('xmp', 'json', 'supplemental-metadata', 'aae', 'thm', 'dop', 'pp3')
+    GROUP_MEDIA_EXTENSIONS = ('jpg', 'jpeg', 'jpe', 'heic', 'heif', 'hif', 'png', 'gif', 'webp', 'tif', 'tiff',
+                              'dng', 'raw', 'cr2', 'cr3', 'nef', 'nrw', 'arw', 'orf', 'rw2', 'raf', 'pef', 'srw',
+                              'mp4', 'mov', 'm4v', '3gp', '3g2', 'avi', 'mkv', 'mts', 'm2ts', 'insv', 'insp', 'lrv')
+    GROUP_MAX_DEFERRED = 100_000    # Annexes sans date mises de côté au plus (au-delà, traitées sans attendre leur groupe)
+    
+    # Repli sur les métadonnées du fichier (EXIF, atome mvhd) quand le nom ne contient aucune date
+    METADATA_FALLBACK = True
+    METADATA_EXTENSIONS = ('.jpg', '.jpeg', '.jpe', '.heic', '.heif', '.hif', '.mp4', '.mov', '.m4v', '.3gp', '.3g2')
+    METADATA_MAX_BYTES = 262144     # Octets lus au plus par fichier (en-têtes uniquement)
+    
+    # Cache incrémental : fichiers inchangés depuis la dernière exécution ignorés sans parsing ni écriture
+    CACHE_ENABLED = True
+    CACHE_FILENAME = '.auto_timestamp.cache'
+    CACHE_MAX_ENTRIES = 2_000_000    # Au-delà, les entrées les moins récemment vues sont évincées
+    CACHE_COMMIT_INTERVAL = 5000     # Écritures regroupées par lots
+    CACHE_VERSION = 2                # À incrémenter si la logique d'extraction change (invalide le cache)
+    
+    # Journal d'annulation : dates d'origine enregistrées avant chaque écriture, validées par groupes (un fsync par groupe)
+    JOURNAL_ENABLED = True
+    JOURNAL_FILENAME = '.auto_timestamp.journal'
+    JOURNAL_COMMIT_RECORDS = 1000    # Lignes par groupe au plus
+    JOURNAL_COMMIT_INTERVAL = 0.2    # Secondes au plus entre deux validations
+    
+    # Application parallèle des timestamps (utile sur NFS/SMB où chaque os.utime est un aller-retour réseau)
+    APPLY_WORKERS = 8                   # 1 = traitement séquentiel
+    APPLY_MAX_IN_FLIGHT_PER_WORKER = 4  # Taille de la file d'attente bornée, par thread
+    
+    # Mode manuel : liste paginée, filtrable par sous-chaîne
+    MANUAL_PAGE_SIZE = 20
+    
+    # Mode manuel : règles d'attribution en lot (=i, =d, =g), aperçu puis application groupée
+    MANUAL_RULE_PREVIEW_MAX = 40        # Lignes de l'aperçu au plus (les suivantes sont résumées)
+    MANUAL_RULE_TIME = (12, 0)          # Heure donnée à une date seule lue dans un nom de répertoire
+    
+    # API asyncio : appels bloquants (stat, os.utime) simultanés au plus, exécutés hors de la boucle d'événements
+    ASYNC_CONCURRENCY = 16
+    
+    # Mode multi-processus : un répertoire au-delà de ce nombre de fichiers est découpé par hachage des noms
+    SHARD_SPLIT_THRESHOLD = 20_000
+    SHARD_THREADS_PER_PROCESS = 2
+    
+    # Mode surveillance (--watch) : fichiers arrivés traités par petits lots une fois stabilisés
+    WATCH_DEBOUNCE = 0.5            # Secondes sans nouvel événement sur un fichier avant de le traiter
+    WATCH_BATCH_SIZE = 256          # Fichiers traités par lot
+    WATCH_MAX_PENDING = 50_000      # Au-delà, les fichiers les plus anciens sont traités sans attendre
+    WATCH_POLL_INTERVAL = 2.0       # Période de scrutation du mode de repli (sans inotify)
     
     # Codes couleurs ANSI
     COLORS = {
@@ -55,96 +179,1376 @@ class Config:
         "  ██      ██ ██   ██ ██   ████  ██████  ██   ██ ███████     ██    ██ ██      ██ ███████ ███████    ██    ██   ██ ██      ██ ██     "
     ]
 
+class FileStatus:
+    """Statuts possibles d'un fichier après traitement automatique"""
+    CHANGED = 'changed'    # Dates modifiées
+    MATCHED = 'matched'    # Dates déjà correctes, aucune écriture
+    CACHED = 'cached'      # Fichier inchangé depuis la dernière exécution (cache incrémental)
+    FAILED = 'failed'      # Date trouvée mais écriture impossible
+    NO_DATE = 'no_date'    # Aucune date exploitable dans le nom
+    
+    PENDING = 'pending'    # Date trouvée, écriture non effectuée (simulation --dry-run ou plan)
+    STALE = 'stale'        # Fichier modifié depuis la création du plan, non appliqué
+    
+    PROCESSED = (CHANGED, MATCHED, CACHED, PENDING)
+
+class DateSource:
+    """Origine de la date appliquée à un fichier"""
+    FILENAME = 'filename'      # Motif reconnu dans le nom
+    EXIF = 'exif'              # DateTimeOriginal des métadonnées EXIF (JPEG, HEIC)
+    QUICKTIME = 'quicktime'    # Date de création de l'atome mvhd (MP4, MOV)
+    CACHE = 'cache'            # Date appliquée lors d'une exécution précédente (cache incrémental)
+    PLAN = 'plan'              # Date lue dans un fichier de plan
+    MANUAL = 'manual'          # Date saisie en mode manuel
+    RULE = 'rule'              # Date attribuée en lot par une règle du mode manuel (interpolation, répertoire, motif)
+    GROUP = 'group'            # Date lue dans les en-têtes d'un autre fichier du même groupe (annexe .xmp, .json...)
+    JOURNAL = 'journal'        # Date d'origine rétablie depuis le journal d'annulation
+    
+    METADATA = (EXIF, QUICKTIME)
+
+class ExitCode:
+    """Codes de sortie du mode batch"""
+    SUCCESS = 0        # Tous les fichiers ont une date appliquée (ou déjà correcte)
+    UNPROCESSED = 1    # Certains fichiers n'ont pas de date exploitable
+    USAGE = 2          # Arguments invalides (argparse)
+    FAILED = 3         # Au moins une écriture a échoué ou un chemin est introuvable
+    NO_FILES = 4       # Aucun fichier trouvé
+
 # ===================================
 # SECTION 2: SYSTÈME & UTILITAIRES DE BASE
 # ===================================
 
-class SystemUtils:
-    """Utilitaires système de bas niveau"""
+class PosixBackend:
+    """Opérations dépendantes du système pour Linux / macOS : console ANSI, dates d'accès et de modification uniquement"""
+    
+    # st_ctime est la date de changement d'inode : elle n'est ni comparée ni modifiable
+    SETS_CREATION_TIME = False
+    CLEAR_SEQUENCE = "\033[H\033[2J\033[3J"  # Curseur en haut à gauche, écran et historique effacés
+    
+    @staticmethod
+    def prepare_console():
+        """Prépare la console au démarrage du mode interactif (rien à faire : les séquences ANSI sont natives)"""
     
     @staticmethod
     def clear_screen():
-        """Efface l'écran de la console"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """Efface l'écran par séquence ANSI, sans lancer de processus"""
+        sys.stdout.write(PosixBackend.CLEAR_SEQUENCE)
+        sys.stdout.flush()
     
     @staticmethod
-    def maximize_cmd():
+    def maximize_window():
+        """Aucun équivalent portable à Alt+Entrée dans un terminal : la taille de la fenêtre est laissée telle quelle"""
+    
+    @staticmethod
+    def set_file_times(filename, timestamp_ns, dir_fd=None, follow_symlinks=True):
+        """Change les dates d'accès et de modification (filename relatif à dir_fd si fourni)"""
+        try:
+            if dir_fd is None and follow_symlinks:
+                os.utime(filename, ns=(timestamp_ns, timestamp_ns))
+            else:
+                os.utime(filename, ns=(timestamp_ns, timestamp_ns), dir_fd=dir_fd, follow_symlinks=follow_symlinks)
+        except OSError:
+            # Fichier supprimé ou renommé entre le parcours et l'écriture, ou droits insuffisants
+            return False
+        return True
+
+class WindowsBackend:
+    """Opérations dépendantes du système pour Windows : console CMD, date de création modifiée par SetFileTime"""
+    
+    SETS_CREATION_TIME = True
+    FILETIME_EPOCH = 116444736000000000  # 1601-01-01 -> 1970-01-01, en intervalles de 100 ns
+    ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+    _ansi_console = False
+    
+    @staticmethod
+    def prepare_console():
+        """Active une seule fois le traitement des séquences ANSI de la console (couleurs, effacement)"""
+        try:
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+            mode = wintypes.DWORD()
+            if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+                WindowsBackend._ansi_console = bool(
+                    kernel32.SetConsoleMode(handle, mode.value | WindowsBackend.ENABLE_VIRTUAL_TERMINAL_PROCESSING))
+        except (AttributeError, OSError):
+            WindowsBackend._ansi_console = False
+    
+    @staticmethod
+    def clear_screen():
+        """Efface l'écran par séquence ANSI, ou par cls sur les anciennes consoles sans support ANSI"""
+        if WindowsBackend._ansi_console:
+            PosixBackend.clear_screen()
+        else:
+            os.system('cls')
+    
+    @staticmethod
+    def maximize_window():
         """Simule la pression de la touche Alt+Enter pour maximiser la fenêtre CMD"""
         ctypes.windll.user32.keybd_event(0x12, 0, 0, 0)  # Press ALT
         ctypes.windll.user32.keybd_event(0x0D, 0, 0, 0)  # Press Enter
         ctypes.windll.user32.keybd_event(0x12, 0, 2, 0)  # Relâche ALT
         ctypes.windll.user32.keybd_event(0x0D, 0, 2, 0)  # Relâche Enter
+    
+    @staticmethod
+    def set_file_times(filename, timestamp_ns, dir_fd=None, follow_symlinks=True):
+        """Change les dates de création, modification, et accès (pas de dir_fd sous Windows : filename est un chemin)"""
+        try:
+            os.utime(filename, ns=(timestamp_ns, timestamp_ns))
+        except OSError:
+            return False
+        
+        try:
+            timestamp_100ns = timestamp_ns // 100 + WindowsBackend.FILETIME_EPOCH
+            ctime = wintypes.FILETIME(timestamp_100ns & 0xFFFFFFFF, timestamp_100ns >> 32)
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.CreateFileW(filename, 256, 0, None, 3, 128, None)
+            
+            if handle != -1:
+                kernel32.SetFileTime(handle, ctypes.byref(ctime), ctypes.byref(ctime), ctypes.byref(ctime))
+                kernel32.CloseHandle(handle)
+                return True
+            else:
+                return False
+        except Exception:
+            return False
+
+class SystemUtils:
+    """Utilitaires système de bas niveau, délégués au backend de la plateforme choisi une fois au chargement"""
+    
+    backend = WindowsBackend if os.name == 'nt' else PosixBackend
+    
+    @staticmethod
+    def clear_screen():
+        """Efface l'écran de la console"""
+        SystemUtils.backend.clear_screen()
+    
+    @staticmethod
+    def maximize_cmd():
+        """Maximise la fenêtre de la console (Alt+Entrée sous Windows, sans effet ailleurs)"""
+        SystemUtils.backend.maximize_window()
+
+class TimestampConverter:
+    """Conversion entre les dates des noms (heure murale du fuseau source) et les timestamps POSIX en nanosecondes
+    
+    Les décalages UTC du fuseau sont calculés une fois par année et gardés en table de transitions :
+    chaque conversion se réduit ensuite à de l'arithmétique entière et une recherche dichotomique.
+    Heure ambiguë (retour à l'heure d'hiver) : première occurrence, seconde si fold=1.
+    Heure inexistante (passage à l'heure d'été) : avancée de la durée du saut, comme datetime.
+    """
+    
+    EPOCH = datetime.datetime(1970, 1, 1)
+    EPOCH_ORDINAL = EPOCH.toordinal()
+    SCAN_STEP = 3 * 3600  # Pas de recherche des transitions, en secondes (deux transitions plus proches seraient fusionnées)
+    
+    def __init__(self, timezone=None):
+        self.timezone = timezone
+        self.name, self._offset_at = self._resolve(timezone)
+        self._tables = {}
+    
+    @staticmethod
+    def _resolve(timezone):
+        """Retourne (nom, fonction instant UTC en secondes -> décalage UTC en secondes) pour un fuseau"""
+        if timezone in (None, '', 'local'):
+            # Le nom inclut le fuseau du système : un cache créé sous un autre fuseau est invalidé
+            return f"local:{'/'.join(time.tzname)}", lambda seconds: time.localtime(seconds).tm_gmtoff
+        if timezone.upper() in ('UTC', 'Z'):
+            return 'UTC', lambda seconds: 0
+        
+        match = re.fullmatch(r'([+-])(\d{2}):?(\d{2})', timezone)
+        if match:
+            offset = (int(match[2]) * 3600 + int(match[3]) * 60) * (1 if match[1] == '+' else -1)
+            return timezone, lambda seconds: offset
+        
+        try:
+            zone = zoneinfo.ZoneInfo(timezone)
+        except (ValueError, zoneinfo.ZoneInfoNotFoundError):
+            raise ValueError(f"Fuseau horaire inconnu : {timezone}") from None
+        return timezone, lambda seconds: int(datetime.datetime.fromtimestamp(seconds, zone).utcoffset().total_seconds())
+    
+    def _offset(self, seconds):
+        """Décalage UTC à un instant donné (celui de l'epoch hors de la plage gérée par la plateforme)"""
+        try:
+            return self._offset_at(seconds)
+        except (OverflowError, OSError, ValueError):
+            return self._offset_at(0)
+    
+    def _table(self, year):
+        """Table des transitions de l'année : (instants UTC, heures murales fold=0, heures murales fold=1, décalages)"""
+        table = self._tables.get(year)
+        if table is None:
+            table = self._tables[year] = self._build_table(year)
+        return table
+    
+    def _build_table(self, year):
+        # Deux jours de marge : une heure murale de l'année peut tomber en UTC sur l'année voisine
+        start = (datetime.date(year, 1, 1).toordinal() - self.EPOCH_ORDINAL - 2) * 86400
+        end = (datetime.date(year, 12, 31).toordinal() - self.EPOCH_ORDINAL + 3) * 86400
+        transitions, walls_fold0, walls_fold1 = [], [], []
+        previous = self._offset(start)
+        offsets = [previous]
+        
+        for seconds in range(start + self.SCAN_STEP, end + self.SCAN_STEP, self.SCAN_STEP):
+            current = self._offset(seconds)
+            if current == previous:
+                continue
+            # Recherche dichotomique de la seconde exacte de la transition
+            low, high = seconds - self.SCAN_STEP, seconds
+            while high - low > 1:
+                middle = (low + high) // 2
+                if self._offset(middle) == previous:
+                    low = middle
+                else:
+                    high = middle
+            transitions.append(high)
+            # Les heures murales entre high + min et high + max sont inexistantes ou ambiguës : fold départage
+            walls_fold0.append(high + max(previous, current))
+            walls_fold1.append(high + min(previous, current))
+            offsets.append(current)
+            previous = current
+        return transitions, walls_fold0, walls_fold1, offsets
+    
+    def _wall_seconds(self, new_date):
+        """Heure murale en secondes depuis 1970-01-01 00:00, sans tenir compte du fuseau"""
+        return ((new_date.toordinal() - self.EPOCH_ORDINAL) * 86400
+                + new_date.hour * 3600 + new_date.minute * 60 + new_date.second)
+    
+    def to_ns(self, new_date):
+        """Timestamp POSIX en nanosecondes d'une date (du fuseau source si elle n'a pas de tzinfo)"""
+        wall = self._wall_seconds(new_date)
+        if new_date.tzinfo is None:
+            _, walls_fold0, walls_fold1, offsets = self._table(new_date.year)
+            offset = offsets[bisect.bisect_right(walls_fold1 if new_date.fold else walls_fold0, wall)]
+        else:
+            offset = new_date.utcoffset() // datetime.timedelta(seconds=1)
+        return (wall - offset) * 1_000_000_000 + new_date.microsecond * 1000
+    
+    def from_ns(self, timestamp_ns):
+        """Date sans tzinfo (heure murale du fuseau source) d'un timestamp POSIX en nanosecondes"""
+        seconds, remainder = divmod(timestamp_ns, 1_000_000_000)
+        utc = self.EPOCH + datetime.timedelta(seconds=seconds, microseconds=remainder // 1000)
+        transitions, _, _, offsets = self._table(utc.year)
+        index = bisect.bisect_right(transitions, seconds)
+        local = utc + datetime.timedelta(seconds=offsets[index])
+        # Seconde occurrence d'une heure ambiguë : fold=1 pour que to_ns retrouve le même instant
+        if index and offsets[index] < offsets[index - 1] and seconds - transitions[index - 1] < offsets[index - 1] - offsets[index]:
+            local = local.replace(fold=1)
+        return local
+    
+    def to_aware(self, new_date):
+        """Date avec son décalage UTC explicite (ex: 2024-03-10T14:30:00+01:00)"""
+        timestamp_ns = self.to_ns(new_date)
+        local = self.from_ns(timestamp_ns)
+        offset = self._wall_seconds(local) - timestamp_ns // 1_000_000_000
+        return local.replace(tzinfo=datetime.timezone(datetime.timedelta(seconds=offset)), fold=0)
 
 class FileSystemUtils:
     """Utilitaires pour les opérations sur les fichiers"""
     
+    # Conversion date -> timestamp partagée (remplaçable, ex: option --timezone)
+    converter = TimestampConverter(Config.SOURCE_TIMEZONE)
+    
     @staticmethod
     def get_files_in_directory(directory_path):
         """Obtient la liste des fichiers dans le répertoire, excluant le script actuel"""
-        current_dir = directory_path
-        files = [f for f in os.listdir(current_dir) if os.path.isfile(os.path.join(current_dir, f))]
-        files = [f for f in files if f not in [os.path.basename(__file__)]]
-        return files
+        scanner = DirectoryScanner(directory_path, max_depth=0, excluded_paths=[__file__])
+        return [entry.name for entry in scanner.scan()]
+    
+    @staticmethod
+    def to_ns(new_date):
+        """Convertit une date (fuseau source) en timestamp POSIX en nanosecondes"""
+        return FileSystemUtils.converter.to_ns(new_date)
+    
+    @staticmethod
+    def to_timestamp(new_date):
+        """Convertit une date (fuseau source) en timestamp POSIX"""
+        return FileSystemUtils.to_ns(new_date) / 1_000_000_000
+    
+    @staticmethod
+    def timestamp_matches(stat_result, new_date, tolerance=None):
+        """Vérifie si les dates d'un stat correspondent déjà à new_date (à tolerance secondes près)"""
+        if tolerance is None:
+            tolerance = Config.TIMESTAMP_TOLERANCE
+        tolerance_ns = int(tolerance * 1_000_000_000)
+        timestamp_ns = FileSystemUtils.to_ns(new_date)
+        
+        if abs(stat_result.st_mtime_ns - timestamp_ns) > tolerance_ns or abs(stat_result.st_atime_ns - timestamp_ns) > tolerance_ns:
+            return False
+        # Sous Windows, st_ctime est la date de création, elle aussi modifiée par set_file_timestamp
+        if SystemUtils.backend.SETS_CREATION_TIME and abs(stat_result.st_ctime_ns - timestamp_ns) > tolerance_ns:
+            return False
+        return True
+    
+    @staticmethod
+    def set_file_timestamp(filename, new_date, dir_fd=None, follow_symlinks=True):
+        """Change les dates de création (Windows), modification, et accès (filename relatif à dir_fd si fourni)"""
+        # Dates en nanosecondes : les millisecondes du nom sont conservées
+        return SystemUtils.backend.set_file_times(filename, FileSystemUtils.to_ns(new_date), dir_fd, follow_symlinks)
+
+    @staticmethod
+    def set_entry_timestamp(entry, new_date):
+        """Change les dates d'un ScanEntry, relativement au descripteur de son répertoire quand il en a un"""
+        if entry.dir_handle is None:
+            return FileSystemUtils.set_file_timestamp(entry.path, new_date)
+        # Un lien symbolique n'est suivi que s'il l'était déjà au parcours (politique 'files' ou 'follow') :
+        # un fichier remplacé par un lien entre le parcours et l'écriture n'entraîne pas l'écriture sur sa cible
+        return FileSystemUtils.set_file_timestamp(entry.name, new_date, dir_fd=entry.dir_handle.fd,
+                                                  follow_symlinks=entry.is_symlink())
+
+class DirectoryHandle:
+    """Descripteur de répertoire ouvert, partagé par ses ScanEntry et fermé quand plus aucun ne le référence"""
+    
+    __slots__ = ('fd',)
+    
+    def __init__(self, fd):
+        self.fd = fd
+    
+    def close(self):
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = None
+    
+    def __del__(self):
+        self.close()
+
+class ScanEntry:
+    """Fichier trouvé par le scanner, avec son os.DirEntry en cache"""
+    
+    __slots__ = ('path', 'name', 'depth', 'dir_handle', '_entry')
+    
+    def __init__(self, path, name, depth, entry, dir_handle=None):
+        self.path = path
+        self.name = name
+        self.depth = depth
+        self.dir_handle = dir_handle
+        self._entry = entry
+    
+    def __fspath__(self):
+        return self.path
+    
+    def __str__(self):
+        return self.path
+    
+    def __repr__(self):
+        return f"ScanEntry({self.path!r})"
+    
+    def stat(self):
+        """Retourne le stat du fichier (mis en cache par os.DirEntry, sans appel système répété)"""
+        return self._entry.stat()
+    
+    def is_symlink(self):
+        """Indique si l'entrée est un lien symbolique (type en cache)"""
+        return self._entry.is_symlink()
+
+class ListedEntry:
+    """Substitut d'os.DirEntry pour un nom déjà listé par un autre processus (tranche d'un gros répertoire) :
+    stat relatif au descripteur du répertoire, type de lien relevé au moment du listage"""
+    
+    __slots__ = ('name', '_fd', '_symlink', '_stat')
+    
+    def __init__(self, name, fd, symlink):
+        self.name = name
+        self._fd = fd
+        self._symlink = symlink
+        self._stat = None
+    
+    def stat(self):
+        # Un lien n'est suivi que s'il en était déjà un au listage, comme le stat en cache d'os.DirEntry
+        if self._stat is None:
+            self._stat = os.stat(self.name, dir_fd=self._fd, follow_symlinks=self._symlink)
+        return self._stat
+    
+    def is_symlink(self):
+        return self._symlink
+
+class GlobSet:
+    """Ensemble de motifs fnmatch compilé une fois : motifs '*suffixe' testés par un seul str.endswith,
+    les autres (noms exacts compris) réunis dans une seule expression régulière, un groupe nommé par motif"""
+    
+    WILDCARDS = frozenset('*?[')
+    
+    def __init__(self, patterns, ignore_case=False):
+        self.patterns = list(patterns)
+        self.ignore_case = ignore_case
+        self._suffixes = {}   # Suffixe -> motif
+        self._others = []
+        for pattern in self.patterns:
+            if pattern.startswith('*') and not self.WILDCARDS.intersection(pattern[1:]):
+                self._suffixes[pattern[1:].lower() if ignore_case else pattern[1:]] = pattern
+            else:
+                self._others.append(pattern)
+        self._suffix_tuple = tuple(self._suffixes) or None
+        self._regex = None
+        if self._others:
+            # Les motifs commençant par un littéral échouent dès le premier caractère différent
+            alternatives = "|".join(f"(?P<rule{index}>{fnmatch.translate(pattern)})" for index, pattern in enumerate(self._others))
+            self._regex = re.compile(alternatives, re.IGNORECASE if ignore_case else 0)
+    
+    def __bool__(self):
+        return bool(self.patterns)
+    
+    def match(self, value):
+        """Retourne le motif correspondant à value, ou None"""
+        if self._suffix_tuple is not None and (value.lower() if self.ignore_case else value).endswith(self._suffix_tuple):
+            folded = value.lower() if self.ignore_case else value
+            return next(pattern for suffix, pattern in self._suffixes.items() if folded.endswith(suffix))
+        if self._regex is not None:
+            match = self._regex.match(value)
+            if match is not None:
+                # Le groupe d'un motif englobe ceux de fnmatch : il est le dernier fermé
+                return self._others[int(match.lastgroup[len('rule'):])]
+        return None
+
+class ScanFilter:
+    """Règles d'inclusion / exclusion du parcours, compilées une fois et appliquées dans DirectoryScanner
+    
+    Les motifs suivent la syntaxe fnmatch : sans séparateur, ils sont comparés au nom ; avec '/', au chemin
+    relatif à la racine du parcours. Les extensions (texte après le dernier point, sans tenir compte de la
+    casse) ne s'appliquent qu'aux fichiers. Un répertoire exclu n'est jamais ouvert. Les règles sur le nom
+    passent avant celles sur la taille et l'âge (date de modification), seules à lire le stat. Chaque fichier
+    ou répertoire écarté est compté dans skipped sous le libellé de la première règle qui l'écarte.
+    """
+    
+    def __init__(self, include=(), exclude=(), include_extensions=(), exclude_extensions=(),
+                 min_size=None, max_size=None, min_age=None, max_age=None, files=True):
+        # Spécification d'origine : transmise telle quelle aux processus du mode multi-processus
+        self.spec = {
+            'include': list(include), 'exclude': list(exclude),
+            'include_extensions': list(include_extensions), 'exclude_extensions': list(exclude_extensions),
+            'min_size': min_size, 'max_size': max_size, 'min_age': min_age, 'max_age': max_age,
+        }
+        # files=False : seuls les répertoires sont filtrés (surveillance : les fichiers le sont au moment du traitement)
+        self.files = files
+        self.skipped = collections.Counter()
+        
+        ignore_case = os.path.normcase('A') == 'a'
+        self._exclude_names = self._glob_set([p for p in exclude if '/' not in p], ignore_case)
+        self._exclude_paths = self._glob_set([p.replace('/', os.sep) for p in exclude if '/' in p], ignore_case)
+        self._include_names = self._glob_set([p for p in include if '/' not in p], ignore_case)
+        self._include_paths = self._glob_set([p.replace('/', os.sep) for p in include if '/' in p], ignore_case)
+        self._exclude_extensions = self._extension_set(exclude_extensions)
+        self._include_extensions = self._extension_set(include_extensions)
+        self._has_includes = bool(include or include_extensions)
+        self._size_range = (min_size, max_size) if min_size is not None or max_size is not None else None
+        self._age_range = (min_age, max_age) if min_age is not None or max_age is not None else None
+        self._needs_stat = self._size_range is not None or self._age_range is not None
+    
+    @classmethod
+    def from_config(cls, include=(), exclude=(), include_extensions=(), exclude_extensions=(), **limits):
+        """Règles de Config complétées par celles de la ligne de commande ; None si aucune règle n'est définie"""
+        spec = {
+            'include': list(Config.SCAN_INCLUDE) + list(include),
+            'exclude': list(Config.SCAN_EXCLUDE) + list(exclude),
+            'include_extensions': list(Config.SCAN_INCLUDE_EXTENSIONS) + list(include_extensions),
+            'exclude_extensions': list(Config.SCAN_EXCLUDE_EXTENSIONS) + list(exclude_extensions),
+            'min_size': Config.SCAN_MIN_SIZE, 'max_size': Config.SCAN_MAX_SIZE,
+            'min_age': Config.SCAN_MIN_AGE, 'max_age': Config.SCAN_MAX_AGE,
+        }
+        spec.update((key, value) for key, value in limits.items() if value is not None)
+        if not any(value is not None and value != [] for value in spec.values()):
+            return None
+        return cls(**spec)
+    
+    def directory_filter(self):
+        """Copie ne filtrant que les répertoires, avec ses propres compteurs"""
+        return ScanFilter(**self.spec, files=False)
+    
+    @staticmethod
+    def _glob_set(patterns, ignore_case):
+        return GlobSet(patterns, ignore_case) if patterns else None
+    
+    @staticmethod
+    def _extension_set(extensions):
+        normalized = frozenset(extension.lower().lstrip('.') for extension in extensions if extension.strip('.'))
+        return normalized or None
+    
+    @staticmethod
+    def _extension(name):
+        """Extension en minuscules, sans le point ('' pour un nom sans point ou caché sans extension)"""
+        dot = name.rfind('.')
+        return name[dot + 1:].lower() if dot > 0 else ''
+    
+    def _skip(self, rule):
+        self.skipped[rule] += 1
+        return False
+    
+    def accepts_dir(self, name, rel_prefix=''):
+        """Indique si un sous-répertoire doit être parcouru (rel_prefix : chemin relatif de son parent, avec séparateur final)"""
+        if self._exclude_names is not None:
+            pattern = self._exclude_names.match(name)
+            if pattern is not None:
+                return self._skip(f"exclude:{pattern}")
+        if self._exclude_paths is not None:
+            pattern = self._exclude_paths.match(rel_prefix + name)
+            if pattern is not None:
+                return self._skip(f"exclude:{pattern}")
+        return True
+    
+    def accepts_file(self, name, rel_prefix='', stat=None):
+        """Indique si un fichier doit être traité ; stat (sans argument) n'est appelé que pour les règles de taille et d'âge"""
+        if not self.files:
+            return True
+        if self._exclude_extensions is not None:
+            dot = name.rfind('.')
+            extension = name[dot + 1:].lower() if dot > 0 else ''
+            if extension in self._exclude_extensions:
+                return self._skip(f"exclude-ext:.{extension}")
+        if not self.accepts_dir(name, rel_prefix):
+            return False
+        if self._has_includes and not self._included(name, rel_prefix):
+            return self._skip("include")
+        if self._needs_stat and stat is not None:
+            rule = self._stat_rule(stat)
+            if rule is not None:
+                return self._skip(rule)
+        return True
+    
+    def _included(self, name, rel_prefix):
+        return ((self._include_extensions is not None and self._extension(name) in self._include_extensions)
+                or (self._include_names is not None and self._include_names.match(name) is not None)
+                or (self._include_paths is not None and self._include_paths.match(rel_prefix + name) is not None))
+    
+    def _stat_rule(self, stat):
+        """Règle de taille ou d'âge qui écarte le fichier, ou None"""
+        try:
+            stat_result = stat()
+        except OSError:
+            return None  # Erreur signalée par le traitement du fichier
+        if self._size_range is not None:
+            min_size, max_size = self._size_range
+            if min_size is not None and stat_result.st_size < min_size:
+                return "min-size"
+            if max_size is not None and stat_result.st_size > max_size:
+                return "max-size"
+        if self._age_range is not None:
+            min_age, max_age = self._age_range
+            age = time.time() - stat_result.st_mtime
+            if min_age is not None and age < min_age:
+                return "min-age"
+            if max_age is not None and age > max_age:
+                return "max-age"
+        return None
+    
+    def accepts_path(self, path, rel_path=None):
+        """Applique les règles à un chemin isolé (mode surveillance) ; rel_path : chemin relatif à la racine surveillée"""
+        rel_path = path if rel_path is None else rel_path
+        rel_prefix, _, name = rel_path.rpartition(os.sep)
+        return self.accepts_file(name, rel_prefix + os.sep if rel_prefix else '', functools.partial(os.stat, path))
+
+class DirectoryScanner:
+    """Parcours récursif et paresseux d'un répertoire basé sur os.scandir"""
+    
+    SYMLINK_POLICIES = ('skip', 'files', 'follow')
+    ORDERS = ('name', 'none')
+    # Parcours par descripteurs de répertoire (openat/fdopendir/utimensat) : chaque chemin n'est résolu
+    # qu'une fois par répertoire et non plus à chaque fichier. Indisponible sous Windows : parcours par chemins
+    USE_DIR_FD = (os.scandir in os.supports_fd and os.utime in os.supports_dir_fd
+                  and os.utime in os.supports_follow_symlinks and hasattr(os, 'O_DIRECTORY'))
+    
+    def __init__(self, root=os.curdir, max_depth=None, symlink_policy=None, order=None, excluded_paths=(), scan_filter=None):
+        self.root = root
+        self.max_depth = max_depth
+        # Règles d'inclusion / exclusion (ScanFilter), appliquées avant tout stat ou parsing
+        self.scan_filter = scan_filter
+        self._root_prefix = '' if root == os.curdir else os.path.join(root, '')
+        self.symlink_policy = symlink_policy or Config.SCAN_SYMLINK_POLICY
+        self.order = order or Config.SCAN_ORDER
+        
+        if self.symlink_policy not in self.SYMLINK_POLICIES:
+            raise ValueError(f"Politique de liens symboliques inconnue : {self.symlink_policy}")
+        if self.order not in self.ORDERS:
+            raise ValueError(f"Ordre de parcours inconnu : {self.order}")
+        
+        # Le nom sert de filtre rapide, le chemin absolu ne se calcule que si le nom correspond
+        self._excluded_paths = {os.path.normcase(os.path.abspath(p)) for p in excluded_paths}
+        self._excluded_names = {os.path.basename(p) for p in self._excluded_paths}
+    
+    def _is_excluded(self, entry, path):
+        """Vérifie si l'entrée fait partie des chemins exclus (ex: le script lui-même)"""
+        if entry.name not in self._excluded_names:
+            return False
+        return os.path.normcase(os.path.abspath(path)) in self._excluded_paths
+    
+    def _classify(self, entry):
+        """Retourne 'file', 'dir' ou None selon le type en cache et la politique de liens"""
+        if not entry.is_symlink():
+            if entry.is_file(follow_symlinks=False):
+                return 'file'
+            if entry.is_dir(follow_symlinks=False):
+                return 'dir'
+            return None
+        
+        if self.symlink_policy == 'skip':
+            return None
+        if entry.is_file():
+            return 'file'
+        if self.symlink_policy == 'follow' and entry.is_dir():
+            return 'dir'
+        return None
+    
+    def open_directory(self, dir_path, parent=None):
+        """Ouvre un répertoire et retourne son DirectoryHandle (None en mode chemins ou si l'ouverture échoue)
+        
+        Un sous-répertoire est ouvert relativement au descripteur de son parent, sans suivre de lien
+        symbolique sauf avec la politique 'follow' : il ne peut pas être remplacé par un lien entre
+        le parcours du parent et le sien.
+        """
+        if not self.USE_DIR_FD:
+            return None
+        flags = os.O_RDONLY | os.O_DIRECTORY | getattr(os, 'O_CLOEXEC', 0)
+        try:
+            if parent is None:
+                fd = os.open(dir_path, flags)
+            else:
+                if self.symlink_policy != 'follow':
+                    flags |= getattr(os, 'O_NOFOLLOW', 0)
+                fd = os.open(os.path.basename(dir_path), flags, dir_fd=parent.fd)
+        except OSError:
+            return None
+        return DirectoryHandle(fd)
+    
+    def open_path(self, dir_path):
+        """Ouvre un répertoire de l'arborescence depuis la racine, un composant à la fois, chacun relativement
+        au précédent et sans suivre de lien (sauf politique 'follow') ; None en mode chemins ou en cas d'échec
+        
+        Utilisé quand le descripteur du parent n'est pas disponible (parts du mode multi-processus) : un
+        répertoire remplacé par un lien symbolique après le listage de son parent n'est pas suivi.
+        """
+        if not self.USE_DIR_FD:
+            return None
+        relative = os.path.relpath(dir_path, self.root)
+        components = [] if relative == os.curdir else relative.split(os.sep)
+        if os.pardir in components:
+            return None
+        handle = self.open_directory(self.root)
+        for component in components:
+            if handle is None:
+                return None
+            parent = handle
+            handle = self.open_directory(component, parent)
+            parent.close()
+        return handle
+    
+    def path_prefix(self, dir_path, depth):
+        """Préfixe des chemins des fichiers d'un répertoire (relatifs au répertoire courant quand la racine est '.')"""
+        return '' if depth == 0 and self.root == os.curdir else os.path.join(dir_path, '')
+    
+    def iter_directory(self, dir_path, depth, subdirs, handle=None):
+        """Génère les fichiers d'un seul répertoire et ajoute ses sous-répertoires à parcourir à subdirs"""
+        # Chemins relatifs au répertoire courant quand la racine est '.', pour un affichage lisible
+        prefix = self.path_prefix(dir_path, depth)
+        can_descend = self.max_depth is None or depth < self.max_depth
+        scan_filter = self.scan_filter
+        rel_prefix = prefix[len(self._root_prefix):] if scan_filter is not None else ''
+        
+        if handle is None and self.USE_DIR_FD:
+            handle = self.open_directory(dir_path)
+            if handle is None:
+                return
+        
+        try:
+            # os.scandir(fd) travaille sur une copie du descripteur : handle reste ouvert pour les écritures
+            with os.scandir(handle.fd if handle is not None else dir_path) as iterator:
+                entries = sorted(iterator, key=lambda e: e.name) if self.order == 'name' else iterator
+                for entry in entries:
+                    try:
+                        kind = self._classify(entry)
+                    except OSError:
+                        continue
+                    
+                    path = prefix + entry.name
+                    if kind == 'file':
+                        if self._is_excluded(entry, path):
+                            continue
+                        if scan_filter is None or scan_filter.accepts_file(entry.name, rel_prefix, entry.stat):
+                            yield ScanEntry(path, entry.name, depth, entry, handle)
+                    elif kind == 'dir' and can_descend:
+                        if self._is_excluded(entry, path):
+                            continue
+                        # Sous-arborescence exclue : jamais ouverte
+                        if scan_filter is None or scan_filter.accepts_dir(entry.name, rel_prefix):
+                            subdirs.append(path)
+        except OSError:
+            # Répertoire illisible ou supprimé pendant le parcours
+            return
+    
+    def scan(self):
+        """Génère les fichiers au fil du parcours : ceux d'un répertoire, puis ses sous-répertoires"""
+        follow_dirs = self.symlink_policy == 'follow'
+        visited = set()
+        # Chaque sous-répertoire en attente garde une référence au descripteur de son parent
+        stack = [(self.root, 0, None)]
+        
+        while stack:
+            dir_path, depth, parent = stack.pop()
+            handle = self.open_directory(dir_path, parent)
+            if handle is None and self.USE_DIR_FD:
+                continue
+            
+            if follow_dirs:
+                # Protection contre les boucles de liens symboliques
+                try:
+                    dir_stat = os.fstat(handle.fd) if handle is not None else os.stat(dir_path)
+                except OSError:
+                    continue
+                dir_key = (dir_stat.st_dev, dir_stat.st_ino)
+                if dir_key in visited:
+                    continue
+                visited.add(dir_key)
+            
+            subdirs = []
+            yield from self.iter_directory(dir_path, depth, subdirs, handle)
+            
+            # Empilés à l'envers pour être dépilés dans l'ordre
+            stack.extend((subdir, depth + 1, handle) for subdir in reversed(subdirs))
+
+class IncrementalCache:
+    """Cache SQLite des fichiers déjà traités, indexé par chemin et validé par (device, inode, taille, mtime)"""
+    
+    def __init__(self, cache_path, max_entries=None, commit_interval=None, root=None):
+        self.cache_path = cache_path
+        # Les chemins sont stockés relativement à root pour rester valides quelle que soit la forme de la cible
+        self._root_prefix = os.path.join(root, '') if root and root != os.curdir else None
+        self.max_entries = max_entries or Config.CACHE_MAX_ENTRIES
+        self.commit_interval = commit_interval or Config.CACHE_COMMIT_INTERVAL
+        self._lock = threading.Lock()
+        self._pending_records = []
+        self._pending_hits = []
+        
+        # Connexion partagée entre les threads d'application, protégée par le verrou
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, device INTEGER, inode INTEGER, size INTEGER, "
+            "mtime_ns INTEGER, applied_ns INTEGER, last_seen INTEGER)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS files_last_seen ON files (last_seen)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+        
+        # Les dates appliquées dépendent du fuseau source et des motifs de date : un changement de l'un ou
+        # de l'autre (motif ajouté, ordre modifié) invalide le cache
+        if (self._get_meta('version') != Config.CACHE_VERSION or self._get_meta('timezone') != FileSystemUtils.converter.name
+                or self._get_meta('patterns') != DateTimeParser.registry.fingerprint):
+            self.invalidate()
+        self.run_id = (self._get_meta('run_id') or 0) + 1
+        self._set_meta('run_id', self.run_id)
+        self._connection.commit()
     
     @staticmethod
-    def set_file_timestamp(filename, new_date):
-        """Change les dates de création, modification, et accès"""
-        timestamp = time.mktime(new_date.timetuple())
+    def owned_paths(cache_path):
+        """Fichiers créés par SQLite pour ce cache, à exclure du parcours"""
+        return [cache_path, cache_path + '-journal', cache_path + '-wal', cache_path + '-shm']
+    
+    def _get_meta(self, key):
+        row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_meta(self, key, value):
+        self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+    
+    def invalidate(self):
+        """Vide entièrement le cache (tous les fichiers seront retraités)"""
+        with self._lock:
+            self._pending_records.clear()
+            self._pending_hits.clear()
+            self._connection.execute("DELETE FROM files")
+            self._set_meta('version', Config.CACHE_VERSION)
+            self._set_meta('timezone', FileSystemUtils.converter.name)
+            self._set_meta('patterns', DateTimeParser.registry.fingerprint)
+            self._connection.commit()
+    
+    def _key(self, path):
+        if self._root_prefix and path.startswith(self._root_prefix):
+            return path[len(self._root_prefix):]
+        return path
+    
+    def lookup(self, path, stat_result):
+        """Retourne la date appliquée lors d'une exécution précédente si le fichier n'a pas changé, sinon None"""
+        path = self._key(path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT device, inode, size, mtime_ns, applied_ns FROM files WHERE path = ?", (path,)
+            ).fetchone()
+            if row is None or row[:4] != (stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns):
+                return None
+            self._pending_hits.append((self.run_id, path))
+            self._flush_if_needed()
+        return FileSystemUtils.converter.from_ns(row[4])
+    
+    def record(self, path, stat_result, mtime_ns, applied_ns):
+        """Mémorise un fichier traité (mtime_ns = date de modification après traitement)"""
+        path = self._key(path)
+        with self._lock:
+            self._pending_records.append((
+                path, stat_result.st_dev, stat_result.st_ino, stat_result.st_size, mtime_ns, applied_ns, self.run_id
+            ))
+            self._flush_if_needed()
+    
+    def flush(self):
+        """Écrit les enregistrements en attente (fin d'une part du mode multi-processus)"""
+        with self._lock:
+            self._flush()
+    
+    def _flush_if_needed(self):
+        if len(self._pending_records) + len(self._pending_hits) >= self.commit_interval:
+            self._flush()
+    
+    def _flush(self):
+        """Écrit les enregistrements en attente en une seule transaction (verrou déjà pris)"""
+        if self._pending_records:
+            self._connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending_records)
+            self._pending_records.clear()
+        if self._pending_hits:
+            self._connection.executemany("UPDATE files SET last_seen = ? WHERE path = ?", self._pending_hits)
+            self._pending_hits.clear()
+        self._connection.commit()
+    
+    def _evict(self):
+        """Supprime les entrées les moins récemment vues au-delà de max_entries (verrou déjà pris)"""
+        count = self._connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        if count > self.max_entries:
+            self._connection.execute(
+                "DELETE FROM files WHERE path IN (SELECT path FROM files ORDER BY last_seen LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            self._connection.commit()
+    
+    def close(self):
+        """Écrit les données en attente, applique la limite de taille et ferme le cache"""
+        with self._lock:
+            self._flush()
+            self._evict()
+            self._connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class UndoJournal:
+    """Journal d'annulation en ajout seul : une ligne JSON [chemin absolu, atime_ns, mtime_ns d'origine, date écrite en ns]
+    par fichier, enregistrée avant chaque écriture
+    
+    Les lignes sont validées par groupes (écriture + fsync tous les commit_records enregistrements ou toutes les
+    commit_interval secondes) plutôt qu'à chaque fichier : après un arrêt brutal, au plus ce dernier groupe est perdu.
+    """
+    
+    FORMAT_NAME = 'auto-timestamp-journal'
+    VERSION = 1
+    READ_BLOCK_SIZE = 65536
+    
+    def __init__(self, journal_path, commit_records=None, commit_interval=None):
+        self.journal_path = journal_path
+        self.commit_records = commit_records or Config.JOURNAL_COMMIT_RECORDS
+        self.commit_interval = Config.JOURNAL_COMMIT_INTERVAL if commit_interval is None else commit_interval
+        self.records = 0
+        self.commits = 0
+        # Chemins relatifs rendus absolus par simple concaténation (sans normalisation ni getcwd par fichier)
+        self._cwd = os.getcwd()
+        self._lock = threading.Lock()         # Tampon des lignes en attente
+        self._commit_lock = threading.Lock()  # Écriture + fsync d'un groupe, dans l'ordre des groupes
+        self._pending = []
         
-        # Modifier les dates d'accès et de modification
-        os.utime(filename, (timestamp, timestamp))
+        # Un journal existant est complété : une annulation remonte alors toutes les exécutions, de la plus récente à la plus ancienne
+        self._stream = open(journal_path, 'a', encoding='utf-8')
+        if self._stream.tell() == 0:
+            self._stream.write(json.dumps({'format': self.FORMAT_NAME, 'version': self.VERSION}) + "\n")
+            self._stream.flush()
         
-        # Modifier la date de création sous Windows
-        if os.name == 'nt':
+        # Validation périodique : en mode surveillance, les fichiers arrivent au compte-gouttes
+        self._closed = threading.Event()
+        self._committer = threading.Thread(target=self._commit_periodically, name='undo-journal', daemon=True)
+        self._committer.start()
+    
+    @staticmethod
+    def owned_paths(journal_path):
+        """Fichiers du journal (y compris une fois annulé) et répertoire de ses parts, à exclure du parcours"""
+        return [journal_path, journal_path + '.undone', UndoJournal.parts_directory(journal_path)]
+    
+    @staticmethod
+    def mark_undone(journal_path):
+        """Renomme un journal entièrement annulé en .undone (.undone.2, .undone.3... si ce nom est déjà pris) ;
+        retourne le nouveau nom"""
+        target = journal_path + '.undone'
+        for number in itertools.count(2):
             try:
-                FILETIME_EPOCH = 116444736000000000
-                HUNDREDS_OF_NANOSECONDS = 10000000
-                timestamp_100ns = int(timestamp * HUNDREDS_OF_NANOSECONDS) + FILETIME_EPOCH
-                ctime = wintypes.FILETIME(timestamp_100ns & 0xFFFFFFFF, timestamp_100ns >> 32)
-                kernel32 = ctypes.windll.kernel32
-                handle = kernel32.CreateFileW(filename, 256, 0, None, 3, 128, None)
-                
-                if handle != -1:
-                    kernel32.SetFileTime(handle, ctypes.byref(ctime), ctypes.byref(ctime), ctypes.byref(ctime))
-                    kernel32.CloseHandle(handle)
-                    return True
+                # Lien puis suppression : un journal déjà annulé n'est jamais écrasé (os.replace l'écraserait)
+                os.link(journal_path, target)
+            except FileExistsError:
+                target = f"{journal_path}.undone.{number}"
+                continue
+            except OSError:
+                # Système de fichiers sans liens physiques : nom libre vérifié juste avant
+                if os.path.lexists(target):
+                    target = f"{journal_path}.undone.{number}"
+                    continue
+                os.rename(journal_path, target)
+                return target
+            os.remove(journal_path)
+            return target
+    
+    @staticmethod
+    def parts_directory(journal_path):
+        """Répertoire des journaux de part, un par processus du mode multi-processus"""
+        return journal_path + '.parts'
+    
+    def merge_parts(self):
+        """Ajoute au journal les lignes des journaux de part puis les supprime ; retourne le nombre de lignes ajoutées
+        
+        Appelée avant le traitement (parts laissées par une exécution interrompue, plus anciennes) et après.
+        Une part non fusionnée reste un journal complet, annulable seule avec --undo.
+        """
+        parts_directory = self.parts_directory(self.journal_path)
+        try:
+            names = sorted(os.listdir(parts_directory))
+        except FileNotFoundError:
+            return 0
+        self.commit()
+        merged = 0
+        with self._commit_lock:
+            for name in names:
+                part_path = os.path.join(parts_directory, name)
+                with open(part_path, encoding='utf-8') as part:
+                    header = self._parse_line(part.readline())
+                    if not isinstance(header, dict) or header.get('format') != self.FORMAT_NAME:
+                        continue
+                    for line in part:
+                        # Dernière ligne sans fin de ligne : tronquée par un arrêt brutal du processus
+                        if line.endswith("\n") and line.strip():
+                            self._stream.write(line)
+                            merged += 1
+                self._stream.flush()
+                os.fsync(self._stream.fileno())
+                os.remove(part_path)
+            self.records += merged
+        try:
+            os.rmdir(parts_directory)
+        except OSError:
+            pass
+        return merged
+    
+    def append(self, path, stat_result, applied_ns):
+        """Enregistre les dates actuelles d'un fichier avant d'y écrire applied_ns (appelable depuis un thread)"""
+        # Échappement ASCII : les noms non décodables (surrogates) sont relus à l'identique
+        line = f"[{json.dumps(os.path.join(self._cwd, path))},{stat_result.st_atime_ns},{stat_result.st_mtime_ns},{applied_ns}]"
+        with self._lock:
+            self._pending.append(line)
+            full = len(self._pending) >= self.commit_records
+        if full:
+            self.commit()
+    
+    def commit(self):
+        """Écrit les lignes en attente et les rend durables (un seul fsync pour tout le groupe)"""
+        with self._commit_lock:
+            with self._lock:
+                lines, self._pending = self._pending, []
+            if not lines:
+                return
+            # Les threads d'application continuent d'ajouter des lignes pendant le fsync
+            self._stream.write("\n".join(lines) + "\n")
+            self._stream.flush()
+            os.fsync(self._stream.fileno())
+            self.records += len(lines)
+            self.commits += 1
+    
+    def _commit_periodically(self):
+        while not self._closed.wait(self.commit_interval):
+            try:
+                self.commit()
+            except OSError:
+                pass  # Disque plein ou retiré : nouvel essai au prochain groupe, l'erreur remonte à close()
+    
+    def close(self):
+        """Valide les dernières lignes et ferme le journal"""
+        self._closed.set()
+        self._committer.join()
+        try:
+            self.commit()
+        finally:
+            self._stream.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @staticmethod
+    def read_records_reversed(journal_path, block_size=None):
+        """Génère les lignes (chemin, atime_ns, mtime_ns, applied_ns) de la plus récente à la plus ancienne,
+        en lisant le fichier par blocs depuis la fin (mémoire constante)"""
+        block_size = block_size or UndoJournal.READ_BLOCK_SIZE
+        with open(journal_path, 'rb') as stream:
+            header = UndoJournal._parse_line(stream.readline())
+            if not isinstance(header, dict) or header.get('format') != UndoJournal.FORMAT_NAME:
+                raise ValueError("Journal d'annulation invalide (en-tête manquant)")
+            if header.get('version') != UndoJournal.VERSION:
+                raise ValueError(f"Version de journal non supportée : {header.get('version')}")
+            
+            start = stream.tell()
+            position = stream.seek(0, os.SEEK_END)
+            remainder = b''
+            last_line = True
+            while position > start:
+                size = min(block_size, position - start)
+                position -= size
+                stream.seek(position)
+                lines = (stream.read(size) + remainder).split(b'\n')
+                # Première ligne du bloc : peut-être incomplète, complétée par le bloc précédent
+                remainder = lines.pop(0) if position > start else b''
+                for line in reversed(lines):
+                    if not line.strip():
+                        continue
+                    record = UndoJournal._parse_line(line)
+                    if record is None and last_line:
+                        last_line = False
+                        continue  # Dernière ligne tronquée par un arrêt brutal pendant l'écriture
+                    if not isinstance(record, list) or len(record) != 4:
+                        raise ValueError("Journal d'annulation invalide (ligne illisible)")
+                    last_line = False
+                    yield tuple(record)
+    
+    @staticmethod
+    def _parse_line(line):
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def restore_record(record, dry_run=False):
+        """Rétablit les dates d'origine d'une ligne du journal si le fichier porte toujours la date écrite :
+        retourne (chemin, date rétablie, statut, origine)"""
+        path, atime_ns, mtime_ns, applied_ns = record
+        original_date = FileSystemUtils.converter.from_ns(mtime_ns)
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return path, original_date, FileStatus.FAILED, DateSource.JOURNAL
+        
+        if stat_result.st_mtime_ns == mtime_ns and stat_result.st_atime_ns == atime_ns:
+            return path, original_date, FileStatus.MATCHED, DateSource.JOURNAL
+        # Fichier modifié depuis (contenu ou dates) : ses nouvelles dates ne sont pas écrasées
+        tolerance_ns = int(Config.TIMESTAMP_TOLERANCE * 1_000_000_000)
+        if abs(stat_result.st_mtime_ns - applied_ns) > tolerance_ns:
+            return path, original_date, FileStatus.STALE, DateSource.JOURNAL
+        if dry_run:
+            return path, original_date, FileStatus.PENDING, DateSource.JOURNAL
+        try:
+            os.utime(path, ns=(atime_ns, mtime_ns))
+        except OSError:
+            return path, original_date, FileStatus.FAILED, DateSource.JOURNAL
+        return path, original_date, FileStatus.CHANGED, DateSource.JOURNAL
+    
+    @staticmethod
+    def iter_undo(journal_path, workers=None, dry_run=False, metrics=None):
+        """Annule un journal en flux : génère (chemin, date rétablie, statut, origine) au fil des restaurations
+        
+        Les lignes sont réparties entre les threads par hachage du chemin : les lignes d'un même fichier
+        (plusieurs exécutions) sont rétablies dans l'ordre inverse du journal, jusqu'aux dates d'avant la première.
+        """
+        workers = max(1, workers if workers is not None else Config.APPLY_WORKERS)
+        records = UndoJournal.read_records_reversed(journal_path)
+        if workers == 1:
+            for record in records:
+                yield UndoJournal._observed_restore(record, dry_run, metrics)
+            return
+        
+        queue_size = Config.APPLY_MAX_IN_FLIGHT_PER_WORKER
+        queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        results = queue.Queue(maxsize=workers * queue_size)
+        stopped = threading.Event()
+        failures = []
+        
+        def restore_worker(records_queue):
+            while True:
+                record = records_queue.get()
+                if record is None:
+                    results.put(None)
+                    return
+                if not stopped.is_set():
+                    results.put(UndoJournal._observed_restore(record, dry_run, metrics))
+        
+        def read_journal():
+            try:
+                for record in records:
+                    if stopped.is_set():
+                        break
+                    path = record[0].encode('utf-8', 'surrogatepass')
+                    queues[zlib.crc32(path) % workers].put(record)
+            except (OSError, ValueError) as error:
+                failures.append(error)
+            finally:
+                for records_queue in queues:
+                    records_queue.put(None)
+        
+        threads = [threading.Thread(target=read_journal, name='undo-reader', daemon=True)]
+        threads += [threading.Thread(target=restore_worker, args=(records_queue,), daemon=True) for records_queue in queues]
+        for thread in threads:
+            thread.start()
+        
+        finished = 0
+        try:
+            while finished < workers:
+                result = results.get()
+                if result is None:
+                    finished += 1
                 else:
-                    return False
-            except Exception:
-                return False
-        return True
+                    yield result
+        finally:
+            # Arrêt anticipé du consommateur : les lignes restantes sont lues sans être appliquées
+            stopped.set()
+            while finished < workers:
+                if results.get() is None:
+                    finished += 1
+            for thread in threads:
+                thread.join()
+        if failures:
+            raise failures[0]
+    
+    @staticmethod
+    def _observed_restore(record, dry_run, metrics):
+        if metrics is None:
+            return UndoJournal.restore_record(record, dry_run)
+        start = time.perf_counter()
+        result = UndoJournal.restore_record(record, dry_run)
+        metrics.observe_file(result[0], result[2], time.perf_counter() - start, {}, result[3])
+        return result
 
 # ===================================
 # SECTION 3: PARSING & EXTRACTION DE DONNÉES
 # ===================================
 
-class DateTimeParser:
-    """Gestionnaire pour l'extraction et le parsing des dates"""
+class DatePatternRegistry:
+    """Registre de motifs de date compilés en une seule expression régulière à groupes nommés"""
     
-    @staticmethod
-    def extract_date_from_filename(filename):
-        """Extrait la date du nom de fichier"""
-        number_parts = re.findall(r'\d+', filename)
+    GROUP_PATTERN = re.compile(r'\(\?P<(\w+)>')
+    DATE_FIELDS = ('Y', 'm', 'd')
+    TIME_FIELDS = ('H', 'M', 'S')
+    
+    def __init__(self, patterns=()):
+        self._patterns = list(patterns)
+        self.hits = collections.Counter()
+        self._hits_lock = threading.Lock()
+        self.generation = 0  # Incrémenté à chaque recompilation (invalide les résultats mémorisés)
+        self._compile()
+    
+    def register(self, name, regex, priority=None):
+        """Ajoute un motif (priority = position, 0 = plus prioritaire ; à la fin par défaut) et recompile"""
+        if any(existing == name for existing, _ in self._patterns):
+            raise ValueError(f"Motif déjà enregistré : {name}")
+        position = len(self._patterns) if priority is None else priority
+        self._patterns.insert(position, (name, regex))
+        try:
+            self._compile()
+        except (ValueError, re.error):
+            del self._patterns[position]
+            self._compile()
+            raise
+    
+    @property
+    def pattern_names(self):
+        return [name for name, _ in self._patterns]
+    
+    @property
+    def fingerprint(self):
+        """Empreinte des motifs et de leur ordre (invalide le cache incrémental si elle change)"""
+        return zlib.crc32(json.dumps(self._patterns).encode('utf-8'))
+    
+    def _compile(self):
+        """Compile tous les motifs en une alternative unique ; les groupes sont préfixés par le nom du motif"""
+        alternatives = []
+        self._kinds = {}
+        self._groups = {}
         
-        date_part = None
-        time_part = None
+        for name, regex in self._patterns:
+            fields = self.GROUP_PATTERN.findall(regex)
+            prefixed = self.GROUP_PATTERN.sub(lambda m: f"(?P<{name}__{m.group(1)}>", regex)
+            alternatives.append(f"(?P<{name}>{prefixed})")
+            self._groups[name] = {field: f"{name}__{field}" for field in fields}
+            
+            has_date = all(field in fields for field in self.DATE_FIELDS)
+            has_time = all(field in fields for field in self.TIME_FIELDS)
+            if 'epoch_ms' in fields or (has_date and has_time):
+                self._kinds[name] = 'full'
+            elif has_date:
+                self._kinds[name] = 'date'
+            elif has_time:
+                self._kinds[name] = 'time'
+            else:
+                raise ValueError(f"Le motif {name} ne contient ni date (Y, m, d) ni heure (H, M, S)")
         
-        for part in number_parts:
-            if len(part) == 8 and part.isdigit():
-                date_part = part
-            elif len(part) == 6 and part.isdigit():
-                time_part = part
+        self._ranks = {name: rank for rank, (name, _) in enumerate(self._patterns)}
+        # Tous les motifs commencent au début d'une suite de chiffres : le moteur écarte les autres positions
+        # en deux tests au lieu d'essayer chaque alternative. re.ASCII : seuls 0-9 comptent comme chiffres.
+        self._regex = re.compile(f"(?<!\\d)(?=\\d)(?:{'|'.join(alternatives)})", re.ASCII)
+        self.generation += 1
+    
+    def _build_datetime(self, date_name, date_match, time_name=None, time_match=None):
+        """Construit la date depuis les champs entiers d'un motif complet, ou d'un motif date + un motif heure"""
+        date_groups = self._groups[date_name]
+        if 'epoch_ms' in date_groups:
+            return FileSystemUtils.converter.from_ns(int(date_match.group(date_groups['epoch_ms'])) * 1_000_000)
         
-        try:
-            if date_part and time_part:
-                return datetime.datetime.strptime(
-                    f"{date_part[:4]}-{date_part[4:6]}-{date_part[6:8]} {time_part[:2]}:{time_part[2:4]}:{time_part[4:6]}", 
-                    "%Y-%m-%d %H:%M:%S"
-                )
-        except ValueError:
-            pass
+        if time_match is None:
+            time_name, time_match = date_name, date_match
+        time_groups = self._groups[time_name]
         
-        return None
+        year, month, day = date_match.group(date_groups['Y'], date_groups['m'], date_groups['d'])
+        hour, minute, second = time_match.group(time_groups['H'], time_groups['M'], time_groups['S'])
+        fraction = time_match.group(time_groups['f']) if 'f' in time_groups else None
+        microsecond = int(fraction[:6].ljust(6, '0')) if fraction else 0
+        return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second), microsecond)
+    
+    def extract(self, filename, count=True):
+        """Retourne (date, nom du motif) en un seul passage sur le nom, ou (None, None)"""
+        full_matches = []
+        date_match = None
+        time_match = None
+        kinds = self._kinds
+        
+        for match in self._regex.finditer(filename):
+            name = match.lastgroup
+            kind = kinds[name]
+            if kind == 'full':
+                full_matches.append((self._ranks[name], match.start(), name, match))
+            elif kind == 'date':
+                date_match = (name, match)
+            else:
+                time_match = (name, match)
+        
+        # Motif complet le plus prioritaire, puis le premier dans le nom ; un motif invalide laisse sa place au suivant
+        if len(full_matches) > 1:
+            full_matches.sort(key=lambda candidate: candidate[:2])
+        for _, _, name, match in full_matches:
+            try:
+                result = self._build_datetime(name, match)
+            except (ValueError, OverflowError, OSError):
+                continue
+            if count:
+                self.count_hit(name)
+            return result, name
+        
+        # Repli : dernière date seule et dernière heure seule trouvées dans le nom
+        if date_match and time_match:
+            try:
+                result = self._build_datetime(date_match[0], date_match[1], time_match[0], time_match[1])
+            except ValueError:
+                return None, None
+            name = f"{date_match[0]}+{time_match[0]}"
+            if count:
+                self.count_hit(name)
+            return result, name
+        
+        return None, None
+    
+    def miss_reason(self, filename):
+        """Explique l'échec d'extraction : 'no_digits', 'no_pattern', 'date_only' (date sans heure),
+        'time_only' (heure sans date) ou 'invalid_date' (motif complet reconnu mais date impossible)"""
+        if not any(character.isdigit() for character in filename):
+            return 'no_digits'
+        kinds = {self._kinds[match.lastgroup] for match in self._regex.finditer(filename)}
+        if not kinds:
+            return 'no_pattern'
+        if 'full' in kinds or kinds == {'date', 'time'}:
+            return 'invalid_date'
+        return 'date_only' if 'date' in kinds else 'time_only'
+    
+    def count_hit(self, name):
+        with self._hits_lock:
+            self.hits[name] += 1
+
+class FileGrouper:
+    """Regroupement des fichiers par radical normalisé, avec mémo LRU du parsing de chaque radical
+    
+    Un fichier et ses annexes (IMG_x.jpg, IMG_x.xmp, IMG_x.jpg.json, IMG_x.jpg.supplemental-metadata.json)
+    ainsi qu'une rafale (IMG_x_BURST001_COVER.jpg, IMG_x_BURST002.jpg, IMG_x (1).jpg) ont le même radical
+    IMG_x : sa date n'est extraite qu'une fois pour tout le groupe, y compris d'un répertoire à l'autre.
+    Seuls des suffixes sans date sont retirés : la date d'un membre est toujours celle de son groupe.
+    Seules les extensions connues sont retirées (Config.GROUP_SIDECAR_SUFFIXES, puis une de
+    Config.GROUP_MEDIA_EXTENSIONS) : report.final.pdf et report.jpg restent dans des groupes distincts.
+    Un radical sans date est daté par les en-têtes d'un membre (voir AutoProcessor._iter_grouped).
+    """
+    
+    SIDECAR_SUFFIXES = frozenset(Config.GROUP_SIDECAR_SUFFIXES)
+    MEDIA_EXTENSIONS = frozenset(Config.GROUP_MEDIA_EXTENSIONS)
+    # Marqueurs de rafale et de copie en fin de radical (_BURST002_COVER, (1), ~2)
+    SEQUENCE_PATTERN = re.compile(r'(?:_BURST\d+(?:_COVER)?| ?\(\d+\)|~\d+)$', re.ASCII)
+    
+    def __init__(self, registry, memo_size=None):
+        self.registry = registry
+        self._parse_key = functools.lru_cache(maxsize=memo_size or Config.PARSE_MEMO_SIZE)(self._parse_uncached)
+    
+    @classmethod
+    def group_key(cls, filename):
+        """Radical normalisé : nom sans extensions d'annexe, sans son extension de média ni marqueurs de rafale ou de copie"""
+        key = filename
+        stem, _, extension = key.rpartition('.')
+        while stem and extension.lower() in cls.SIDECAR_SUFFIXES:
+            key = stem
+            stem, _, extension = key.rpartition('.')
+        if stem and extension.lower() in cls.MEDIA_EXTENSIONS:
+            key = stem
+        
+        while True:
+            # Test préalable sur les caractères : la plupart des noms n'ont aucun marqueur
+            if not (key.endswith(')') or '~' in key or '_BURST' in key):
+                return key
+            match = cls.SEQUENCE_PATTERN.search(key)
+            if not match or not match.start():
+                return key
+            key = key[:match.start()]
+    
+    def _parse_uncached(self, key, generation):
+        # generation fait partie de la clé : un motif ajouté au registre rend les résultats mémorisés obsolètes
+        return self.registry.extract(key, count=False)
+    
+    def extract(self, filename):
+        """Retourne (date, nom du motif) du groupe du fichier ; les compteurs de motifs restent par fichier"""
+        return self.extract_key(self.group_key(filename))
+    
+    def extract_key(self, key, count=True):
+        """Retourne (date, nom du motif) d'un radical déjà calculé par group_key"""
+        result = self._parse_key(key, self.registry.generation)
+        if count and result[1] is not None:
+            self.registry.count_hit(result[1])
+        return result
+    
+    def memo_info(self):
+        """Statistiques du mémo (hits, misses, maxsize, currsize)"""
+        return self._parse_key.cache_info()
+
+class DateTimeParser:
+    """Gestionnaire pour l'extraction et le parsing des dates"""
+    
+    # Registre partagé, modifiable via Config.FILENAME_PATTERNS ou DateTimeParser.registry.register()
+    registry = DatePatternRegistry(Config.FILENAME_PATTERNS)
+    grouper = FileGrouper(registry)
+    
+    @staticmethod
+    def extract_date_from_filename(filename):
+        """Extrait la date du nom de fichier (motif le plus prioritaire trouvé)"""
+        return DateTimeParser.registry.extract(filename)[0]
+    
+    @staticmethod
+    def extract_date_and_source(filename):
+        """Extrait la date du nom de fichier et retourne aussi le nom du motif utilisé"""
+        return DateTimeParser.registry.extract(filename)
+    
+    @staticmethod
+    def extract_group_date(filename):
+        """Extrait la date du groupe du fichier (radical normalisé, parsé une fois par groupe)"""
+        return DateTimeParser.grouper.extract(filename)[0]
+    
+    @staticmethod
+    def extract_many(filenames):
+        """Génère (nom, date ou None) pour chaque nom d'un itérable"""
+        extract = DateTimeParser.registry.extract
+        for filename in filenames:
+            yield filename, extract(filename)[0]
     
     @staticmethod
     def parse_manual_datetime(input_str):
@@ -192,6 +1596,331 @@ class DateTimeParser:
         except Exception:
             return None
 
+class HeaderReader:
+    """Lectures positionnelles bornées dans un fichier ouvert : au plus budget octets lus au total"""
+    
+    __slots__ = ('fd', 'size', 'budget')
+    
+    def __init__(self, fd, size, budget):
+        self.fd = fd
+        self.size = size
+        self.budget = budget
+    
+    def read(self, offset, length):
+        """Lit length octets à offset (moins en fin de fichier) ; None si le budget est épuisé ou offset invalide"""
+        length = min(length, self.size - offset)
+        if offset < 0 or length <= 0 or length > self.budget:
+            return None
+        self.budget -= length
+        if hasattr(os, 'pread'):
+            return os.pread(self.fd, length, offset)
+        os.lseek(self.fd, offset, os.SEEK_SET)
+        return os.read(self.fd, length)
+
+class MetadataExtractor:
+    """Date de prise de vue lue dans les en-têtes du conteneur, pour les fichiers sans date dans le nom
+    
+    JPEG : segment APP1 EXIF ; HEIC/HEIF : élément Exif localisé par les boîtes meta/iinf/iloc ;
+    MP4/MOV : date de création de l'atome moov/mvhd. Seuls les en-têtes sont lus (lectures positionnelles
+    bornées à Config.METADATA_MAX_BYTES), jamais les données image ou vidéo.
+    """
+    
+    EXIF_DATE_TAGS = (0x9003, 0x9004)   # DateTimeOriginal, puis DateTimeDigitized
+    EXIF_SUBSEC_TAGS = {0x9003: 0x9291, 0x9004: 0x9292}
+    EXIF_OFFSET_TAGS = {0x9003: 0x9011, 0x9004: 0x9012}
+    EXIF_IFD_POINTER = 0x8769
+    EXIF_MAX_BYTES = 65536              # Taille maximale d'un bloc EXIF (segment APP1)
+    MAX_BOXES = 1024                    # Boîtes parcourues au plus par niveau (fichier corrompu)
+    QUICKTIME_EPOCH_OFFSET = 2_082_844_800  # Secondes entre 1904-01-01 et 1970-01-01 (UTC)
+    # Première boîte d'un fichier ISO BMFF (les anciens .mov n'ont pas toujours de ftyp)
+    ISOBMFF_FIRST_BOXES = (b'ftyp', b'moov', b'wide', b'free', b'skip', b'mdat', b'pnot')
+    # Lecture sans mise à jour de la date d'accès (Linux)
+    NOATIME_FLAG = getattr(os, 'O_NOATIME', 0)
+    
+    @staticmethod
+    def supports(filename):
+        """Vrai si l'extension du fichier peut contenir une date de prise de vue"""
+        return os.path.splitext(os.fspath(filename))[1].lower() in Config.METADATA_EXTENSIONS
+    
+    @staticmethod
+    def _open(filename, flags):
+        if isinstance(filename, ScanEntry) and filename.dir_handle is not None:
+            return os.open(filename.name, flags, dir_fd=filename.dir_handle.fd)
+        return os.open(os.fspath(filename), flags)
+    
+    @staticmethod
+    def extract(filename, stat_result=None):
+        """Retourne (date, source) lue dans les en-têtes (nom, chemin ou ScanEntry), ou (None, None)
+        
+        stat_result : stat pris avant la lecture. La lecture ne doit pas déplacer la date d'accès (relatime),
+        sinon un fichier déjà daté ne serait plus reconnu comme tel à l'exécution suivante : ouverture avec
+        O_NOATIME quand le système le permet, sinon date d'accès de stat_result rétablie après la lecture.
+        """
+        if not MetadataExtractor.supports(filename):
+            return None, None
+        flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+        noatime = MetadataExtractor.NOATIME_FLAG
+        try:
+            try:
+                fd = MetadataExtractor._open(filename, flags | noatime)
+            except PermissionError:
+                if not noatime:
+                    raise
+                # O_NOATIME est réservé au propriétaire du fichier
+                noatime = 0
+                fd = MetadataExtractor._open(filename, flags)
+        except OSError:
+            return None, None
+        try:
+            size = stat_result.st_size if stat_result is not None else os.fstat(fd).st_size
+            reader = HeaderReader(fd, size, Config.METADATA_MAX_BYTES)
+            return MetadataExtractor.read_header(reader)
+        except (OSError, ValueError, IndexError, struct.error, OverflowError):
+            return None, None
+        finally:
+            if not noatime and stat_result is not None:
+                MetadataExtractor._restore_atime(fd, stat_result)
+            os.close(fd)
+    
+    @staticmethod
+    def _restore_atime(fd, stat_result):
+        """Rétablit la date d'accès d'avant la lecture si elle a changé (sans effet si le contenu a changé entre-temps)"""
+        if os.utime not in os.supports_fd:
+            return
+        try:
+            current = os.fstat(fd)
+            if current.st_atime_ns != stat_result.st_atime_ns and current.st_mtime_ns == stat_result.st_mtime_ns:
+                os.utime(fd, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        except OSError:
+            pass
+    
+    @staticmethod
+    def read_header(reader):
+        """Identifie le conteneur par sa signature et lit sa date"""
+        head = reader.read(0, 12)
+        if not head:
+            return None, None
+        if head.startswith(b'\xff\xd8'):
+            date = MetadataExtractor._jpeg_date(reader)
+            return (date, DateSource.EXIF) if date else (None, None)
+        if head[4:8] in MetadataExtractor.ISOBMFF_FIRST_BOXES:
+            return MetadataExtractor._isobmff_date(reader)
+        return None, None
+    
+    @staticmethod
+    def _jpeg_date(reader):
+        """Parcourt les marqueurs JPEG jusqu'au segment APP1 EXIF (arrêt au début des données image)"""
+        position = 2
+        while True:
+            marker = reader.read(position, 4)
+            if marker is None or len(marker) < 4 or marker[0] != 0xFF:
+                return None
+            code = marker[1]
+            if code == 0xFF:                                # Octet de bourrage
+                position += 1
+                continue
+            if code in (0xD9, 0xDA):                        # Fin d'image, début des données compressées
+                return None
+            if 0xD0 <= code <= 0xD7 or code == 0x01:        # Marqueurs sans longueur
+                position += 2
+                continue
+            length = int.from_bytes(marker[2:4], 'big')
+            # Seul un segment APP1 commençant par "Exif" est lu en entier (pas les APP1 XMP)
+            if code == 0xE1 and reader.read(position + 4, 6) == b'Exif\x00\x00':
+                segment = reader.read(position + 10, min(length - 8, MetadataExtractor.EXIF_MAX_BYTES))
+                return MetadataExtractor._exif_date(segment) if segment else None
+            position += 2 + length
+    
+    @staticmethod
+    def _ifd_entries(tiff, offset, order):
+        """Entrées d'un IFD TIFF : {étiquette: (type, nombre, champ valeur de 4 octets)}"""
+        count = struct.unpack_from(order + 'H', tiff, offset)[0]
+        entries = {}
+        for index in range(count):
+            tag, value_type, value_count = struct.unpack_from(order + 'HHI', tiff, offset + 2 + index * 12)
+            entries[tag] = (value_type, value_count, offset + 10 + index * 12)
+        return entries
+    
+    @staticmethod
+    def _ascii_value(tiff, entry, order):
+        """Valeur ASCII d'une entrée d'IFD (dans le champ si 4 octets au plus, sinon à son décalage)"""
+        value_type, value_count, field = entry
+        if value_type != 2:
+            return None
+        start = field if value_count <= 4 else struct.unpack_from(order + 'I', tiff, field)[0]
+        return tiff[start:start + value_count].split(b'\x00', 1)[0].decode('ascii', 'replace').strip()
+    
+    @staticmethod
+    def _exif_date(tiff):
+        """DateTimeOriginal (sinon DateTimeDigitized) d'un bloc TIFF EXIF, avec sous-secondes et décalage UTC éventuels"""
+        order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+        if order is None or struct.unpack_from(order + 'H', tiff, 2)[0] != 42:
+            return None
+        ifd0 = MetadataExtractor._ifd_entries(tiff, struct.unpack_from(order + 'I', tiff, 4)[0], order)
+        pointer = ifd0.get(MetadataExtractor.EXIF_IFD_POINTER)
+        if pointer is None:
+            return None
+        exif = MetadataExtractor._ifd_entries(tiff, struct.unpack_from(order + 'I', tiff, pointer[2])[0], order)
+        
+        for tag in MetadataExtractor.EXIF_DATE_TAGS:
+            if tag not in exif:
+                continue
+            value = MetadataExtractor._ascii_value(tiff, exif[tag], order)
+            try:
+                date = datetime.datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
+            except (TypeError, ValueError):
+                continue                                    # Date absente ou "0000:00:00 00:00:00"
+            
+            subsec_entry = exif.get(MetadataExtractor.EXIF_SUBSEC_TAGS[tag])
+            subsec = MetadataExtractor._ascii_value(tiff, subsec_entry, order) if subsec_entry else None
+            if subsec and subsec.isdigit():
+                date = date.replace(microsecond=int(subsec[:6].ljust(6, '0')))
+            
+            # Décalage UTC enregistré par l'appareil : la date est ramenée dans le fuseau source
+            offset_entry = exif.get(MetadataExtractor.EXIF_OFFSET_TAGS[tag])
+            offset = MetadataExtractor._ascii_value(tiff, offset_entry, order) if offset_entry else None
+            if offset:
+                try:
+                    utc = date - datetime.datetime.strptime(offset, "%z").utcoffset()
+                except ValueError:
+                    return date
+                return FileSystemUtils.converter.from_ns((utc - TimestampConverter.EPOCH) // datetime.timedelta(microseconds=1) * 1000)
+            return date
+        return None
+    
+    @staticmethod
+    def _boxes(reader, start, end):
+        """Génère (type, début du contenu, fin) des boîtes ISO BMFF entre start et end, en ne lisant que leurs en-têtes"""
+        position = start
+        for _ in range(MetadataExtractor.MAX_BOXES):
+            if position + 8 > end:
+                return
+            header = reader.read(position, 16)
+            if header is None or len(header) < 8:
+                return
+            size, box_type = struct.unpack_from('>I4s', header)
+            content = position + 8
+            if size == 1:                                   # Taille sur 64 bits
+                if len(header) < 16:
+                    return
+                size = struct.unpack_from('>Q', header, 8)[0]
+                content += 8
+            elif size == 0:                                 # Boîte jusqu'à la fin du fichier
+                size = end - position
+            if size < content - position:
+                return
+            yield box_type, content, min(position + size, end)
+            position += size
+    
+    @staticmethod
+    def _isobmff_date(reader):
+        """MP4/MOV : moov/mvhd ; HEIC/HEIF : élément Exif de la boîte meta"""
+        for box_type, start, end in MetadataExtractor._boxes(reader, 0, reader.size):
+            if box_type == b'moov':
+                for child_type, child_start, _child_end in MetadataExtractor._boxes(reader, start, end):
+                    if child_type == b'mvhd':
+                        date = MetadataExtractor._mvhd_date(reader.read(child_start, 32))
+                        return (date, DateSource.QUICKTIME) if date else (None, None)
+                return None, None
+            if box_type == b'meta':
+                date = MetadataExtractor._heif_date(reader, start, end)
+                if date:
+                    return date, DateSource.EXIF
+        return None, None
+    
+    @staticmethod
+    def _mvhd_date(payload):
+        """Date de création de mvhd (secondes depuis 1904, UTC), convertie dans le fuseau source"""
+        if not payload:
+            return None
+        if payload[0] == 1:
+            seconds = struct.unpack_from('>Q', payload, 4)[0]
+        else:
+            seconds = struct.unpack_from('>I', payload, 4)[0]
+        if seconds <= MetadataExtractor.QUICKTIME_EPOCH_OFFSET:     # Non renseignée (0) ou antérieure à 1970
+            return None
+        return FileSystemUtils.converter.from_ns((seconds - MetadataExtractor.QUICKTIME_EPOCH_OFFSET) * 1_000_000_000)
+    
+    @staticmethod
+    def _heif_date(reader, start, end):
+        """Localise l'élément Exif (iinf) puis son emplacement (iloc) dans la boîte meta, et lit le bloc TIFF"""
+        meta = reader.read(start, end - start)
+        if meta is None:
+            return None
+        boxes = {}
+        position = 4                                        # Boîte complète : version et drapeaux
+        while position + 8 <= len(meta):
+            size, box_type = struct.unpack_from('>I4s', meta, position)
+            if size < 8:
+                return None
+            boxes[box_type] = meta[position + 8:position + size]
+            position += size
+        if b'iinf' not in boxes or b'iloc' not in boxes:
+            return None
+        
+        item_id = MetadataExtractor._exif_item_id(boxes[b'iinf'])
+        location = MetadataExtractor._item_location(boxes[b'iloc'], item_id) if item_id is not None else None
+        if location is None:
+            return None
+        offset, length = location
+        data = reader.read(offset, min(length, MetadataExtractor.EXIF_MAX_BYTES))
+        if not data or len(data) < 4:
+            return None
+        # Contenu de l'élément : décalage (32 bits) de l'en-tête TIFF, souvent précédé de "Exif\0\0"
+        tiff_offset = 4 + struct.unpack_from('>I', data)[0]
+        return MetadataExtractor._exif_date(data[tiff_offset:])
+    
+    @staticmethod
+    def _exif_item_id(iinf):
+        """Identifiant de l'élément de type 'Exif' dans une boîte iinf"""
+        version = iinf[0]
+        position = 6 if version == 0 else 8
+        while position + 8 <= len(iinf):
+            size, box_type = struct.unpack_from('>I4s', iinf, position)
+            if size < 8:
+                return None
+            if box_type == b'infe' and iinf[position + 8] >= 2:
+                infe_version = iinf[position + 8]
+                if infe_version == 2:
+                    item_id, = struct.unpack_from('>H', iinf, position + 12)
+                    item_type = iinf[position + 16:position + 20]
+                else:
+                    item_id, = struct.unpack_from('>I', iinf, position + 12)
+                    item_type = iinf[position + 18:position + 22]
+                if item_type == b'Exif':
+                    return item_id
+            position += size
+        return None
+    
+    @staticmethod
+    def _item_location(iloc, wanted_id):
+        """(décalage dans le fichier, longueur) du premier extent d'un élément dans une boîte iloc"""
+        version = iloc[0]
+        offset_size, length_size = iloc[4] >> 4, iloc[4] & 0x0F
+        base_offset_size, index_size = iloc[5] >> 4, (iloc[5] & 0x0F if version in (1, 2) else 0)
+        position = 6
+        
+        def field(size):
+            nonlocal position
+            value = int.from_bytes(iloc[position:position + size], 'big')
+            position += size
+            return value
+        
+        item_count = field(2 if version < 2 else 4)
+        for _ in range(item_count):
+            item_id = field(2 if version < 2 else 4)
+            construction_method = field(2) & 0x0F if version in (1, 2) else 0
+            field(2)                                        # data_reference_index
+            base_offset = field(base_offset_size)
+            extents = [(field(index_size), field(offset_size), field(length_size))[1:] for _ in range(field(2))]
+            if item_id == wanted_id:
+                # Seule la construction par décalage dans le fichier (méthode 0) est lue
+                if construction_method != 0 or not extents:
+                    return None
+                extent_offset, extent_length = extents[0]
+                return base_offset + extent_offset, extent_length
+        return None
+
 # ===================================
 # SECTION 4: FORMATAGE & AFFICHAGE DE TEXTE
 # ===================================
@@ -261,33 +1990,89 @@ class ProgressBarRenderer:
     """Gestionnaire de la barre de progression"""
     
     @staticmethod
-    def print_progress_bar(current, total, filename=""):
-        """Affiche une barre de progression sans scintillement"""
-        if total == 0:
-            return
-        
+    def format_progress_bar(current, total, filename="", stats_text=""):
+        """Construit la barre et sa ligne d'information en une seule chaîne (total None = flux de taille inconnue)"""
         total_width = Config.TERMINAL_WIDTH - 1
         bar_length = total_width
-        progress = current / total
+        progress = min(current / total, 1) if total else 0
         filled_length = int(bar_length * progress)
         
         bar = "█" * filled_length + "░" * (bar_length - filled_length)
         percent = round(progress * 100, 1)
         
         # Format filename and percentage
-        percentage_text = f"{percent:>5.1f}%"
+        percentage_text = f"{percent:>5.1f}%" if total else f"{current} fichiers"
+        if stats_text:
+            percentage_text = f"{stats_text}  {percentage_text}"
         available_space = total_width - len(percentage_text)
         filename_space = available_space - 2  # Account for " | " separator
         truncated_filename = filename[:filename_space] if filename else ""
         
-        # Save cursor position
-        print("\033[s", end='')
-        # Move cursor to start of line and print bar
-        print(f"\r {bar}", end='', flush=True)
-        # Restore cursor position and move down 1 line
-        print(f"\033[u\033[B\r  {truncated_filename:<{filename_space}} {percentage_text}", end="", flush=True)
-        # Move cursor back to saved position
-        print("\033[u", end='', flush=True)
+        # Sauvegarde du curseur, barre, ligne suivante (nom + pourcentage), puis retour au curseur sauvegardé
+        return (
+            f"\033[s\r {bar}"
+            f"\033[u\033[B\r  {truncated_filename:<{filename_space}} {percentage_text}"
+            f"\033[u"
+        )
+    
+    @staticmethod
+    def print_progress_bar(current, total, filename=""):
+        """Affiche une barre de progression sans scintillement (total None = flux de taille inconnue)"""
+        if total == 0:
+            return
+        
+        # Une seule écriture pour limiter le scintillement et les appels système
+        sys.stdout.write(ProgressBarRenderer.format_progress_bar(current, total, filename))
+        sys.stdout.flush()
+
+class ThrottledProgressRenderer:
+    """Barre de progression redessinée au plus N fois par seconde, avec débit et temps restant"""
+    
+    def __init__(self, total=None, refresh_rate=Config.PROGRESS_REFRESH_RATE, stream=None, enabled=None):
+        self.total = total
+        self.stream = stream or sys.stdout
+        self.min_interval = 1.0 / refresh_rate
+        # Désactivée automatiquement si la sortie est redirigée (fichier, pipe, cron...)
+        self.enabled = self.stream.isatty() if enabled is None else enabled
+        self.start_time = time.perf_counter()
+        self.next_draw_time = self.start_time
+    
+    def _stats_text(self, current, now):
+        """Calcule le débit (fichiers/s) et le temps restant estimé"""
+        elapsed = now - self.start_time
+        rate = current / elapsed if elapsed > 0 else 0.0
+        text = f"{rate:,.0f} fichiers/s".replace(",", " ")
+        if self.total and rate > 0:
+            remaining = max(self.total - current, 0) / rate
+            text += f"  ETA {datetime.timedelta(seconds=int(remaining))}"
+        return text
+    
+    def _draw(self, current, filename, now):
+        """Écrit la barre en une seule fois"""
+        if self.total == 0:
+            return
+        self.stream.write(ProgressBarRenderer.format_progress_bar(current, self.total, filename, self._stats_text(current, now)))
+        self.stream.flush()
+    
+    def update(self, current, filename=""):
+        """Redessine la barre seulement si l'intervalle minimal est écoulé (coût quasi nul sinon)"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if now < self.next_draw_time:
+            return
+        self.next_draw_time = now + self.min_interval
+        self._draw(current, filename, now)
+    
+    def finish(self, current, label="Terminé!"):
+        """Dessine l'état final quel que soit l'intervalle"""
+        if not self.enabled:
+            return
+        if self.total is None:
+            self.total = current
+        self._draw(current, label, time.perf_counter())
+        self.stream.write("\n\n")
+        self.stream.flush()
 
 class BoxRenderer:
     """Gestionnaire pour l'affichage des boîtes colorées"""
@@ -309,6 +2094,25 @@ class BoxRenderer:
             remaining_padding = Config.BOX_WIDTH - 4 - len(title) - title_padding
             return f"{' ' * title_padding}{title}{' ' * remaining_padding}"
     
+    @staticmethod
+    def write_lines(lines, stream=None):
+        """Écrit des lignes déjà rendues en gros blocs : un appel d'écriture (et un vidage) par bloc au lieu d'un print par ligne"""
+        stream = stream or sys.stdout
+        chunk = []
+        size = 0
+        for line in lines:
+            chunk.append(line)
+            size += len(line) + 1
+            if size >= Config.RENDER_CHUNK_SIZE:
+                chunk.append("")
+                stream.write("\n".join(chunk))
+                chunk = []
+                size = 0
+        if chunk:
+            chunk.append("")
+            stream.write("\n".join(chunk))
+        stream.flush()
+    
     @staticmethod
     def _render_auto_content_line(line, title, color):
         """Rend une ligne de contenu pour le mode automatique avec gestion spéciale pour fichiers non traités"""
@@ -319,13 +2123,14 @@ class BoxRenderer:
             # Mode AUTO : garder les "—"
             prefix, filename = line.split(" — ", 1) if " — " in line else ("", line)
             split_lines = TextFormatter.split_long_filename_lines(filename)
+            rendered = []
             for idx, l in enumerate(split_lines):
                 display = f" — {l}" if idx == 0 and prefix == "" else f"   {l}"
                 content_padding = Config.BOX_WIDTH - 3 - len(display) - 1
-                print(f" {colors[color]}│ {display}{' ' * content_padding}│{reset}")
-        else:
-            content_padding = Config.BOX_WIDTH - 3 - len(line) - 1
-            print(f" {colors[color]}│ {line}{' ' * content_padding}│{reset}")
+                rendered.append(f" {colors[color]}│ {display}{' ' * content_padding}│{reset}")
+            return rendered
+        content_padding = Config.BOX_WIDTH - 3 - len(line) - 1
+        return [f" {colors[color]}│ {line}{' ' * content_padding}│{reset}"]
     
     @staticmethod
     def _render_manual_content_line(line, title, color):
@@ -340,6 +2145,7 @@ class BoxRenderer:
             available_width = Config.BOX_WIDTH - 6 - len(number_part)
             remaining = filename
             first_line = True
+            rendered = []
             
             while remaining:
                 if first_line:
@@ -352,178 +2158,1272 @@ class BoxRenderer:
                     display = f"{indent}{chunk}"
                 
                 content_padding = Config.BOX_WIDTH - 2 - len(display) - 1
-                print(f" {colors[color]}│{display}{' ' * content_padding}│{reset}")
+                rendered.append(f" {colors[color]}│{display}{' ' * content_padding}│{reset}")
                 remaining = remaining[len(chunk):]
-        else:
-            content_padding = Config.BOX_WIDTH - 3 - len(line) - 1
-            print(f" {colors[color]}│ {line}{' ' * content_padding}│{reset}")
+            return rendered
+        content_padding = Config.BOX_WIDTH - 3 - len(line) - 1
+        return [f" {colors[color]}│ {line}{' ' * content_padding}│{reset}"]
     
     @staticmethod
-    def print_auto_box(title, color_code, content_lines):
-        """Affiche un encadré coloré pour le mode automatique"""
+    def _render_mixed_content_line(line, title, color):
+        """Rend une ligne de contenu du résumé final (vert : automatique, jaune : manuel, rouge : non traité)"""
         colors = Config.COLORS
-        color = colors.get(color_code, colors['reset'])
         reset = colors['reset']
         
-        print(f" {color}╭{'─' * 130}╮{reset}")
-        
-        # Ligne du titre
-        title_line = BoxRenderer._get_title_line(title)
-        print(f" {color}│{title_line}│{reset}")
+        # Pour les fichiers non traités du résumé final, garder les "—"
+        if color == 'red' and (title == "FICHIERS NON TRAITÉS" or title == "FICHIER NON TRAITÉ"):
+            prefix, filename = line.split(" — ", 1) if " — " in line else ("", line)
+            split_lines = TextFormatter.split_long_filename_lines(filename)
+            rendered = []
+            for idx, l in enumerate(split_lines):
+                display = f" — {l}" if idx == 0 and prefix == "" else f"   {l}"
+                content_padding = Config.BOX_WIDTH - 3 - len(display) - 1
+                rendered.append(f" {colors['green']}│{colors[color]} {display}{' ' * content_padding}{colors['green']}│{reset}")
+            return rendered
+        content_padding = Config.BOX_WIDTH - 4 - len(line) - 1
+        if color == 'yellow':
+            return [f" {colors['green']}│ {colors['yellow']}{line}{colors['green']}{' ' * content_padding}│{reset}"]
+        return [f" {colors[color]}│ {line}{' ' * content_padding}│{reset}"]
+    
+    @staticmethod
+    def _render_box(title, color, content_lines, render_line):
+        """Construit toutes les lignes d'un encadré (bordures, titre, contenu) sans rien écrire"""
+        reset = Config.COLORS['reset']
+        lines = [f" {color}╭{'─' * 130}╮{reset}", f" {color}│{BoxRenderer._get_title_line(title)}│{reset}"]
         
         # Ligne de séparation si il y a du contenu
         if content_lines:
-            print(f" {color}├{'─' * 130}┤{reset}")
-        
-        # Affichage du contenu mode AUTO
+            lines.append(f" {color}├{'─' * 130}┤{reset}")
         for line in content_lines:
-            BoxRenderer._render_auto_content_line(line, title, color_code)
-
-        print(f" {color}╰{'─' * 130}╯{reset}")
+            lines.extend(render_line(line))
+        
+        lines.append(f" {color}╰{'─' * 130}╯{reset}")
+        return lines
+    
+    @staticmethod
+    def render_auto_box(title, color_code, content_lines):
+        """Retourne les lignes d'un encadré coloré pour le mode automatique"""
+        colors = Config.COLORS
+        return BoxRenderer._render_box(title, colors.get(color_code, colors['reset']), content_lines,
+                                       lambda line: BoxRenderer._render_auto_content_line(line, title, color_code))
+    
+    @staticmethod
+    def render_manual_box(title, color_code, content_lines):
+        """Retourne les lignes d'un encadré coloré pour le mode manuel"""
+        colors = Config.COLORS
+        return BoxRenderer._render_box(title, colors.get(color_code, colors['reset']), content_lines,
+                                       lambda line: BoxRenderer._render_manual_content_line(line, title, color_code))
+    
+    @staticmethod
+    def render_mixed_box(title, content_lines_with_colors):
+        """Retourne les lignes d'un encadré avec lignes de couleurs différentes"""
+        return BoxRenderer._render_box(title, Config.COLORS['green'], content_lines_with_colors,
+                                       lambda item: BoxRenderer._render_mixed_content_line(item[0], title, item[1]))
+    
+    @staticmethod
+    def print_auto_box(title, color_code, content_lines):
+        """Affiche un encadré coloré pour le mode automatique"""
+        BoxRenderer.write_lines(BoxRenderer.render_auto_box(title, color_code, content_lines))
     
     @staticmethod
     def print_manual_box(title, color_code, content_lines):
         """Affiche un encadré coloré pour le mode manuel"""
-        colors = Config.COLORS
-        color = colors.get(color_code, colors['reset'])
-        reset = colors['reset']
-        
-        print(f" {color}╭{'─' * 130}╮{reset}")
-        
-        # Ligne du titre
-        title_line = BoxRenderer._get_title_line(title)
-        print(f" {color}│{title_line}│{reset}")
-        
-        # Ligne de séparation si il y a du contenu
-        if content_lines:
-            print(f" {color}├{'─' * 130}┤{reset}")
-        
-        # Affichage du contenu mode MANUEL
-        for line in content_lines:
-            BoxRenderer._render_manual_content_line(line, title, color_code)
-
-        print(f" {color}╰{'─' * 130}╯{reset}")
+        BoxRenderer.write_lines(BoxRenderer.render_manual_box(title, color_code, content_lines))
     
     @staticmethod
     def print_mixed_box(title, content_lines_with_colors):
         """Affiche un encadré avec lignes de couleurs différentes (pour résumé final)"""
-        colors = Config.COLORS
-        reset = colors['reset']
+        BoxRenderer.write_lines(BoxRenderer.render_mixed_box(title, content_lines_with_colors))
+
+# ===================================
+# SECTION 6: LOGIQUE DE TRAITEMENT AUTOMATIQUE
+# ===================================
+
+class RunMetrics:
+    """Compteurs et chronomètres d'une exécution (thread-safe), exportables en JSON ou au format Prometheus"""
+    
+    # Bornes supérieures de l'histogramme de latence par fichier, en secondes
+    LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+    STAGES = ('scan', 'cache', 'parse', 'metadata', 'stat', 'journal', 'utime')
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.start_time = time.time()
+        self.files = 0
+        self.statuses = collections.Counter()
+        self.sources = collections.Counter()
+        self.misses = collections.Counter()
+        self.filtered = collections.Counter()
+        self.stage_seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.latency_buckets = [0] * (len(self.LATENCY_BUCKETS) + 1)  # Dernière case : au-delà de la plus grande borne
+        self.latency_sum = 0.0
+    
+    def timed_iter(self, items):
+        """Enveloppe un itérable (le parcours) pour mesurer le temps passé à produire chaque élément"""
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_stage_time('scan', time.perf_counter() - start)
+                return
+            self.add_stage_time('scan', time.perf_counter() - start)
+            yield item
+    
+    def add_stage_time(self, stage, seconds):
+        with self._lock:
+            self.stage_seconds[stage] += seconds
+    
+    def observe_file(self, path, status, seconds, timings, source=None):
+        """Enregistre le résultat d'un fichier : statut, origine de la date, raison d'échec, temps par étape et latence totale"""
+        reason = None
+        if status == FileStatus.NO_DATE:
+            reason = DateTimeParser.registry.miss_reason(os.path.basename(path))
+        elif status == FileStatus.FAILED:
+            reason = 'utime_error'
+        bucket = bisect.bisect_left(self.LATENCY_BUCKETS, seconds)
         
-        print(f" {colors['green']}╭{'─' * 130}╮{reset}")
+        with self._lock:
+            self.files += 1
+            self.statuses[status] += 1
+            if source:
+                self.sources[source] += 1
+            if reason:
+                self.misses[reason] += 1
+            for stage, stage_seconds in timings.items():
+                self.stage_seconds[stage] += stage_seconds
+            self.latency_buckets[bucket] += 1
+            self.latency_sum += seconds
+    
+    def record_filtered(self, skipped):
+        """Ajoute les fichiers et répertoires écartés par les filtres du parcours, par règle"""
+        with self._lock:
+            self.filtered.update(skipped)
+    
+    def merge(self, data):
+        """Ajoute les mesures d'un autre RunMetrics exportées par to_dict() (ex: processus du mode multi-processus)"""
+        with self._lock:
+            self.files += data['files']
+            self.statuses.update(data['statuses'])
+            self.sources.update(data['sources'])
+            self.misses.update(data['misses'])
+            self.filtered.update(data['filtered'])
+            for stage, seconds in data['stage_seconds'].items():
+                self.stage_seconds[stage] += seconds
+            for index, count in enumerate(data['latency']['buckets']):
+                self.latency_buckets[index] += count
+            self.latency_sum += data['latency']['sum']
+    
+    def to_dict(self):
+        """Mesures sous forme de dictionnaire sérialisable en JSON"""
+        with self._lock:
+            return {
+                'run_seconds': round(time.time() - self.start_time, 6),
+                'files': self.files,
+                'statuses': dict(self.statuses),
+                'sources': dict(self.sources),
+                'misses': dict(self.misses),
+                'filtered': dict(self.filtered),
+                'pattern_hits': dict(DateTimeParser.registry.hits),
+                'stage_seconds': {stage: round(seconds, 6) for stage, seconds in self.stage_seconds.items()},
+                'latency': {
+                    'bounds': list(self.LATENCY_BUCKETS),
+                    'buckets': list(self.latency_buckets),
+                    'sum': round(self.latency_sum, 6),
+                },
+            }
+    
+    @staticmethod
+    def _label_value(value):
+        """Échappe une valeur d'étiquette Prometheus (les règles de filtrage sont des motifs saisis par l'utilisateur)"""
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    
+    def to_prometheus(self):
+        """Mesures au format texte Prometheus (collecteur textfile de node_exporter)"""
+        data = self.to_dict()
+        lines = [
+            "# HELP auto_timestamp_files_total Fichiers traités par statut",
+            "# TYPE auto_timestamp_files_total counter",
+        ]
+        lines += [f'auto_timestamp_files_total{{status="{status}"}} {count}' for status, count in sorted(data['statuses'].items())]
+        lines += [
+            "# HELP auto_timestamp_sources_total Dates appliquées par origine (nom, EXIF, QuickTime...)",
+            "# TYPE auto_timestamp_sources_total counter",
+        ]
+        lines += [f'auto_timestamp_sources_total{{source="{source}"}} {count}' for source, count in sorted(data['sources'].items())]
+        lines += [
+            "# HELP auto_timestamp_misses_total Fichiers sans date appliquée, par raison",
+            "# TYPE auto_timestamp_misses_total counter",
+        ]
+        lines += [f'auto_timestamp_misses_total{{reason="{reason}"}} {count}' for reason, count in sorted(data['misses'].items())]
+        lines += [
+            "# HELP auto_timestamp_filtered_total Fichiers et répertoires écartés par les filtres du parcours, par règle",
+            "# TYPE auto_timestamp_filtered_total counter",
+        ]
+        lines += [f'auto_timestamp_filtered_total{{rule="{self._label_value(rule)}"}} {count}'
+                  for rule, count in sorted(data['filtered'].items())]
+        lines += [
+            "# HELP auto_timestamp_pattern_hits_total Dates extraites par motif",
+            "# TYPE auto_timestamp_pattern_hits_total counter",
+        ]
+        lines += [f'auto_timestamp_pattern_hits_total{{pattern="{name}"}} {count}' for name, count in sorted(data['pattern_hits'].items())]
+        lines += [
+            "# HELP auto_timestamp_stage_seconds_total Temps cumulé par étape (somme sur tous les threads)",
+            "# TYPE auto_timestamp_stage_seconds_total counter",
+        ]
+        lines += [f'auto_timestamp_stage_seconds_total{{stage="{stage}"}} {seconds}' for stage, seconds in data['stage_seconds'].items()]
+        lines += [
+            "# HELP auto_timestamp_file_duration_seconds Latence de traitement par fichier",
+            "# TYPE auto_timestamp_file_duration_seconds histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(list(self.LATENCY_BUCKETS) + ['+Inf'], data['latency']['buckets']):
+            cumulative += count
+            lines.append(f'auto_timestamp_file_duration_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines += [
+            f"auto_timestamp_file_duration_seconds_sum {data['latency']['sum']}",
+            f"auto_timestamp_file_duration_seconds_count {cumulative}",
+            "# HELP auto_timestamp_run_duration_seconds Durée totale de l'exécution",
+            "# TYPE auto_timestamp_run_duration_seconds gauge",
+            f"auto_timestamp_run_duration_seconds {data['run_seconds']}",
+        ]
+        return "\n".join(lines) + "\n"
+    
+    def export(self, path, output_format='json'):
+        """Écrit les mesures dans path (remplacement atomique, requis par le collecteur textfile)"""
+        content = self.to_prometheus() if output_format == 'prometheus' else json.dumps(self.to_dict(), indent=2) + "\n"
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        os.replace(temporary_path, path)
 
-        title_line = BoxRenderer._get_title_line(title)
-        print(f" {colors['green']}│{title_line}│{reset}")
+class ResultStore:
+    """Résultats par fichier stockés en colonnes (mémoire compacte) au lieu d'une liste de tuples.
+    
+    Les chemins sont découpés en préfixe de répertoire interné et nom encodé dans un tampon d'octets
+    indexé par décalages ; les dates (naïves, heure murale) sont des entiers 64 bits en nanosecondes
+    depuis l'époque, les statuts et origines de date un code sur un octet. Au-delà de spill_threshold octets, les colonnes
+    sont déversées par segments dans un fichier temporaire. L'itération et l'indexation redonnent la vue
+    d'origine : (chemin, date) si dated, sinon le chemin seul.
+    """
+    
+    STATUSES = (FileStatus.CHANGED, FileStatus.MATCHED, FileStatus.CACHED, FileStatus.FAILED,
+                FileStatus.NO_DATE, FileStatus.PENDING, FileStatus.STALE)
+    STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+    SOURCES = (DateSource.FILENAME, DateSource.EXIF, DateSource.QUICKTIME, DateSource.CACHE, DateSource.PLAN,
+               DateSource.MANUAL, DateSource.RULE, DateSource.GROUP, DateSource.JOURNAL)
+    SOURCE_CODES = {source: code for code, source in enumerate(SOURCES)}
+    NO_DATE_NS = -(1 << 63)
+    ENTRY_BYTES = 22   # Hors nom : répertoire (4), décalage (8), date (8), statut (1), origine (1)
+    
+    _EPOCH = datetime.datetime(1970, 1, 1)
+    _MICROSECOND = datetime.timedelta(microseconds=1)
+    _DAY_NS = 86_400 * 10**9
+    
+    def __init__(self, dated=True, spill_threshold=None):
+        self.dated = dated
+        self.spill_threshold = Config.RESULTS_SPILL_BYTES if spill_threshold is None else spill_threshold
+        self._directories = []      # Préfixes de répertoire internés, séparateur final compris
+        self._directory_ids = {}
+        self._segments = []         # Segments déversés : (position dans le fichier, entrées, taille des noms)
+        self._segment_starts = []   # Index de la première entrée de chaque segment
+        self._spilled = 0
+        self._spill_file = None
+        self._loaded = (None, None)  # Dernier segment relu (numéro, colonnes)
+        self._reset_tail()
+    
+    def _reset_tail(self):
+        """Colonnes en mémoire des entrées non déversées"""
+        self._dir_ids = array.array('I')
+        self._offsets = array.array('Q', [0])
+        self._ns = array.array('q')
+        self._status = array.array('b')
+        self._sources = array.array('b')
+        self._names = bytearray()
+    
+    def __len__(self):
+        return self._spilled + len(self._ns)
+    
+    @property
+    def nbytes(self):
+        """Taille approximative des colonnes encore en mémoire"""
+        return len(self._names) + len(self._ns) * self.ENTRY_BYTES
+    
+    def append(self, path, date=None, status=None, source=None):
+        """Ajoute un résultat (date None pour un fichier sans date)"""
+        directory, separator, name = path.rpartition(os.sep)
+        prefix = directory + separator
+        directory_id = self._directory_ids.get(prefix)
+        if directory_id is None:
+            directory_id = self._directory_ids[prefix] = len(self._directories)
+            self._directories.append(prefix)
+        self._dir_ids.append(directory_id)
+        self._names += name.encode('utf-8', 'surrogatepass')
+        self._offsets.append(len(self._names))
+        self._ns.append(self.NO_DATE_NS if date is None else (date - self._EPOCH) // self._MICROSECOND * 1000)
+        self._status.append(self.STATUS_CODES.get(status, -1))
+        self._sources.append(self.SOURCE_CODES.get(source, -1))
         
-        # Ligne de séparation si il y a du contenu
-        if content_lines_with_colors:
-            print(f" {colors['green']}├{'─' * 130}┤{reset}")
-
-        for line, color in content_lines_with_colors:
-            # Pour les fichiers non traités du résumé final, garder les "—"
-            if color == 'red' and (title == "FICHIERS NON TRAITÉS" or title == "FICHIER NON TRAITÉ"):
-                prefix, filename = line.split(" — ", 1) if " — " in line else ("", line)
-                split_lines = TextFormatter.split_long_filename_lines(filename)
-                for idx, l in enumerate(split_lines):
-                    display = f" — {l}" if idx == 0 and prefix == "" else f"   {l}"
-                    content_padding = Config.BOX_WIDTH - 3 - len(display) - 1
-                    print(f" {colors['green']}│{colors[color]} {display}{' ' * content_padding}{colors['green']}│{reset}")
-            elif color == 'yellow':
-                content_padding = Config.BOX_WIDTH - 4 - len(line) - 1
-                print(f" {colors['green']}│ {colors['yellow']}{line}{colors['green']}{' ' * content_padding}│{reset}")
-            else:
-                content_padding = Config.BOX_WIDTH - 4 - len(line) - 1
-                print(f" {colors[color]}│ {line}{' ' * content_padding}│{reset}")
+        if self.spill_threshold and self.nbytes >= self.spill_threshold:
+            self._spill()
+    
+    def _spill(self):
+        """Déverse les colonnes en mémoire dans le fichier temporaire, comme un nouveau segment"""
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(prefix='auto_timestamp_results_', dir=Config.RESULTS_SPILL_DIR)
+        stream = self._spill_file
+        stream.seek(0, os.SEEK_END)
+        position = stream.tell()
+        for column in (self._dir_ids, self._offsets, self._ns, self._status, self._sources):
+            column.tofile(stream)
+        stream.write(self._names)
+        self._segments.append((position, len(self._ns), len(self._names)))
+        self._segment_starts.append(self._spilled)
+        self._spilled += len(self._ns)
+        self._reset_tail()
+    
+    def _load_segment(self, number):
+        """Relit les colonnes d'un segment déversé (le dernier relu est gardé en mémoire)"""
+        if self._loaded[0] == number:
+            return self._loaded[1]
+        position, count, names_size = self._segments[number]
+        self._spill_file.seek(position)
+        data = memoryview(self._spill_file.read(count * self.ENTRY_BYTES + 8 + names_size))
+        columns = []
+        for typecode, length in (('I', count), ('Q', count + 1), ('q', count), ('b', count), ('b', count)):
+            column = array.array(typecode)
+            size = column.itemsize * length
+            column.frombytes(data[:size])
+            data = data[size:]
+            columns.append(column)
+        columns.append(bytes(data))
+        self._loaded = (number, columns)
+        return columns
+    
+    def _iter_columns(self):
+        """Colonnes de chaque segment déversé puis de la partie en mémoire"""
+        for number in range(len(self._segments)):
+            yield self._load_segment(number)
+        yield self._tail_columns()
+    
+    def _tail_columns(self):
+        return [self._dir_ids, self._offsets, self._ns, self._status, self._sources, self._names]
+    
+    def _record(self, columns, index):
+        """Reconstruit (chemin, date, statut, origine) à partir des colonnes"""
+        dir_ids, offsets, ns, status, sources, names = columns
+        path = self._directories[dir_ids[index]] + names[offsets[index]:offsets[index + 1]].decode('utf-8', 'surrogatepass')
+        date = None if ns[index] == self.NO_DATE_NS else self._EPOCH + datetime.timedelta(microseconds=ns[index] // 1000)
+        return (path, date, self.STATUSES[status[index]] if status[index] >= 0 else None,
+                self.SOURCES[sources[index]] if sources[index] >= 0 else None)
+    
+    def _view(self, record):
+        return record[:2] if self.dated else record[0]
+    
+    def records(self):
+        """Itère sur les résultats complets (chemin, date ou None, statut, origine de la date)"""
+        for columns in self._iter_columns():
+            for index in range(len(columns[2])):
+                yield self._record(columns, index)
+    
+    def __iter__(self):
+        for record in self.records():
+            yield self._view(record)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("index hors limites")
+        if index >= self._spilled:
+            return self._view(self._record(self._tail_columns(), index - self._spilled))
+        number = bisect.bisect_right(self._segment_starts, index) - 1
+        return self._view(self._record(self._load_segment(number), index - self._segment_starts[number]))
+    
+    def __add__(self, other):
+        return list(self) + list(other)
+    
+    def __radd__(self, other):
+        return list(other) + list(self)
+    
+    def day_counts(self):
+        """Nombre de fichiers datés par jour, calculé sur les entiers sans reconstruire les dates"""
+        days = collections.Counter()
+        for columns in self._iter_columns():
+            days.update(ns // self._DAY_NS for ns in columns[2] if ns != self.NO_DATE_NS)
+        epoch = self._EPOCH.date()
+        return collections.Counter({epoch + datetime.timedelta(days=day): count for day, count in days.items()})
+    
+    def close(self):
+        """Supprime le fichier de déversement"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        self._segments, self._segment_starts, self._spilled = [], [], 0
+        self._loaded = (None, None)
+        self._reset_tail()
 
-        print(f" {colors['green']}╰{'─' * 130}╯{reset}")
+class AutoProcessor:
+    """Gestionnaire pour le traitement automatique des fichiers"""
+    
+    def __init__(self, workers=None, max_in_flight=None, skip_unchanged=None, cache=None, dry_run=False, keep_results=True,
+                 metrics=None, group_by_stem=None, metadata_fallback=None, journal=None):
+        self.processed_files = ResultStore()
+        self.unprocessed_files = ResultStore(dated=False)
+        self.status_counts = collections.Counter()
+        self.source_counts = collections.Counter()
+        self.workers = max(1, workers if workers is not None else Config.APPLY_WORKERS)
+        self.max_in_flight = max_in_flight or self.workers * Config.APPLY_MAX_IN_FLIGHT_PER_WORKER
+        self.skip_unchanged = Config.SKIP_UNCHANGED if skip_unchanged is None else skip_unchanged
+        self.cache = cache
+        # Journal d'annulation (UndoJournal) : dates d'origine enregistrées avant chaque écriture
+        self.journal = journal
+        self.dry_run = dry_run
+        # keep_results=False : seuls les compteurs sont tenus (mode batch, mémoire constante)
+        self.keep_results = keep_results
+        self.metrics = metrics
+        # Regroupement par radical : annexes et rafales reprennent la date parsée une seule fois pour leur groupe,
+        # ou celle lue dans les en-têtes d'un autre membre quand leur nom n'en contient pas
+        self.group_by_stem = Config.GROUP_BY_STEM if group_by_stem is None else group_by_stem
+        self._extract_date = DateTimeParser.extract_group_date if self.group_by_stem else DateTimeParser.extract_date_from_filename
+        # Nom sans date : date de prise de vue lue dans les en-têtes (JPEG, HEIC, MP4, MOV)
+        self.metadata_fallback = Config.METADATA_FALLBACK if metadata_fallback is None else metadata_fallback
+    
+    @staticmethod
+    def _stat(filename, path):
+        """Retourne le stat du fichier (celui du parcours si disponible), ou None en cas d'erreur"""
+        try:
+            return filename.stat() if isinstance(filename, ScanEntry) else os.stat(path)
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _timed(timings, stage, function, *args):
+        """Appelle function en cumulant sa durée dans timings[stage] (sans mesure si timings est None)"""
+        if timings is None:
+            return function(*args)
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+    
+    def _compute_file(self, filename, new_date=None, source=None, parsed=False):
+        """Extrait la date (sauf si new_date est fournie) et l'applique sans modifier l'état du processeur
+        (appelable depuis un thread) ; parsed : nom déjà analysé, new_date=None signifie qu'il ne contient pas de date"""
+        if self.metrics is None:
+            return self._compute_file_steps(filename, None, new_date, source, parsed)
+        
+        timings = {}
+        start = time.perf_counter()
+        result = self._compute_file_steps(filename, timings, new_date, source, parsed)
+        self.metrics.observe_file(result[0], result[2], time.perf_counter() - start, timings, result[3])
+        return result
+    
+    def _compute_file_steps(self, filename, timings, new_date=None, source=None, parsed=False):
+        """Étapes du traitement d'un fichier : cache, parsing, métadonnées, comparaison, écriture"""
+        path = os.fspath(filename)
+        stat_result = None
+        
+        # Fichier inchangé depuis la dernière exécution : ni parsing ni écriture
+        if self.cache is not None:
+            stat_result = self._timed(timings, 'stat', self._stat, filename, path)
+            cached_date = self._timed(timings, 'cache', self.cache.lookup, path, stat_result) if stat_result else None
+            if cached_date:
+                return path, cached_date, FileStatus.CACHED, DateSource.CACHE
+        
+        new_date, source, stat_result = self._find_date(filename, path, timings, new_date, stat_result, source, parsed)
+        if not new_date:
+            return path, None, FileStatus.NO_DATE, None
+        
+        if self.skip_unchanged:
+            if stat_result is None:
+                stat_result = self._timed(timings, 'stat', self._stat, filename, path)
+            if stat_result and FileSystemUtils.timestamp_matches(stat_result, new_date):
+                if self.cache is not None:
+                    self.cache.record(path, stat_result, stat_result.st_mtime_ns, self._to_ns(new_date))
+                return path, new_date, FileStatus.MATCHED, source
+        
+        if self.dry_run:
+            return path, new_date, FileStatus.PENDING, source
+        if self.journal is not None:
+            if stat_result is None:
+                stat_result = self._timed(timings, 'stat', self._stat, filename, path)
+            # Jamais d'écriture sans ses dates d'origine dans le journal
+            if stat_result is None:
+                return path, new_date, FileStatus.FAILED, source
+            self._timed(timings, 'journal', self.journal.append, path, stat_result, self._to_ns(new_date))
+        if self._timed(timings, 'utime', self._set_timestamp, filename, path, new_date):
+            if self.cache is not None and stat_result:
+                applied_ns = self._to_ns(new_date)
+                self.cache.record(path, stat_result, applied_ns, applied_ns)
+            return path, new_date, FileStatus.CHANGED, source
+        return path, new_date, FileStatus.FAILED, source
+    
+    def _find_date(self, filename, path, timings=None, new_date=None, stat_result=None, source=None, parsed=False):
+        """Date du fichier et son origine : nom (sauf si new_date est fournie, d'origine source), sinon en-têtes
+        du fichier ; retourne (date, origine, stat), le stat étant pris avant toute lecture des en-têtes"""
+        if new_date is None and not parsed:
+            new_date = self._timed(timings, 'parse', self._extract_date, os.path.basename(path))
+        if new_date:
+            return new_date, source or DateSource.FILENAME, stat_result
+        if not self.needs_io_for_date(path):
+            return None, None, stat_result
+        # Les dates comparées et journalisées sont celles d'avant la lecture
+        if stat_result is None:
+            stat_result = self._timed(timings, 'stat', self._stat, filename, path)
+            if stat_result is None:
+                return None, None, None
+        new_date, source = self._timed(timings, 'metadata', MetadataExtractor.extract, filename, stat_result)
+        return new_date, source, stat_result
+    
+    def needs_io_for_date(self, path):
+        """Vrai si la date d'un fichier sans date dans le nom peut encore être lue dans ses en-têtes"""
+        return self.metadata_fallback and MetadataExtractor.supports(path)
+    
+    @staticmethod
+    def _set_timestamp(filename, path, new_date):
+        """Écrit les dates, relativement au descripteur du répertoire pour une entrée du scanner"""
+        if isinstance(filename, ScanEntry):
+            return FileSystemUtils.set_entry_timestamp(filename, new_date)
+        return FileSystemUtils.set_file_timestamp(path, new_date)
+    
+    @staticmethod
+    def _to_ns(new_date):
+        """Timestamp en nanosecondes, tel qu'écrit par set_file_timestamp"""
+        return FileSystemUtils.to_ns(new_date)
+    
+    def record_result(self, path, new_date, status, source=None):
+        """Enregistre le résultat d'un fichier dans les listes traités / non traités"""
+        self.status_counts[status] += 1
+        if source:
+            self.source_counts[source] += 1
+        if status in FileStatus.PROCESSED:
+            if self.keep_results:
+                self.processed_files.append(path, new_date, status, source)
+            return True
+        if self.keep_results:
+            self.unprocessed_files.append(path, new_date, status, source)
+        return False
+    
+    def process_file(self, filename):
+        """Traite un fichier individual automatiquement (nom, chemin ou ScanEntry)"""
+        return self.record_result(*self._compute_file(filename))
+    
+    def _plan_file(self, filename):
+        """Calcule l'action prévue pour un fichier sans rien écrire : (chemin, date, statut, origine, stat)"""
+        path = os.fspath(filename)
+        new_date, source, stat_result = self._find_date(filename, path)
+        if not new_date:
+            return path, None, FileStatus.NO_DATE, None, None
+        
+        if stat_result is None:
+            stat_result = self._stat(filename, path)
+        if stat_result is None:
+            return path, new_date, FileStatus.FAILED, source, None
+        if self.skip_unchanged and FileSystemUtils.timestamp_matches(stat_result, new_date):
+            return path, new_date, FileStatus.MATCHED, source, stat_result
+        return path, new_date, FileStatus.PENDING, source, stat_result
+    
+    def _apply_plan_record(self, record):
+        """Applique une ligne de plan (chemin, atime_ns, mtime_ns, date) si le fichier n'a pas changé depuis"""
+        path, _atime_ns, mtime_ns, new_date = record
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return path, new_date, FileStatus.FAILED, DateSource.PLAN
+        
+        if self.skip_unchanged and FileSystemUtils.timestamp_matches(stat_result, new_date):
+            return path, new_date, FileStatus.MATCHED, DateSource.PLAN
+        if stat_result.st_mtime_ns != mtime_ns:
+            return path, new_date, FileStatus.STALE, DateSource.PLAN
+        return self._write_date(path, stat_result, new_date, DateSource.PLAN)
+    
+    def _apply_assignment(self, assignment):
+        """Applique une date attribuée hors du nom (chemin, date, origine) : ni parsing ni lecture des en-têtes"""
+        path, new_date, source = assignment
+        stat_result = self._stat(path, path)
+        if stat_result is None:
+            return path, new_date, FileStatus.FAILED, source
+        if self.skip_unchanged and FileSystemUtils.timestamp_matches(stat_result, new_date):
+            return path, new_date, FileStatus.MATCHED, source
+        return self._write_date(path, stat_result, new_date, source)
+    
+    def _write_date(self, path, stat_result, new_date, source):
+        """Fin commune des dates fournies (plan, règles) : simulation, journal d'annulation puis écriture"""
+        if self.dry_run:
+            return path, new_date, FileStatus.PENDING, source
+        if self.journal is not None:
+            self.journal.append(path, stat_result, self._to_ns(new_date))
+        if FileSystemUtils.set_file_timestamp(path, new_date):
+            return path, new_date, FileStatus.CHANGED, source
+        return path, new_date, FileStatus.FAILED, source
+    
+    def iter_results(self, files):
+        """Génère les résultats (chemin, date, statut, origine de la date) dans l'ordre d'entrée, en parallèle si workers > 1
+        (avec le regroupement par radical, les annexes sans date sont émises à la fin de leur répertoire)"""
+        if self.metrics is not None:
+            files = self.metrics.timed_iter(files)
+        if self.group_by_stem:
+            return self._iter_grouped(files)
+        return self._iter_ordered(self._compute_file, files)
+    
+    def _iter_grouped(self, files):
+        """Traitement avec regroupement par radical normalisé, dans un même répertoire
+        
+        Un fichier aux en-têtes lisibles (JPEG, MP4...) est traité normalement (cache, nom, puis en-têtes).
+        Le nom des autres est analysé ici (radical mémorisé) : sans date, le fichier (annexe .xmp, .json...)
+        est mis de côté jusqu'à ce que tous les fichiers de son répertoire soient traités, puis reçoit la date
+        lue dans les en-têtes d'un autre membre de son groupe (origine 'group').
+        Chaque fichier n'est traité qu'une fois ; les fichiers d'un répertoire doivent se suivre (parcours).
+        """
+        grouper = DateTimeParser.grouper
+        registry = DateTimeParser.registry
+        metrics = self.metrics
+        submitted = collections.deque()       # (numéro de répertoire, motif analysé ici) de chaque élément soumis, dans l'ordre
+        deferred = collections.OrderedDict()  # Numéro de répertoire -> [(fichier, radical)] mis de côté
+        ready = collections.deque()           # Fichiers mis de côté dont le répertoire est terminé
+        deferred_count = 0
+        
+        def admit():
+            nonlocal deferred_count
+            directory, number = None, 0
+            for filename in files:
+                while ready:
+                    submitted.append((None, None))
+                    yield ready.popleft()
+                path = os.fspath(filename)
+                parent, name = os.path.split(path)
+                if parent != directory:
+                    directory, number = parent, number + 1
+                if self.needs_io_for_date(path):
+                    submitted.append((number, None))
+                    yield filename, None, None, False
+                    continue
+                key = grouper.group_key(name)
+                start = time.perf_counter() if metrics is not None else None
+                # Motif compté à l'utilisation de la date (pas pour un fichier retrouvé dans le cache)
+                new_date, pattern = grouper.extract_key(key, count=False)
+                if metrics is not None:
+                    metrics.add_stage_time('parse', time.perf_counter() - start)
+                if new_date is None and deferred_count < Config.GROUP_MAX_DEFERRED:
+                    deferred.setdefault(number, []).append((filename, key))
+                    deferred_count += 1
+                    continue
+                submitted.append((number, pattern))
+                yield filename, new_date, None, True
+        
+        def release(before, current, dates):
+            """Rend prêts les fichiers mis de côté des répertoires terminés (tous si before est None)"""
+            nonlocal deferred_count
+            while deferred:
+                number = next(iter(deferred))
+                if before is not None and number >= before:
+                    break
+                for filename, key in deferred.pop(number):
+                    new_date = dates.get(key) if number == current else None
+                    ready.append((filename, new_date, DateSource.GROUP if new_date else None, True))
+                    deferred_count -= 1
+        
+        def compute(item):
+            return self._compute_file(*item)
+        
+        current, dates = None, {}
+        for result in self._iter_ordered(compute, admit()):
+            number, pattern = submitted.popleft()
+            if number is None:
+                yield result
+                continue
+            if number != current:
+                # Les résultats arrivent dans l'ordre : les répertoires précédents sont terminés
+                release(number, current, dates)
+                current, dates = number, {}
+            if result[3] == DateSource.FILENAME:
+                if pattern is not None:
+                    registry.count_hit(pattern)
+            elif result[1] is not None:
+                # Seules les dates des en-têtes (ou du cache) peuvent manquer aux autres membres : un radical
+                # daté donne déjà sa date à chaque membre par le nom
+                dates.setdefault(grouper.group_key(os.path.basename(result[0])), result[1])
+            yield result
+        
+        release(None, current, dates)
+        if ready:
+            yield from self._iter_ordered(compute, list(ready))
+    
+    def iter_plan(self, files):
+        """Phase plan : génère (chemin, date, statut, origine, stat) sans rien écrire"""
+        return self._iter_ordered(self._observed(self._plan_file), files)
+    
+    def iter_plan_results(self, records):
+        """Phase apply : applique un flux de lignes de plan et génère (chemin, date, statut, origine)"""
+        return self._iter_ordered(self._observed(self._apply_plan_record), records)
+    
+    def iter_assigned(self, assignments):
+        """Applique un flux de (chemin, date, origine) attribués hors du nom et génère (chemin, date, statut, origine)"""
+        return self._iter_ordered(self._observed(self._apply_assignment), assignments)
+    
+    def _observed(self, function):
+        """Enveloppe une fonction unitaire (résultat : chemin, date, statut, origine...) pour mesurer sa latence"""
+        metrics = self.metrics
+        if metrics is None:
+            return function
+        
+        def observed(item):
+            start = time.perf_counter()
+            result = function(item)
+            metrics.observe_file(result[0], result[2], time.perf_counter() - start, {}, result[3])
+            return result
+        return observed
+    
+    def _iter_ordered(self, function, items):
+        """Applique function à chaque élément, en parallèle si workers > 1, en conservant l'ordre d'entrée"""
+        if self.workers == 1:
+            for item in items:
+                yield function(item)
+            return
+        
+        # File bornée : on attend le plus ancien résultat avant de soumettre au-delà de max_in_flight,
+        # ce qui garde la mémoire constante et l'ordre de sortie identique à l'ordre d'entrée
+        in_flight = collections.deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                for item in items:
+                    if len(in_flight) >= self.max_in_flight:
+                        yield in_flight.popleft().result()
+                    in_flight.append(executor.submit(function, item))
+                
+                while in_flight:
+                    yield in_flight.popleft().result()
+            finally:
+                # Arrêt anticipé du consommateur : ne pas lancer les tâches restantes
+                for future in in_flight:
+                    future.cancel()
+    
+    def process_files_with_progress(self, files, total=None):
+        """Traite une liste ou un flux de fichiers avec affichage de la progression, retourne le nombre traité"""
+        if total is None and hasattr(files, '__len__'):
+            total = len(files)
+        
+        # L'affichage est limité dans le temps : la vitesse de traitement ne dépend plus de l'interface
+        progress = ThrottledProgressRenderer(total)
+        count = 0
+        for result in self.iter_results(files):
+            # Les listes ne sont modifiées que dans ce thread, dans l'ordre d'entrée
+            self.record_result(*result)
+            count += 1
+            progress.update(count, result[0])
+        
+        # Finaliser la barre de progression
+        progress.finish(count)
+        return count
 
-# ===================================
-# SECTION 6: LOGIQUE DE TRAITEMENT AUTOMATIQUE
-# ===================================
+class AsyncAutoProcessor:
+    """API asyncio du traitement automatique, pour les services d'ingestion asynchrones
+    
+    Le parsing des noms reste synchrone (quelques microsecondes) ; seuls les appels bloquants
+    (stat, os.utime, cache, lecture des en-têtes) passent par un exécuteur, au plus concurrency à la fois.
+    """
+    
+    def __init__(self, concurrency=None, executor=None, max_in_flight=None, **processor_options):
+        # workers=1 : le parallélisme est assuré par l'exécuteur, pas par le pool de threads d'AutoProcessor
+        self.processor = AutoProcessor(workers=1, keep_results=False, **processor_options)
+        self.concurrency = concurrency or Config.ASYNC_CONCURRENCY
+        self.max_in_flight = max_in_flight or self.concurrency * Config.APPLY_MAX_IN_FLIGHT_PER_WORKER
+        # None : pool de concurrency threads propre à chaque iter_results (exécuteur de la boucle pour process_file seul)
+        self.executor = executor
+        self._active_executor = executor
+        self._semaphore = None
+    
+    @property
+    def status_counts(self):
+        return self.processor.status_counts
+    
+    async def process_file(self, filename):
+        """Traite un fichier et retourne (chemin, date, statut, origine) sans bloquer la boucle d'événements"""
+        processor = self.processor
+        new_date = None
+        parsed = processor.cache is None
+        if parsed:
+            # Le nom n'est analysé qu'ici : l'exécuteur reçoit la date trouvée (ou son absence)
+            path = os.fspath(filename)
+            new_date = processor._extract_date(os.path.basename(path))
+            if new_date is None and not processor.needs_io_for_date(path):
+                # Aucune date ni en-tête à lire : aucun accès disque, le résultat est calculé sur place
+                return processor._compute_file(filename, None, parsed=True)
+        
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._active_executor, processor._compute_file, filename, new_date, None, parsed)
+    
+    @staticmethod
+    async def _aiter(files):
+        if hasattr(files, '__aiter__'):
+            async for filename in files:
+                yield filename
+        else:
+            for filename in files:
+                yield filename
+    
+    async def iter_results(self, files):
+        """Génère (chemin, date, statut, origine) dans l'ordre d'entrée ; files est un itérable, synchrone ou asynchrone
+        
+        Au plus max_in_flight fichiers sont en cours : la lecture de files suit le rythme du consommateur.
+        L'arrêt du consommateur (break, aclose) ou l'annulation de sa tâche annule les fichiers en attente ;
+        une écriture déjà commencée dans l'exécuteur se termine (os.utime ne s'interrompt pas).
+        """
+        in_flight = collections.deque()
+        # Le pool par défaut de la boucle (min(32, CPU + 4) threads) limiterait la concurrence demandée
+        own_executor = ThreadPoolExecutor(max_workers=self.concurrency) if self.executor is None else None
+        if own_executor is not None:
+            self._active_executor = own_executor
+        try:
+            async for filename in self._aiter(files):
+                if len(in_flight) >= self.max_in_flight:
+                    yield self._record(await in_flight.popleft())
+                in_flight.append(asyncio.ensure_future(self.process_file(filename)))
+            
+            while in_flight:
+                yield self._record(await in_flight.popleft())
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            if own_executor is not None:
+                self._active_executor = self.executor
+                own_executor.shutdown(wait=False)
+    
+    def _record(self, result):
+        self.processor.record_result(*result)
+        return result
 
-class AutoProcessor:
-    """Gestionnaire pour le traitement automatique des fichiers"""
+class ShardedProcessor:
+    """Traitement multi-processus : chaque part (un répertoire, ou une tranche de hachage des noms) est
+    parcourue, analysée et appliquée par un processus, qui ne renvoie qu'un résumé compact
     
-    def __init__(self):
-        self.processed_files = []
-        self.unprocessed_files = []
+    Chaque processus ouvre une fois le cache incrémental partagé et son propre journal d'annulation
+    (répertoire de parts du journal), validés à la fin de chaque part ; le processus principal fusionne
+    ensuite les journaux de part dans le journal (UndoJournal.merge_parts).
+    """
     
-    def process_file(self, filename):
-        """Traite un fichier individual automatiquement"""
-        new_date = DateTimeParser.extract_date_from_filename(filename)
+    # Cache et journal du processus de travail, ouverts par init_worker
+    _worker_cache = None
+    _worker_journal = None
+    
+    def __init__(self, processes=None, threads_per_process=None, max_depth=None, symlink_policy=None,
+                 dry_run=False, skip_unchanged=None, excluded_paths=(), split_threshold=None, metrics=None, scan_filter=None,
+                 cache_path=None, journal_path=None):
+        self.processes = processes or os.cpu_count() or 1
+        # Les compteurs de filtrage de chaque part sont fusionnés dans scan_filter.skipped au fil de run()
+        self.scan_filter = scan_filter
+        # Les mesures de chaque part sont fusionnées dans metrics au fil de run()
+        self.metrics = metrics
+        # Options transmises explicitement : les processus lancés par 'spawn' ne voient pas Config modifiée
+        self.options = {
+            'threads': threads_per_process or Config.SHARD_THREADS_PER_PROCESS,
+            'max_depth': max_depth,
+            'symlink_policy': symlink_policy or Config.SCAN_SYMLINK_POLICY,
+            'dry_run': dry_run,
+            'skip_unchanged': Config.SKIP_UNCHANGED if skip_unchanged is None else skip_unchanged,
+            'group_by_stem': Config.GROUP_BY_STEM,
+            'metadata_fallback': Config.METADATA_FALLBACK,
+            'timezone': FileSystemUtils.converter.timezone,
+            'excluded_paths': list(excluded_paths),
+            'scan_filter': scan_filter.spec if scan_filter is not None else None,
+            'split_threshold': split_threshold or Config.SHARD_SPLIT_THRESHOLD,
+            'split_count': self.processes,
+            'metrics': metrics is not None,
+            'cache_path': cache_path,
+            'journal_parts': UndoJournal.parts_directory(journal_path) if journal_path else None,
+        }
+    
+    @staticmethod
+    def init_worker(root, options):
+        """Prépare un processus de travail : fuseau source, cache incrémental et journal d'annulation du processus"""
+        if FileSystemUtils.converter.timezone != options['timezone']:
+            FileSystemUtils.converter = TimestampConverter(options['timezone'])
+        if options['cache_path']:
+            try:
+                ShardedProcessor._worker_cache = IncrementalCache(options['cache_path'], root=root)
+            except (sqlite3.Error, OSError):
+                ShardedProcessor._worker_cache = None
+        if options['journal_parts']:
+            # Jamais d'écriture sans journal : une erreur ici arrête le traitement
+            journal_path = os.path.join(options['journal_parts'], f"{os.getpid()}.journal")
+            ShardedProcessor._worker_journal = UndoJournal(journal_path)
+    
+    @staticmethod
+    def slice_of(name, count):
+        """Tranche d'un nom de fichier : hachage du radical, pour que les membres d'un groupe restent ensemble"""
+        # crc32 plutôt que hash() : stable d'un processus à l'autre
+        return zlib.crc32(FileGrouper.group_key(name).encode('utf-8', 'surrogateescape')) % count
+    
+    @staticmethod
+    def process_shard(root, dir_path, depth, names, options):
+        """Traite une part dans un processus et retourne son résumé (compteurs, fichiers non traités, sous-répertoires)
         
-        if new_date:
-            if FileSystemUtils.set_file_timestamp(filename, new_date):
-                self.processed_files.append((filename, new_date))
-                return True
-            else:
-                self.unprocessed_files.append(filename)
-                return False
+        names=None : le répertoire est parcouru, et s'il est trop gros, seule sa première tranche est traitée
+        ici, les noms des autres tranches étant renvoyés dans le résumé ; sinon, seuls les fichiers names
+        (une tranche déjà listée : (nom, lien symbolique au listage)) sont traités, sans nouveau parcours.
+        Le répertoire est rouvert depuis la racine sans suivre de lien, et les écritures passent par son descripteur.
+        """
+        metrics = RunMetrics() if options['metrics'] else None
+        scan_filter = None
+        subdirs = []
+        slices = []
+        if names is None:
+            scan_filter = ScanFilter(**options['scan_filter']) if options['scan_filter'] else None
+        scanner = DirectoryScanner(root, max_depth=options['max_depth'], symlink_policy=options['symlink_policy'],
+                                   excluded_paths=options['excluded_paths'], scan_filter=scan_filter)
+        # Ouvert depuis la racine sans suivre de lien : le parent a été listé par un autre processus
+        handle = scanner.open_path(dir_path)
+        if handle is None and scanner.USE_DIR_FD:
+            files = []
+        elif names is None:
+            scan_start = time.perf_counter()
+            files = list(scanner.iter_directory(dir_path, depth, subdirs, handle))
+            if metrics is not None:
+                metrics.add_stage_time('scan', time.perf_counter() - scan_start)
+            
+            # Répertoire trop gros : ce processus n'en traite qu'une tranche, les autres sont redistribuées
+            if len(files) > options['split_threshold'] and options['split_count'] > 1:
+                count = min(options['split_count'], -(-len(files) // options['split_threshold']))
+                slices = [[] for _ in range(count)]
+                for entry in files:
+                    slices[ShardedProcessor.slice_of(entry.name, count)].append(entry)
+                files = slices[0]
+                # Type de lien relevé au listage : une tranche ne suit pas un fichier remplacé par un lien depuis
+                slices = [[(entry.name, entry.is_symlink()) for entry in entries] for entries in slices[1:]]
         else:
-            self.unprocessed_files.append(filename)
-            return False
+            prefix = scanner.path_prefix(dir_path, depth)
+            if handle is None:
+                files = [prefix + name for name, _ in names]
+            else:
+                files = [ScanEntry(prefix + name, name, depth, ListedEntry(name, handle.fd, symlink), handle)
+                         for name, symlink in names]
+        
+        hits_before = collections.Counter(DateTimeParser.registry.hits)
+        cache, journal = ShardedProcessor._worker_cache, ShardedProcessor._worker_journal
+        processor = AutoProcessor(workers=options['threads'], skip_unchanged=options['skip_unchanged'],
+                                  dry_run=options['dry_run'], keep_results=False, metrics=metrics, cache=cache,
+                                  journal=journal, group_by_stem=options['group_by_stem'],
+                                  metadata_fallback=options['metadata_fallback'])
+        unprocessed = []
+        try:
+            for path, new_date, status, source in processor.iter_results(files):
+                if not processor.record_result(path, new_date, status, source):
+                    unprocessed.append((path, status))
+        finally:
+            # Part terminée : ses lignes de journal et ses entrées de cache sont durables avant le résumé
+            if journal is not None:
+                journal.commit()
+            if cache is not None:
+                cache.flush()
+        
+        return {
+            'metrics': metrics.to_dict() if metrics else None,
+            'pattern_hits': dict(DateTimeParser.registry.hits - hits_before),
+            'dir_path': dir_path,
+            'depth': depth,
+            'counts': dict(processor.status_counts),
+            'sources': dict(processor.source_counts),
+            'unprocessed': unprocessed,
+            'filtered': dict(scan_filter.skipped) if scan_filter is not None else {},
+            'subdirs': subdirs,
+            'slices': slices,
+        }
     
-    def process_files_with_progress(self, files):
-        """Traite une liste de fichiers avec affichage de la progression"""
-        for i, file in enumerate(files):
-            ProgressBarRenderer.print_progress_bar(i, len(files), file)
-            self.process_file(file)
-            time.sleep(Config.PROGRESS_SLEEP_TIME)  # Petite pause pour voir la progression
+    def run(self, root):
+        """Génère les résumés de parts au fil de leur achèvement ; les processus libres prennent la part suivante"""
+        follow_dirs = self.options['symlink_policy'] == 'follow'
+        visited = set()
+        if self.options['journal_parts']:
+            os.makedirs(self.options['journal_parts'], exist_ok=True)
         
-        # Finaliser la barre de progression
-        ProgressBarRenderer.print_progress_bar(len(files), len(files), "Terminé!")
-        print("\n")
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=self.init_worker, initargs=(root, self.options)) as executor:
+            pending = {executor.submit(self.process_shard, root, root, 0, None, self.options)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    summary = future.result()
+                    depth = summary['depth']
+                    if self.metrics is not None:
+                        self.metrics.merge(summary['metrics'])
+                    # Les compteurs de motifs des processus sont rapatriés dans le registre du processus principal
+                    DateTimeParser.registry.hits.update(summary['pattern_hits'])
+                    if self.scan_filter is not None:
+                        self.scan_filter.skipped.update(summary['filtered'])
+                    
+                    for subdir in summary['subdirs']:
+                        if follow_dirs:
+                            # Protection contre les boucles de liens symboliques, centralisée ici
+                            try:
+                                dir_stat = os.stat(subdir)
+                            except OSError:
+                                continue
+                            if (dir_stat.st_dev, dir_stat.st_ino) in visited:
+                                continue
+                            visited.add((dir_stat.st_dev, dir_stat.st_ino))
+                        pending.add(executor.submit(self.process_shard, root, subdir, depth + 1, None, self.options))
+                    
+                    # Tranches d'un gros répertoire : listé une seule fois, chaque processus reçoit ses noms
+                    for names in summary['slices']:
+                        pending.add(executor.submit(self.process_shard, root, summary['dir_path'], depth, names, self.options))
+                    yield summary
 
 # ===================================
 # SECTION 7: LOGIQUE DE TRAITEMENT MANUEL
 # ===================================
 
-class ManualProcessor:
-    """Gestionnaire pour le traitement manuel des fichiers"""
+class ManualFileIndex:
+    """Index des fichiers du mode manuel : numéros stables, sélection O(1) par numéro ou par nom,
+    filtre par sous-chaîne (index de trigrammes, repli approximatif) et pagination"""
     
-    def __init__(self):
-        self.processed_files = []
+    def __init__(self, files, page_size=None):
+        self.files = list(files)
+        self.page_size = page_size or Config.MANUAL_PAGE_SIZE
+        self.number_width = len(str(len(self.files)))
+        self._numbers = {filename: number for number, filename in enumerate(self.files, 1)}
+        # Ensembles ordonnés (dict) : suppression en O(1), ordre d'origine conservé
+        self._remaining = dict.fromkeys(range(1, len(self.files) + 1))
+        self._lowered = [filename.lower() for filename in self.files]
+        self._trigrams = collections.defaultdict(set)
+        for number, lowered in enumerate(self._lowered, 1):
+            for position in range(len(lowered) - 2):
+                self._trigrams[lowered[position:position + 3]].add(number)
+        
+        self.query = ''
+        self.fuzzy = False
+        self._matches = None
+        self.page = 0
     
-    def parse_user_selection(self, choice, remaining_files):
-        """Parse la sélection utilisateur et retourne le nom du fichier sélectionné"""
+    def __len__(self):
+        return len(self._remaining)
+    
+    def remaining(self):
+        """Fichiers restants, dans l'ordre d'origine"""
+        return [self.files[number - 1] for number in self._remaining]
+    
+    def filename(self, number):
+        return self.files[number - 1]
+    
+    def number_of(self, filename):
+        """Numéro du fichier restant nommé exactement filename, ou None"""
+        number = self._numbers.get(filename)
+        return number if number in self._remaining else None
+    
+    def resolve(self, choice):
+        """Numéro du fichier restant désigné par choice (nom exact, numéro, ligne copiée du tableau), ou None"""
         choice = choice.strip()
         
         # 1. Nom exact du fichier (priorité absolue)
-        if choice in remaining_files:
-            return choice
+        number = self._numbers.get(choice)
+        if number is None:
+            # 2. Numéro pur (avec ou sans point), puis numéro dans une ligne copiée ("│ 12. nom")
+            digits = choice.rstrip('.')
+            # isdecimal et non isdigit : '²' est un chiffre pour isdigit mais int() le refuse
+            if digits.isdecimal():
+                number = int(digits)
+            else:
+                number_match = re.search(r'(\d+)\.', choice)
+                number = int(number_match.group(1)) if number_match else None
+        return number if number in self._remaining else None
+    
+    def remove(self, number):
+        """Retire un fichier traité (O(1))"""
+        self._remaining.pop(number, None)
+        if self._matches is not None:
+            self._matches.pop(number, None)
+        self.page = min(self.page, self.page_count - 1)
+    
+    def set_filter(self, query):
+        """Filtre les fichiers restants par sous-chaîne (insensible à la casse) ; '' retire le filtre
         
-        # 2. Si ligne copiée avec │, extraire juste le numéro après │
-        if '│' in choice:
-            number_match = re.search(r'│\s*(\d+)\.', choice)
-            if number_match:
-                try:
-                    file_index = int(number_match.group(1)) - 1
-                    if 0 <= file_index < len(remaining_files):
-                        return remaining_files[file_index]
-                except (ValueError, IndexError):
-                    pass
-        
-        # 3. Si c'est un numéro pur (avec ou sans point)
-        try:
-            if choice.isdigit() or (choice.endswith('.') and choice[:-1].isdigit()):
-                file_index = int(choice.rstrip('.')) - 1
-                if 0 <= file_index < len(remaining_files):
-                    return remaining_files[file_index]
-        except (ValueError, IndexError):
-            pass
+        Sans résultat exact, repli approximatif : les caractères de la recherche dans l'ordre (ex: 'i2025' -> IMG_2025...).
+        """
+        self.query = query.strip()
+        self.fuzzy = False
+        self.page = 0
+        if not self.query:
+            self._matches = None
+            return
         
-        # 4. Chercher un numéro dans la chaîne
-        number_match = re.search(r'(\d+)\.', choice)
-        if number_match:
-            try:
-                file_index = int(number_match.group(1)) - 1
-                if 0 <= file_index < len(remaining_files):
-                    return remaining_files[file_index]
-            except (ValueError, IndexError):
-                pass
+        lowered_query = self.query.lower()
+        if len(lowered_query) >= 3:
+            # Intersection des listes de trigrammes, de la plus courte à la plus longue, puis vérification
+            postings = sorted((self._trigrams.get(lowered_query[i:i + 3], set()) for i in range(len(lowered_query) - 2)), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:]) if postings[0] else set()
+            candidates = sorted(number for number in candidates if number in self._remaining)
+        else:
+            candidates = self._remaining
+        matches = [number for number in candidates if lowered_query in self._lowered[number - 1]]
+        
+        if not matches:
+            self.fuzzy = True
+            matches = [number for number in self._remaining if self._is_subsequence(lowered_query, self._lowered[number - 1])]
+        self._matches = dict.fromkeys(matches)
+    
+    @staticmethod
+    def _is_subsequence(query, text):
+        characters = iter(text)
+        return all(character in characters for character in query)
+    
+    def visible_numbers(self):
+        """Numéros des fichiers affichés (filtre compris, toutes pages), dans l'ordre d'origine"""
+        return list(self._matches if self._matches is not None else self._remaining)
+    
+    @property
+    def visible_count(self):
+        return len(self._matches if self._matches is not None else self._remaining)
+    
+    @property
+    def page_count(self):
+        return max(1, -(-self.visible_count // self.page_size))
+    
+    def turn_page(self, step):
+        self.page = min(max(self.page + step, 0), self.page_count - 1)
+    
+    def page_lines(self):
+        """Lignes numérotées de la page courante uniquement"""
+        visible = self._matches if self._matches is not None else self._remaining
+        start = self.page * self.page_size
+        return [f"  {number:>{self.number_width}}. {self.files[number - 1]}"
+                for number in itertools.islice(visible, start, start + self.page_size)]
+
+class BulkDateRules:
+    """Règles d'attribution de dates en lot du mode manuel : une date proposée par fichier visé, sans rien écrire
+    
+    Les ancres sont les fichiers déjà datés (traitement automatique, puis saisies et règles de la session).
+    L'interpolation ne considère que les ancres du même répertoire, dans l'ordre naturel des noms (IMG_9 avant IMG_10).
+    """
+    
+    INTERPOLATE = 'interpolation'
+    DIRECTORY = 'répertoire parent'
+    GLOB = 'motif'
+    
+    # Date seule dans un nom de répertoire : 2025-08-24, 2025_08_24, 2025.08.24 ou 20250824
+    DIRECTORY_DATE_PATTERN = re.compile(r'(?<!\d)(\d{4})([-_.]?)(\d{2})\2(\d{2})(?!\d)', re.ASCII)
+    NATURAL_SPLIT = re.compile(r'(\d+)', re.ASCII)
+    
+    def __init__(self, anchors=()):
+        self._anchors = collections.defaultdict(list)   # Répertoire -> [(clé de tri, date)]
+        self._directory_dates = {}
+        for path, date in anchors:
+            self.add_anchor(path, date)
+    
+    def add_anchor(self, path, date):
+        """Ajoute un fichier daté, utilisable comme voisin par l'interpolation"""
+        directory, name = os.path.split(path)
+        self._anchors[directory].append((self.natural_key(name), date))
+    
+    @classmethod
+    def natural_key(cls, name):
+        """Clé de tri naturel : les suites de chiffres comparées comme des nombres"""
+        parts = cls.NATURAL_SPLIT.split(name.lower())
+        parts[1::2] = map(int, parts[1::2])
+        return parts
+    
+    def interpolate(self, paths):
+        """Génère (chemin, date) : date répartie à intervalles réguliers entre les ancres voisines du même répertoire ;
+        avant la première ou après la dernière ancre, date de l'ancre la plus proche"""
+        targets = collections.defaultdict(list)
+        for path in paths:
+            directory, name = os.path.split(path)
+            if directory in self._anchors:
+                targets[directory].append((self.natural_key(name), path))
+        
+        for directory, items in targets.items():
+            # Fusion des ancres (chemin None) et des fichiers visés (date None) dans l'ordre naturel des noms
+            merged = sorted([(key, None, date) for key, date in self._anchors[directory]]
+                            + [(key, path, None) for key, path in items], key=lambda item: item[0])
+            previous = None
+            pending = []
+            for _, path, date in merged:
+                if path is not None:
+                    pending.append(path)
+                    continue
+                yield from self._spread(pending, previous, date)
+                pending = []
+                previous = date
+            yield from self._spread(pending, previous, None)
+    
+    @staticmethod
+    def _spread(paths, before, after):
+        """Répartit paths entre les dates before et after (l'une des deux peut manquer)"""
+        if not paths:
+            return
+        if before is None or after is None:
+            for path in paths:
+                yield path, before or after
+            return
+        step = (after - before) / (len(paths) + 1)
+        for position, path in enumerate(paths, 1):
+            yield path, (before + step * position).replace(microsecond=0)
+    
+    def parent_directory(self, paths):
+        """Génère (chemin, date) : date lue dans le nom du répertoire parent, ou du plus proche ancêtre daté"""
+        for path in paths:
+            date = self.directory_date(os.path.dirname(path))
+            if date is not None:
+                yield path, date
+    
+    def directory_date(self, directory):
+        """Date du répertoire (mémorisée) : motif complet du nom, sinon date seule à Config.MANUAL_RULE_TIME, sinon celle du parent"""
+        if directory in self._directory_dates:
+            return self._directory_dates[directory]
         
+        head, name = os.path.split(directory)
+        date = self.date_from_name(name) if name and name not in (os.curdir, os.pardir) else None
+        if date is None and head and head != directory:
+            date = self.directory_date(head)
+        self._directory_dates[directory] = date
+        return date
+    
+    @classmethod
+    def date_from_name(cls, name):
+        """Date d'un nom de répertoire, ou None"""
+        date = DateTimeParser.registry.extract(name, count=False)[0]
+        if date is not None:
+            return date
+        # Dernière date seule valide du nom, comme le repli date + heure des noms de fichiers
+        for match in reversed(list(cls.DIRECTORY_DATE_PATTERN.finditer(name))):
+            try:
+                return datetime.datetime(int(match.group(1)), int(match.group(3)), int(match.group(4)), *Config.MANUAL_RULE_TIME)
+            except ValueError:
+                continue
         return None
     
+    @staticmethod
+    def glob(paths, pattern, date):
+        """Génère (chemin, date) pour chaque fichier dont le nom correspond au motif fnmatch (sans tenir compte
+        de la casse) ; avec '/', le motif est comparé au chemin relatif"""
+        globs = GlobSet([pattern], ignore_case=True)
+        on_path = '/' in pattern
+        for path in paths:
+            value = os.path.normpath(path).replace(os.sep, '/') if on_path else os.path.basename(path)
+            if globs.match(value) is not None:
+                yield path, date
+
+class ManualProcessor:
+    """Gestionnaire pour le traitement manuel des fichiers"""
+    
+    RULE_USAGE = "=i : interpoler · =d : date du répertoire · =g motif date : même date (ex: =g *.pdf 24/08/2025 17:36)"
+    CONFIRM_ANSWERS = ('o', 'oui', 'y', 'yes')
+    
+    def __init__(self, journal=None):
+        self.processed_files = ResultStore()
+        self.journal = journal
+        # Application groupée des règles : mêmes étapes d'écriture (journal, set_file_timestamp) que le mode automatique
+        self.rule_processor = AutoProcessor(journal=journal, keep_results=False)
+        self._dated_files = ()
+        self._rules = None
+    
     def calculate_input_lines_used(self, choice):
         """Calcule le nombre de lignes utilisées par l'input utilisateur"""
         input_text = f"  Votre choix : {choice}"
@@ -535,6 +3435,17 @@ class ManualProcessor:
         for _ in range(lines_count):
             print("\033[A\033[2K\r", end="")  # Remonte d'une ligne et l'efface
     
+    def _journal_original_dates(self, filename, new_datetime):
+        """Enregistre les dates actuelles du fichier dans le journal d'annulation ; False si le fichier est illisible"""
+        if self.journal is None:
+            return True
+        try:
+            stat_result = os.stat(filename)
+        except OSError:
+            return False
+        self.journal.append(filename, stat_result, FileSystemUtils.to_ns(new_datetime))
+        return True
+    
     def process_file_manually(self, filename):
         """Traite un fichier manuellement avec saisie utilisateur"""
         print()
@@ -549,9 +3460,11 @@ class ManualProcessor:
         new_datetime = DateTimeParser.parse_manual_datetime(datetime_input)
         
         if new_datetime:
-            # Appliquer la modification sans confirmation
-            if FileSystemUtils.set_file_timestamp(filename, new_datetime):
-                self.processed_files.append((filename, new_datetime))
+            # Appliquer la modification sans confirmation (dates d'origine d'abord dans le journal d'annulation)
+            if self._journal_original_dates(filename, new_datetime) and FileSystemUtils.set_file_timestamp(filename, new_datetime):
+                self.processed_files.append(filename, new_datetime, FileStatus.CHANGED, DateSource.MANUAL)
+                if self._rules is not None:
+                    self._rules.add_anchor(filename, new_datetime)
                 date_formatted = new_datetime.strftime('%d/%m/%Y %H:%M:%S')
                 print(f"\033[A\033[2K\rFichier modifié avec succès : {Config.COLORS['purple']}{date_formatted}{Config.COLORS['reset']}")
                 return True
@@ -565,42 +3478,111 @@ class ManualProcessor:
             print(f"\033[A\033[2K\r{Config.COLORS['error_red']}Format invalide{Config.COLORS['reset']}")
             return False
     
-    def manual_timestamp_modification(self, unprocessed_files):
-        """Interface pour modifier manuellement les timestamps"""
+    @property
+    def rules(self):
+        """Règles en lot, construites à la première commande (ancres : fichiers déjà datés)"""
+        if self._rules is None:
+            self._rules = BulkDateRules(itertools.chain(self._dated_files, self.processed_files))
+        return self._rules
+    
+    def propose_dates(self, command, paths):
+        """Dates proposées par une commande de règle : (libellé de la règle, {chemin: date}) ; ValueError si invalide"""
+        name, _, argument = command.strip().partition(' ')
+        name = name.lower()
+        if name == 'i':
+            return BulkDateRules.INTERPOLATE, dict(self.rules.interpolate(paths))
+        if name == 'd':
+            return BulkDateRules.DIRECTORY, dict(self.rules.parent_directory(paths))
+        if name == 'g':
+            pattern, _, date_input = argument.strip().partition(' ')
+            new_datetime = DateTimeParser.parse_manual_datetime(date_input)
+            if pattern and new_datetime:
+                return f"{BulkDateRules.GLOB} {pattern}", dict(BulkDateRules.glob(paths, pattern, new_datetime))
+        raise ValueError(self.RULE_USAGE)
+    
+    def apply_dates(self, index, numbers, proposals):
+        """Applique les dates proposées en un lot ; retire les fichiers traités de l'index, retourne (traités, échecs)"""
+        assignments = ((index.filename(number), proposals[index.filename(number)], DateSource.RULE) for number in numbers)
+        applied = failed = 0
+        for number, (path, new_date, status, source) in zip(numbers, self.rule_processor.iter_assigned(assignments)):
+            if status in FileStatus.PROCESSED:
+                self.processed_files.append(path, new_date, status, source)
+                self.rules.add_anchor(path, new_date)
+                index.remove(number)
+                applied += 1
+            else:
+                failed += 1
+        return applied, failed
+    
+    def run_rule(self, index, command):
+        """Commande de règle sur les fichiers affichés (filtre compris) : aperçu, confirmation puis application groupée"""
+        visible = index.visible_numbers()
+        try:
+            label, proposals = self.propose_dates(command, [index.filename(number) for number in visible])
+        except ValueError as error:
+            print(f"{Config.COLORS['error_red']} {error}{Config.COLORS['reset']}")
+            input(f"{Config.COLORS['error_red']} Press Enter : {Config.COLORS['reset']}")
+            return
+        
+        numbers = [number for number in visible if index.filename(number) in proposals]
+        if not numbers:
+            print(f"{Config.COLORS['error_red']} Aucune date proposée ({label}){Config.COLORS['reset']}")
+            input(f"{Config.COLORS['error_red']} Press Enter : {Config.COLORS['reset']}")
+            return
+        
+        SystemUtils.clear_screen()
+        HeaderRenderer.print_manual_header()
+        HeaderRenderer.print_separator()
+        self.print_rule_preview(index, numbers, proposals, label, len(visible))
+        if input(f" Appliquer ces {len(numbers)} dates ? (o/N) : ").strip().lower() not in self.CONFIRM_ANSWERS:
+            print("\033[A\033[2K\rModification annulée")
+            input("Press Enter : ")
+            return
+        
+        applied, failed = self.apply_dates(index, numbers, proposals)
+        message = f"\033[A\033[2K\r{applied} {'fichier modifié' if applied <= 1 else 'fichiers modifiés'}"
+        if failed:
+            message += f", {Config.COLORS['error_red']}{failed} {'échec' if failed == 1 else 'échecs'}{Config.COLORS['reset']}"
+        print(message)
+        input("Press Enter : ")
+    
+    @staticmethod
+    def print_rule_preview(index, numbers, proposals, label, visible_count):
+        """Affiche le tableau des dates proposées (Config.MANUAL_RULE_PREVIEW_MAX lignes au plus)"""
+        lines = [f"  {number:>{index.number_width}}. {index.filename(number)} → "
+                 f"{proposals[index.filename(number)].strftime('%d/%m/%Y %H:%M:%S')}"
+                 for number in numbers[:Config.MANUAL_RULE_PREVIEW_MAX]]
+        if len(numbers) > Config.MANUAL_RULE_PREVIEW_MAX:
+            lines.append(f"  … et {len(numbers) - Config.MANUAL_RULE_PREVIEW_MAX} autres")
+        BoxRenderer.print_manual_box(f"APERÇU : {label.upper()}", "purple", lines)
+        unassigned = visible_count - len(numbers)
+        print(f"  {len(numbers)} {'date proposée' if len(numbers) == 1 else 'dates proposées'}"
+              + (f", {unassigned} {'fichier' if unassigned == 1 else 'fichiers'} sans proposition" if unassigned else ""))
+    
+    def manual_timestamp_modification(self, unprocessed_files, dated_files=()):
+        """Interface pour modifier manuellement les timestamps (dated_files : (chemin, date) déjà datés, voisins
+        de l'interpolation)"""
         if not unprocessed_files:
             return [], []
         
-        remaining_unprocessed = list(unprocessed_files)
+        index = ManualFileIndex(unprocessed_files)
+        self._dated_files = dated_files
+        self._rules = None
         
         while True:
             SystemUtils.clear_screen()
             HeaderRenderer.print_manual_header()
             HeaderRenderer.print_separator()
-            if len(remaining_unprocessed) == 1:
+            if len(index) == 1:
                 print("  Fichier restant à traiter :")
             else:
                 print("  Fichiers restants à traiter :")
             
-            # Afficher le tableau rouge des fichiers non traités (MODE MANUEL)
-            if remaining_unprocessed:
-                title = "FICHIER NON TRAITÉ" if len(remaining_unprocessed) == 1 else "FICHIERS NON TRAITÉS"
-                
-                # Calculer la largeur maximale des numéros
-                max_num = len(remaining_unprocessed)
-                max_num_width = len(str(max_num))  # Largeur du plus grand numéro
-                
-                # Créer les lignes avec espacement ajusté
-                unprocessed_lines = []
-                for i, filename in enumerate(remaining_unprocessed):
-                    current_num = i + 1
-                    current_num_width = len(str(current_num))
-                    # FORMULE CORRECTE : 2 espaces pour le plus grand + différence de longueur
-                    spaces_needed = 2 + (max_num_width - current_num_width)
-                    spaces = " " * spaces_needed
-                    formatted_line = f"{spaces}{current_num}. {filename}"
-                    unprocessed_lines.append(formatted_line)
-                
-                BoxRenderer.print_manual_box(title, "red", unprocessed_lines)
+            # Afficher le tableau rouge des fichiers non traités (MODE MANUEL), page courante uniquement
+            if len(index):
+                title = "FICHIER NON TRAITÉ" if len(index) == 1 else "FICHIERS NON TRAITÉS"
+                BoxRenderer.print_manual_box(title, "red", index.page_lines())
+                self.print_page_status(index)
                 
                 choice = input(" Votre choix : ").strip()
                 
@@ -608,20 +3590,36 @@ class ManualProcessor:
                 if not choice:
                     break
                 
-                selected_filename = self.parse_user_selection(choice, remaining_unprocessed)
+                # Nom exact d'un fichier (priorité absolue, même s'il ressemble à une commande)
+                selected_number = index.number_of(choice)
+                if selected_number is None:
+                    # Navigation et filtre : seul l'affichage change
+                    if choice.lower() in ('n', '+', '>'):
+                        index.turn_page(1)
+                        continue
+                    if choice.lower() in ('p', '-', '<'):
+                        index.turn_page(-1)
+                        continue
+                    if choice.startswith('/'):
+                        index.set_filter(choice[1:])
+                        continue
+                    if choice.startswith('='):
+                        self.run_rule(index, choice[1:])
+                        continue
+                    selected_number = index.resolve(choice)
                 
-                if selected_filename:
+                if selected_number is not None:
                     # Calculer le nombre de lignes prises par l'input
                     lines_used = self.calculate_input_lines_used(choice)
                     # Effacer toutes les lignes utilisées par l'input
                     self.clear_input_lines(lines_used)
                     
                     # Traitement du fichier sélectionné
-                    success = self.process_file_manually(selected_filename)
+                    success = self.process_file_manually(index.filename(selected_number))
                     if success:
-                        remaining_unprocessed.remove(selected_filename)
+                        index.remove(selected_number)
                     
-                    if remaining_unprocessed:
+                    if len(index):
                         input("Press Enter : ")
                 else:
                     print(f"{Config.COLORS['error_red']} Sélection invalide,{Config.COLORS['reset']}")
@@ -634,7 +3632,17 @@ class ManualProcessor:
                 input("Press Enter : ")
                 break
         
-        return self.processed_files, remaining_unprocessed
+        return self.processed_files, index.remaining()
+    
+    @staticmethod
+    def print_page_status(index):
+        """Affiche la position dans la liste, le filtre actif et les commandes disponibles"""
+        status = f"  Page {index.page + 1}/{index.page_count} · {index.visible_count} fichier(s)"
+        if index.query:
+            status += f" · filtre {'approché ' if index.fuzzy else ''}« {index.query} »"
+        commands = "n/p : page suivante/précédente · /texte : filtrer · / : tout afficher" if index.page_count > 1 or index.query else ""
+        print(status + (f"  ({commands})" if commands else ""))
+        print(f"  Règles (fichiers affichés) : {ManualProcessor.RULE_USAGE}")
 
 # ===================================
 # SECTION 8: GESTIONNAIRE DE RÉSULTATS
@@ -643,20 +3651,127 @@ class ManualProcessor:
 class ResultsDisplayManager:
     """Gestionnaire pour l'affichage des résultats finaux"""
     
+    @staticmethod
+    def write_listing(sections, unprocessed_files, path=None):
+        """Écrit la liste complète (statut, date, origine de la date, chemin séparés par des tabulations) ;
+        retourne le chemin ou None en cas d'échec. sections : liste de (fichiers traités, couleur), les fichiers étant des (chemin, date)"""
+        path = path or Config.RESULTS_LISTING_FILENAME
+        statuses = {'green': 'auto', 'yellow': 'manuel'}
+        try:
+            with open(path, 'w', encoding='utf-8', buffering=1 << 20) as stream:
+                stream.write("statut\tdate\torigine\tfichier\n")
+                for files, color in sections:
+                    status = statuses.get(color, color)
+                    if isinstance(files, ResultStore):
+                        rows = ((filename, date, source or '') for filename, date, _, source in files.records())
+                    else:
+                        rows = ((filename, date, '') for filename, date in files)
+                    stream.writelines(f"{status}\t{date.isoformat(' ', 'seconds')}\t{source}\t{filename}\n" for filename, date, source in rows)
+                stream.writelines(f"non traité\t\t\t{filename}\n" for filename in unprocessed_files)
+        except OSError:
+            return None
+        return path
+    
+    @staticmethod
+    def _day_counts(files):
+        """Nombre de fichiers par jour (calculé sur les colonnes pour un ResultStore)"""
+        if isinstance(files, ResultStore):
+            return files.day_counts()
+        return collections.Counter(date.date() for _, date in files)
+    
+    @staticmethod
+    def _period_counts(sections):
+        """Répartition par jour, ou par mois / par année si les jours distincts dépassent RESULTS_SUMMARY_ROWS"""
+        days = collections.Counter()
+        for files, _ in sections:
+            days.update(ResultsDisplayManager._day_counts(files))
+        counts = {day.isoformat(): count for day, count in days.items()}  # Formatage une fois par jour distinct
+        for label, width in (("jour", 10), ("mois", 7), ("année", 4)):
+            periods = collections.Counter()
+            for key, count in counts.items():
+                periods[key[:width]] += count
+            if len(periods) <= Config.RESULTS_SUMMARY_ROWS:
+                return label, sorted(periods.items())
+
+        # Trop d'années distinctes : regroupement en plages d'années consécutives
+        years = sorted(periods.items())
+        step = -(-len(years) // Config.RESULTS_SUMMARY_ROWS)
+        ranges = [years[i:i + step] for i in range(0, len(years), step)]
+        return "période", [(f"{group[0][0]}-{group[-1][0]}", sum(count for _, count in group)) for group in ranges]
+    
+    @staticmethod
+    def _head_and_tail(sections, render, hidden_line):
+        """Premières et dernières RESULTS_TOP_N entrées de sections (liste de (fichiers, couleur)) rendues,
+        séparées par une ligne indiquant le nombre masqué ; seules ces entrées sont lues"""
+        top_n = Config.RESULTS_TOP_N
+        head, tail = [], []
+        for files, color in sections:
+            head.extend((item, color) for item in files[:top_n - len(head)])
+        for files, color in reversed(sections):
+            wanted = top_n - len(tail)
+            if wanted:
+                tail[:0] = [(item, color) for item in files[-wanted:]]
+        hidden = sum(len(files) for files, _ in sections) - 2 * top_n
+        return [render(*item) for item in head] + [hidden_line(hidden)] + [render(*item) for item in tail]
+    
+    @staticmethod
+    def summary_lines(sections, listing_path):
+        """Résumé d'un grand nombre de fichiers traités : répartition par période, premiers et derniers fichiers (ligne, couleur)"""
+        label, periods = ResultsDisplayManager._period_counts(sections)
+        total = sum(len(files) for files, _ in sections)
+        lines = [(f"{total} fichiers traités, répartition par {label} :", "green")]
+        lines.extend((f"  {period:<10} {count:>9} {'fichier' if count == 1 else 'fichiers'}", "green") for period, count in periods)
+        lines.append(("", "green"))
+        lines.append((f"{Config.RESULTS_TOP_N} premiers et {Config.RESULTS_TOP_N} derniers fichiers :", "green"))
+        lines.extend(ResultsDisplayManager._head_and_tail(
+            sections,
+            lambda item, color: (TextFormatter.format_file_line_with_date(item[0], item[1]), color),
+            lambda hidden: (f"  … {hidden} autres fichiers …", "green")))
+        lines.append(("", "green"))
+        lines.append((ResultsDisplayManager._listing_message(listing_path), "green"))
+        return lines
+    
+    @staticmethod
+    def unprocessed_lines(unprocessed_files, listing_path):
+        """Lignes de l'encadré des fichiers non traités (premiers et derniers seulement au-delà de RESULTS_FULL_LIST_MAX)"""
+        if len(unprocessed_files) <= Config.RESULTS_FULL_LIST_MAX:
+            return [f" — {filename}" for filename in unprocessed_files]
+        return ResultsDisplayManager._head_and_tail(
+            [(unprocessed_files, "red")],
+            lambda filename, _: f" — {filename}",
+            lambda hidden: f" — … {hidden} autres fichiers … ({ResultsDisplayManager._listing_message(listing_path)})")
+    
+    @staticmethod
+    def _listing_message(listing_path):
+        """Indique où trouver la liste complète"""
+        if listing_path is None:
+            return "Liste complète non écrite (répertoire non accessible en écriture)"
+        return f"Liste complète : {listing_path}"
+    
+    @staticmethod
+    def _needs_summary(processed_count, unprocessed_count):
+        """Vrai si l'une des listes est trop longue pour être affichée en entier"""
+        return max(processed_count, unprocessed_count) > Config.RESULTS_FULL_LIST_MAX
+    
     @staticmethod
     def show_initial_results(processed_files, unprocessed_files):
         """Affiche les résultats du traitement automatique initial"""
         if not processed_files:  # Si aucun fichier n'a été traité automatiquement
-            print(f"{Config.COLORS['error_red']}Aucun fichier n'a été traité automatiquement. Vérifiez que vos fichiers contiennent date (8 chiffres) et heure (6 chiffres)")
+            print(f"{Config.COLORS['error_red']}Aucun fichier n'a été traité automatiquement. Vérifiez que vos fichiers contiennent une date et une heure (ex: 20251011_153000)")
             input(f"Press Enter : {Config.COLORS['reset']}")
             print("\033[A\033[2K\r") 
         
+        # Au-delà de RESULTS_FULL_LIST_MAX fichiers, la liste complète va dans un fichier et l'écran n'affiche qu'un résumé
+        listing_path = None
+        if ResultsDisplayManager._needs_summary(len(processed_files), len(unprocessed_files)):
+            listing_path = ResultsDisplayManager.write_listing([(processed_files, "green")], unprocessed_files)
+        
         # Afficher les fichiers traités avec encadré vert
         if processed_files:
-            processed_lines = []
-            for filename, date in processed_files:
-                formatted_line = TextFormatter.format_file_line_with_date(filename, date)
-                processed_lines.append(formatted_line)
+            if len(processed_files) > Config.RESULTS_FULL_LIST_MAX:
+                processed_lines = [line for line, _ in ResultsDisplayManager.summary_lines([(processed_files, "green")], listing_path)]
+            else:
+                processed_lines = [TextFormatter.format_file_line_with_date(filename, date) for filename, date in processed_files]
             title = "FICHIER TRAITÉ" if len(processed_files) == 1 else "FICHIERS TRAITÉS"
             BoxRenderer.print_auto_box(title, "green", processed_lines)
         
@@ -677,7 +3792,7 @@ class ResultsDisplayManager:
             
             # Déterminer le titre selon le nombre de fichiers (MODE AUTO)
             title = "FICHIER NON TRAITÉ" if len(unprocessed_files) == 1 else "FICHIERS NON TRAITÉS"
-            unprocessed_lines = [f" — {filename}" for filename in unprocessed_files]
+            unprocessed_lines = ResultsDisplayManager.unprocessed_lines(unprocessed_files, listing_path)
             BoxRenderer.print_auto_box(title, "red", unprocessed_lines)
             
             print()
@@ -691,33 +3806,33 @@ class ResultsDisplayManager:
         HeaderRenderer.print_header()
         HeaderRenderer.print_separator()
         
-        all_processed = auto_processed + manual_processed
+        # Fichiers traités automatiquement (vert) puis manuellement (jaune), parcourus sans copie
+        sections = [(auto_processed, "green"), (manual_processed, "yellow")]
+        processed_count = len(auto_processed) + len(manual_processed)
+        
+        listing_path = None
+        if ResultsDisplayManager._needs_summary(processed_count, len(unprocessed_files)):
+            listing_path = ResultsDisplayManager.write_listing(sections, unprocessed_files)
         
         # Afficher tous les fichiers traités avec couleurs distinctes
-        if all_processed:
-            processed_lines = []
-            
-            # Fichiers traités automatiquement (vert)
-            for filename, date in auto_processed:
-                formatted_line = TextFormatter.format_file_line_with_date(filename, date)
-                processed_lines.append((formatted_line, "green"))
-            
-            # Fichiers traités manuellement (jaune)
-            for filename, date in manual_processed:
-                formatted_line = TextFormatter.format_file_line_with_date(filename, date)
-                processed_lines.append((formatted_line, "yellow"))
+        if processed_count:
+            if processed_count > Config.RESULTS_FULL_LIST_MAX:
+                processed_lines = ResultsDisplayManager.summary_lines(sections, listing_path)
+            else:
+                processed_lines = [(TextFormatter.format_file_line_with_date(filename, date), color)
+                                   for files, color in sections for filename, date in files]
             
             # Déterminer le titre
-            title = "FICHIER TRAITÉ" if len(all_processed) == 1 else "FICHIERS TRAITÉS"
+            title = "FICHIER TRAITÉ" if processed_count == 1 else "FICHIERS TRAITÉS"
             BoxRenderer.print_mixed_box(title, processed_lines)
         
         # Afficher les fichiers encore non traités - TABLEAU ROUGE SÉPARÉ
         if unprocessed_files:
-            if all_processed:
+            if processed_count:
                 print()
             
             title = "FICHIER NON TRAITÉ" if len(unprocessed_files) == 1 else "FICHIERS NON TRAITÉS"
-            unprocessed_lines = [f" — {filename}" for filename in unprocessed_files]
+            unprocessed_lines = ResultsDisplayManager.unprocessed_lines(unprocessed_files, listing_path)
             BoxRenderer.print_auto_box(title, "red", unprocessed_lines)  # ← TABLEAU ROUGE SÉPARÉ !
 
 # ===================================
@@ -727,14 +3842,45 @@ class ResultsDisplayManager:
 class ApplicationManager:
     """Gestionnaire principal de l'application"""
     
-    def __init__(self):
-        self.auto_processor = AutoProcessor()
-        self.manual_processor = ManualProcessor()
+    def __init__(self, cache=None, journal=None):
+        self.auto_processor = AutoProcessor(cache=cache, journal=journal)
+        self.manual_processor = ManualProcessor(journal=journal)
+    
+    def display_directory_info(self, file_count, current_dir):
+        """Affiche les informations sur le répertoire et le nombre de fichiers trouvés"""
+        message = f"{file_count} {'fichier' if file_count == 1 else 'fichiers'} {'trouvé' if file_count == 1 else 'trouvés'} dans {current_dir}"
+        print(message)
+        print()
     
-    def display_directory_info(self, files, current_dir):
-        """Affiche les informations sur le répertoire et les fichiers trouvés"""
-        message = f"{len(files)} {'fichier' if len(files) == 1 else 'fichiers'} {'trouvé' if len(files) == 1 else 'trouvés'} dans {current_dir}"
+    def display_filter_counts(self, skipped):
+        """Affiche les fichiers et répertoires écartés par les filtres du parcours, par règle"""
+        total = sum(skipped.values())
+        if not total:
+            return
+        details = ", ".join(f"{rule} : {count}" for rule, count in skipped.most_common())
+        print(f"{total} {'ignoré' if total == 1 else 'ignorés'} par les filtres ({details})")
+        print()
+    
+    def display_status_counts(self, status_counts, source_counts=None):
+        """Affiche le détail modifiés / déjà corrects / échecs du traitement automatique, et les dates lues dans les métadonnées"""
+        changed = status_counts[FileStatus.CHANGED]
+        matched = status_counts[FileStatus.MATCHED]
+        cached = status_counts[FileStatus.CACHED]
+        failed = status_counts[FileStatus.FAILED]
+        if not (changed or matched or cached or failed):
+            return
+        message = (f"{changed} {'modifié' if changed <= 1 else 'modifiés'}, "
+                   f"{matched} déjà {'correct' if matched <= 1 else 'corrects'}, ")
+        if cached:
+            message += f"{cached} {'inchangé' if cached == 1 else 'inchangés'} depuis la dernière exécution, "
+        message += f"{failed} {'échec' if failed <= 1 else 'échecs'}"
         print(message)
+        
+        exif = (source_counts or {}).get(DateSource.EXIF, 0)
+        quicktime = (source_counts or {}).get(DateSource.QUICKTIME, 0)
+        if exif or quicktime:
+            print(f"Dont {exif + quicktime} {'daté' if exif + quicktime == 1 else 'datés'} par les métadonnées du fichier "
+                  f"(EXIF : {exif}, QuickTime : {quicktime})")
         print()
     
     def should_enter_manual_mode(self, unprocessed_files):
@@ -817,17 +3963,20 @@ def manual_timestamp_modification(unprocessed_files):
 # SECTION 11: WORKFLOWS & ORCHESTRATION
 # ===================================
 
-def auto_timestamp_workflow(files):
-    """Gère tout le workflow de traitement automatique"""
+def auto_timestamp_workflow(files, cache=None, journal=None, scan_filter=None):
+    """Gère tout le workflow de traitement automatique (liste ou flux de fichiers)"""
     # Initialisation
-    app_manager = ApplicationManager()
+    app_manager = ApplicationManager(cache=cache, journal=journal)
     current_dir = os.getcwd()
     
-    # Affichage des informations
-    app_manager.display_directory_info(files, current_dir)
+    # Traitement automatique avec barre de progression, au fil du parcours
+    file_count = app_manager.auto_processor.process_files_with_progress(files)
     
-    # Traitement automatique avec barre de progression  
-    app_manager.auto_processor.process_files_with_progress(files)
+    # Affichage des informations
+    app_manager.display_directory_info(file_count, current_dir)
+    if scan_filter is not None:
+        app_manager.display_filter_counts(scan_filter.skipped)
+    app_manager.display_status_counts(app_manager.auto_processor.status_counts, app_manager.auto_processor.source_counts)
     
     # Affichage des résultats initiaux
     HeaderRenderer.print_separator()
@@ -845,7 +3994,8 @@ def manual_timestamp_workflow(app_manager):
     if app_manager.should_enter_manual_mode(app_manager.auto_processor.unprocessed_files):
         # Modification manuelle
         manual_processed, remaining_unprocessed = app_manager.manual_processor.manual_timestamp_modification(
-            app_manager.auto_processor.unprocessed_files
+            app_manager.auto_processor.unprocessed_files,
+            app_manager.auto_processor.processed_files
         )
         
         # Mise à jour des listes
@@ -860,36 +4010,751 @@ def manual_timestamp_workflow(app_manager):
     
     return manual_processed
 
+async def apply_timestamps(paths, concurrency=None, **processor_options):
+    """Applique les dates d'un ensemble de fichiers depuis du code asyncio ; retourne la liste des (chemin, date, statut, origine)"""
+    processor = AsyncAutoProcessor(concurrency=concurrency, **processor_options)
+    return [result async for result in processor.iter_results(paths)]
+
+def iter_timestamps(paths, concurrency=None, **processor_options):
+    """Itérateur asynchrone des résultats (chemin, date, statut, origine), au fil du traitement"""
+    return AsyncAutoProcessor(concurrency=concurrency, **processor_options).iter_results(paths)
+
 def process_directory():
     """Point d'entrée principal - Orchestration simple"""
     # 1. Initialisation de l'interface
+    SystemUtils.backend.prepare_console()
     SystemUtils.clear_screen()
     SystemUtils.maximize_cmd()
     HeaderRenderer.print_header()
     HeaderRenderer.print_separator()
     
-    # 2. Vérification des fichiers
-    current_dir = os.getcwd()
-    files = FileSystemUtils.get_files_in_directory(current_dir)
+    # 2. Vérification des fichiers (le parcours est paresseux, on ne lit que le premier)
+    excluded_paths = ([__file__, Config.RESULTS_LISTING_FILENAME] + IncrementalCache.owned_paths(Config.CACHE_FILENAME)
+                      + UndoJournal.owned_paths(Config.JOURNAL_FILENAME))
+    scan_filter = ScanFilter.from_config()
+    scanner = DirectoryScanner(os.curdir, max_depth=Config.SCAN_MAX_DEPTH, excluded_paths=excluded_paths, scan_filter=scan_filter)
+    files = scanner.scan()
+    first_file = next(files, None)
     
-    if not files:
+    if first_file is None:
         print(f'{Config.COLORS["error_red"]}Aucun fichier trouvé dans le répertoire{Config.COLORS["reset"]}')
         input("Press Enter : ")
         return
     
-    # 3. Workflow automatique
-    app_manager = auto_timestamp_workflow(files)
-    
-    # 4. Workflow manuel (si nécessaire)  
-    manual_processed = manual_timestamp_workflow(app_manager)
+    # 3. Workflow automatique (sans cache ni journal si le répertoire n'est pas accessible en écriture)
+    cache = None
+    if Config.CACHE_ENABLED:
+        try:
+            cache = IncrementalCache(Config.CACHE_FILENAME)
+        except (sqlite3.Error, OSError):
+            cache = None
+    journal = None
+    if Config.JOURNAL_ENABLED:
+        try:
+            journal = UndoJournal(Config.JOURNAL_FILENAME)
+        except OSError:
+            journal = None
+    try:
+        try:
+            app_manager = auto_timestamp_workflow(itertools.chain([first_file], files), cache, journal, scan_filter)
+        finally:
+            if cache is not None:
+                cache.close()
+        
+        # 4. Workflow manuel (si nécessaire)  
+        manual_processed = manual_timestamp_workflow(app_manager)
+    finally:
+        if journal is not None:
+            journal.close()
     
     # 5. Affichage du statut final
-    all_processed = app_manager.auto_processor.processed_files + manual_processed
-    app_manager.show_final_status(all_processed)
+    app_manager.show_final_status(app_manager.auto_processor.processed_files or manual_processed)
+
+# ===================================
+# SECTION 12: MODE BATCH (SANS INTERFACE)
+# ===================================
+
+class BatchResultWriter:
+    """Écrit un enregistrement par fichier (JSONL ou CSV) au fil du traitement"""
+    
+    FORMATS = ('jsonl', 'csv')
+    CSV_FIELDS = ('path', 'status', 'timestamp', 'source')
+    
+    def __init__(self, stream, output_format='jsonl'):
+        self.stream = stream
+        self.output_format = output_format
+        self._csv_writer = None
+        if output_format == 'csv':
+            self._csv_writer = csv.writer(stream)
+            self._csv_writer.writerow(self.CSV_FIELDS)
+    
+    def write(self, path, new_date, status, source=None):
+        """Écrit le résultat d'un fichier (source : origine de la date, voir DateSource)"""
+        timestamp = new_date.isoformat() if new_date else None
+        if self._csv_writer is not None:
+            self._csv_writer.writerow((path, status, timestamp or "", source or ""))
+        else:
+            self.stream.write(json.dumps({'path': path, 'status': status, 'timestamp': timestamp, 'source': source},
+                                         ensure_ascii=False) + "\n")
+
+    def flush(self):
+        self.stream.flush()
+
+class TimestampPlan:
+    """Fichier de plan : une ligne JSON par fichier à modifier, lu et écrit en flux (mémoire constante)"""
+    
+    FORMAT_NAME = 'auto-timestamp-plan'
+    VERSION = 1
+    
+    @staticmethod
+    def write_header(stream):
+        """Écrit l'en-tête identifiant le format du plan"""
+        stream.write(json.dumps({'format': TimestampPlan.FORMAT_NAME, 'version': TimestampPlan.VERSION}) + "\n")
+    
+    @staticmethod
+    def write_record(stream, path, stat_result, new_date):
+        """Écrit une ligne [chemin, atime_ns actuel, mtime_ns actuel, date cible ISO]"""
+        # Date écrite avec son décalage UTC : le plan s'applique à l'identique quel que soit le fuseau de la machine
+        record = [path, stat_result.st_atime_ns, stat_result.st_mtime_ns, FileSystemUtils.converter.to_aware(new_date).isoformat()]
+        stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+    
+    @staticmethod
+    def read_records(stream, shard_index=0, shard_count=1):
+        """Génère les lignes (chemin, atime_ns, mtime_ns, date) d'un plan, éventuellement d'une seule part"""
+        header = json.loads(stream.readline() or 'null')
+        if not isinstance(header, dict) or header.get('format') != TimestampPlan.FORMAT_NAME:
+            raise ValueError("Fichier de plan invalide (en-tête manquant)")
+        if header.get('version') != TimestampPlan.VERSION:
+            raise ValueError(f"Version de plan non supportée : {header.get('version')}")
+        
+        for index, line in enumerate(stream):
+            if index % shard_count != shard_index or not line.strip():
+                continue
+            path, atime_ns, mtime_ns, target = json.loads(line)
+            yield path, atime_ns, mtime_ns, datetime.datetime.fromisoformat(target)
+
+class InotifyWatcher:
+    """Surveillance Linux par inotify (via ctypes) des fichiers fermés après écriture ou déplacés dans les répertoires"""
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, longueur du nom
+    READ_SIZE = 64 * 1024
+    
+    @staticmethod
+    def available():
+        """Indique si inotify est utilisable sur ce système"""
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            return hasattr(ctypes.CDLL(None), 'inotify_init1')
+        except OSError:
+            return False
+    
+    def __init__(self, roots, max_depth=None, scan_filter=None):
+        self.roots = list(roots)
+        self.max_depth = max_depth
+        # Répertoires exclus jamais surveillés ; les fichiers sont filtrés au moment de leur traitement (WatchDaemon)
+        self._dir_filter = scan_filter.directory_filter() if scan_filter is not None else None
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._watches = {}  # wd -> (répertoire, profondeur, racine)
+        try:
+            for root in self.roots:
+                self._add_tree(root, 0, root, collect=False)
+        except OSError:
+            self.close()
+            raise
+    
+    def _add_watch(self, dir_path, depth, root):
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_ONLYDIR
+        if self.max_depth is None or depth < self.max_depth:
+            mask |= self.IN_CREATE  # Sous-répertoires créés pendant la surveillance
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dir_path), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), dir_path)
+        self._watches[wd] = (dir_path, depth, root)
+    
+    def _add_tree(self, dir_path, depth, root, collect):
+        """Surveille dir_path et ses sous-répertoires ; collect=True retourne les fichiers déjà présents
+        (arrivés dans un nouveau répertoire avant que sa surveillance ne commence)"""
+        self._add_watch(dir_path, depth, root)
+        found = []
+        subdirs = []
+        scanner = DirectoryScanner(root, max_depth=self.max_depth, symlink_policy='skip', scan_filter=self._dir_filter)
+        for entry in scanner.iter_directory(dir_path, depth, subdirs):
+            if collect:
+                found.append(self._join(dir_path, entry.name))
+        for subdir in subdirs:
+            try:
+                found.extend(self._add_tree(subdir, depth + 1, root, collect))
+            except OSError as error:
+                print(f"Surveillance impossible : {subdir} ({error.strerror})", file=sys.stderr)
+        return found
+    
+    @staticmethod
+    def _join(dir_path, name):
+        return name if dir_path == os.curdir else os.path.join(dir_path, name)
+    
+    def read_events(self, timeout):
+        """Attend au plus timeout secondes (None = sans limite) ; retourne (chemins arrivés, débordement de la file)"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return [], False
+        try:
+            data = os.read(self.fd, self.READ_SIZE)
+        except BlockingIOError:
+            return [], False
+        
+        paths = []
+        overflow = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            
+            if mask & self.IN_Q_OVERFLOW:
+                # File du noyau pleine : des événements sont perdus, l'appelant reparcourt les répertoires
+                overflow = True
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            watch = self._watches.get(wd)
+            if watch is None or not name:
+                continue
+            
+            dir_path, depth, root = watch
+            path = self._join(dir_path, name)
+            if mask & self.IN_ISDIR:
+                if (self.max_depth is None or depth < self.max_depth) and self._accepts_dir(dir_path, name, root):
+                    try:
+                        paths.extend(self._add_tree(path, depth + 1, root, collect=True))
+                    except OSError:
+                        pass
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                paths.append(path)
+        return paths, overflow
+    
+    def _accepts_dir(self, dir_path, name, root):
+        """Applique les règles d'exclusion à un répertoire créé pendant la surveillance"""
+        if self._dir_filter is None:
+            return True
+        rel_prefix = '' if dir_path == root else os.path.join(os.path.relpath(dir_path, root), '')
+        return self._dir_filter.accepts_dir(name, rel_prefix)
+    
+    def acknowledge(self, paths):
+        """Les écritures de dates ne déclenchent pas d'événement inotify surveillé : rien à faire"""
+    
+    def rescan(self):
+        """Génère tous les fichiers des répertoires surveillés (après un débordement)"""
+        for dir_path, depth, root in list(self._watches.values()):
+            scanner = DirectoryScanner(root, max_depth=depth, symlink_policy='skip')
+            for entry in scanner.iter_directory(dir_path, depth, []):
+                yield self._join(dir_path, entry.name)
+    
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingWatcher:
+    """Repli sans inotify : scrutation périodique des répertoires (fichiers nouveaux ou de taille/mtime modifiée)"""
+    
+    def __init__(self, roots, max_depth=None, interval=None, scan_filter=None):
+        self.roots = list(roots)
+        self.max_depth = max_depth
+        self._dir_filter = scan_filter.directory_filter() if scan_filter is not None else None
+        self.interval = interval or Config.WATCH_POLL_INTERVAL
+        # Les fichiers déjà présents au démarrage ne sont pas signalés
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + self.interval
+    
+    def _take_snapshot(self):
+        snapshot = {}
+        for root in self.roots:
+            for entry in DirectoryScanner(root, max_depth=self.max_depth, symlink_policy='skip', scan_filter=self._dir_filter).scan():
+                try:
+                    stat_result = entry.stat()
+                except OSError:
+                    continue
+                snapshot[entry.path] = (stat_result.st_size, stat_result.st_mtime_ns)
+        return snapshot
+    
+    def read_events(self, timeout):
+        """Attend la prochaine scrutation (ou timeout secondes) ; retourne (chemins nouveaux ou modifiés, False)"""
+        delay = max(0.0, self._next_poll - time.monotonic())
+        if timeout is not None and timeout < delay:
+            time.sleep(timeout)
+            return [], False
+        time.sleep(delay)
+        self._next_poll = time.monotonic() + self.interval
+        
+        snapshot = self._take_snapshot()
+        previous = self._snapshot
+        self._snapshot = snapshot
+        return [path for path, signature in snapshot.items() if previous.get(path) != signature], False
+    
+    def acknowledge(self, paths):
+        """Relève la nouvelle mtime des fichiers traités : les dates écrites ne sont pas signalées comme modifications"""
+        for path in paths:
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                continue
+            self._snapshot[path] = (stat_result.st_size, stat_result.st_mtime_ns)
+    
+    def rescan(self):
+        return iter(self._snapshot)
+    
+    def close(self):
+        pass
+
+class WatchDaemon:
+    """Boucle du mode surveillance : anti-rebond par fichier, file d'attente bornée, traitement par petits lots"""
+    
+    def __init__(self, watcher, processor, on_result, debounce=None, batch_size=None, max_pending=None,
+                 excluded_paths=(), scan_filter=None):
+        self.watcher = watcher
+        # Règles de filtrage appliquées aux fichiers stabilisés (taille et âge définitifs)
+        self.scan_filter = scan_filter
+        self.processor = processor
+        self.on_result = on_result
+        self.debounce = Config.WATCH_DEBOUNCE if debounce is None else debounce
+        self.batch_size = batch_size or Config.WATCH_BATCH_SIZE
+        self.max_pending = max_pending or Config.WATCH_MAX_PENDING
+        self._excluded_paths = {os.path.normcase(os.path.abspath(p)) for p in excluded_paths}
+        # Chemin -> instant du dernier événement, du plus ancien au plus récent
+        self._pending = collections.OrderedDict()
+    
+    def _add(self, paths, now):
+        for path in paths:
+            if self._excluded_paths and os.path.normcase(os.path.abspath(path)) in self._excluded_paths:
+                continue
+            # Un nouvel événement repousse le traitement du fichier (écriture encore en cours)
+            self._pending.pop(path, None)
+            self._pending[path] = now
+    
+    def _take_batch(self, now):
+        """Retire un lot de fichiers stabilisés ; si la file déborde, les plus anciens partent sans attendre"""
+        batch = []
+        for path, last_event in self._pending.items():
+            if len(batch) >= self.batch_size:
+                break
+            if now - last_event < self.debounce and len(self._pending) - len(batch) <= self.max_pending:
+                break
+            batch.append(path)
+        for path in batch:
+            del self._pending[path]
+        return batch
+    
+    def _relative_path(self, path):
+        """Chemin relatif à la racine surveillée qui le contient (motifs de filtrage avec '/')"""
+        for root in self.watcher.roots:
+            if root == os.curdir:
+                return path
+            prefix = os.path.join(root, '')
+            if path.startswith(prefix):
+                return path[len(prefix):]
+        return path
+    
+    def _next_timeout(self, now):
+        """Délai avant que le plus ancien fichier en attente soit stabilisé (None : rien en attente, attente bloquante)"""
+        if not self._pending:
+            return None
+        return max(0.0, next(iter(self._pending.values())) + self.debounce - now)
+    
+    def run_once(self):
+        """Traite un lot prêt, sinon attend des événements ; retourne le nombre de fichiers traités"""
+        batch = self._take_batch(time.monotonic())
+        if batch:
+            # Fichiers temporaires déjà renommés ou supprimés
+            batch = [path for path in batch if os.path.lexists(path)]
+            if self.scan_filter is not None:
+                batch = [path for path in batch if self.scan_filter.accepts_path(path, self._relative_path(path))]
+            for result in self.processor.iter_results(batch):
+                self.processor.record_result(*result)
+                self.on_result(*result)
+            self.watcher.acknowledge(batch)
+            return len(batch)
+        
+        paths, overflow = self.watcher.read_events(self._next_timeout(time.monotonic()))
+        if overflow:
+            print("File d'événements saturée : nouveau parcours des répertoires surveillés", file=sys.stderr)
+            paths = itertools.chain(paths, self.watcher.rescan())
+        self._add(paths, time.monotonic())
+        return 0
+    
+    def run(self):
+        """Surveille jusqu'à KeyboardInterrupt (Ctrl+C ou SIGTERM)"""
+        while True:
+            self.run_once()
+
+def _parse_shard(value):
+    """Convertit 'K/N' (K de 1 à N) en (index, nombre de parts)"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("format attendu : K/N, par exemple 2/4")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError("K doit être compris entre 1 et N")
+    return index - 1, count
+
+def _parse_with_unit(value, units, example):
+    """Convertit un nombre suivi d'une unité facultative (units : suffixe -> multiplicateur) en entier"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([a-zA-Z]*)', value.strip())
+    if not match or match.group(2).lower() not in units:
+        raise argparse.ArgumentTypeError(f"format attendu : nombre suivi de {', '.join(u for u in units if u)}, par exemple {example}")
+    return int(float(match.group(1)) * units[match.group(2).lower()])
+
+def _parse_size(value):
+    """Convertit une taille ('500', '10k', '5M', '1G') en octets"""
+    return _parse_with_unit(value, {'': 1, 'k': 2**10, 'm': 2**20, 'g': 2**30}, '10k')
+
+def _parse_age(value):
+    """Convertit une durée ('90', '30s', '10m', '2h', '7d') en secondes"""
+    return _parse_with_unit(value, {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}, '2h')
+
+def _parse_extensions(value):
+    """Convertit 'jpg,mp4' en liste d'extensions"""
+    return [extension.strip() for extension in value.split(',') if extension.strip()]
+
+def build_argument_parser():
+    """Construit le parseur d'arguments du mode batch"""
+    parser = argparse.ArgumentParser(
+        prog="auto_timestamp.py",
+        description="Mode batch non interactif : applique les dates extraites des noms de fichiers, "
+                    "sans interface, avec un enregistrement par fichier en sortie.",
+        epilog="Sans argument, le script démarre en mode interactif dans le répertoire courant."
+    )
+    parser.add_argument('paths', nargs='*', default=[os.curdir], help="Fichiers ou répertoires à traiter (défaut : répertoire courant)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Parcourir les sous-répertoires")
+    parser.add_argument('--max-depth', type=int, default=None, help="Profondeur maximale avec --recursive (défaut : illimitée)")
+    parser.add_argument('-n', '--dry-run', action='store_true', help="Afficher les dates sans modifier les fichiers")
+    parser.add_argument('--timezone', metavar='FUSEAU', help="Fuseau des dates lues dans les noms : UTC, +02:00 ou nom IANA (défaut : heure locale)")
+    parser.add_argument('-f', '--format', choices=BatchResultWriter.FORMATS, default='jsonl', help="Format de sortie (défaut : jsonl)")
+    parser.add_argument('-o', '--output', help="Fichier de sortie (défaut : sortie standard)")
+    parser.add_argument('-w', '--workers', type=int, default=Config.APPLY_WORKERS, help=f"Nombre de threads d'écriture (défaut : {Config.APPLY_WORKERS})")
+    parser.add_argument('--include', action='append', default=[], metavar='MOTIF',
+                        help="Ne traiter que les fichiers correspondant au motif (fnmatch, répétable ; avec / : chemin relatif)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='MOTIF',
+                        help="Ignorer les fichiers et répertoires correspondant au motif (s'ajoute à Config.SCAN_EXCLUDE)")
+    parser.add_argument('--include-ext', action='extend', type=_parse_extensions, default=[], metavar='EXT',
+                        help="Ne traiter que ces extensions (ex: jpg,mp4)")
+    parser.add_argument('--exclude-ext', action='extend', type=_parse_extensions, default=[], metavar='EXT',
+                        help="Ignorer ces extensions (ex: tmp,part)")
+    parser.add_argument('--min-size', type=_parse_size, metavar='TAILLE', help="Ignorer les fichiers plus petits (ex: 10k)")
+    parser.add_argument('--max-size', type=_parse_size, metavar='TAILLE', help="Ignorer les fichiers plus gros (ex: 2G)")
+    parser.add_argument('--min-age', type=_parse_age, metavar='DURÉE',
+                        help="Ignorer les fichiers modifiés depuis moins de DURÉE (ex: 10m, fichiers en cours d'écriture)")
+    parser.add_argument('--max-age', type=_parse_age, metavar='DURÉE', help="Ignorer les fichiers modifiés il y a plus de DURÉE (ex: 7d)")
+    parser.add_argument('--no-cache', action='store_true', help="Ne pas utiliser le cache incrémental")
+    parser.add_argument('--invalidate-cache', action='store_true', help="Vider le cache incrémental avant le traitement")
+    parser.add_argument('--plan', metavar='FICHIER', help="Phase plan : écrire les modifications prévues dans FICHIER sans rien modifier")
+    parser.add_argument('--apply-plan', metavar='FICHIER', help="Phase apply : appliquer un fichier de plan (les chemins en argument sont ignorés)")
+    parser.add_argument('--shard', type=_parse_shard, default=(0, 1), metavar='K/N', help="Avec --apply-plan : n'appliquer que la part K sur N du plan")
+    parser.add_argument('--journal', metavar='FICHIER',
+                        help=f"Journal d'annulation commun à toutes les cibles (défaut : {Config.JOURNAL_FILENAME} dans chaque répertoire cible)")
+    parser.add_argument('--no-journal', action='store_true', help="Ne pas enregistrer les dates d'origine dans un journal d'annulation")
+    parser.add_argument('--undo', metavar='FICHIER',
+                        help="Rétablir les dates d'origine enregistrées dans un journal d'annulation (les chemins en argument sont ignorés)")
+    parser.add_argument('--metrics', metavar='FICHIER', help="Exporter les compteurs et temps par étape dans FICHIER en fin d'exécution")
+    parser.add_argument('--metrics-format', choices=('json', 'prometheus'), default='json',
+                        help="Format des mesures : json ou prometheus (collecteur textfile)")
+    parser.add_argument('--watch', action='store_true',
+                        help="Surveiller les répertoires et dater les fichiers au fil de leur arrivée (Ctrl+C pour arrêter)")
+    parser.add_argument('-p', '--processes', type=int, default=0, metavar='N',
+                        help="Mode multi-processus sur N processus (seuls les fichiers non traités sont listés)")
+    return parser
+
+def _target_excluded_paths(target, args):
+    """Fichiers du programme à exclure du parcours d'un répertoire cible (script, cache, journal d'annulation)"""
+    excluded_paths = [__file__] + IncrementalCache.owned_paths(os.path.join(target, Config.CACHE_FILENAME))
+    excluded_paths += UndoJournal.owned_paths(_journal_path(args, target))
+    return excluded_paths
+
+def _iter_target_files(target, args):
+    """Génère les fichiers d'une cible (fichier seul ou répertoire parcouru)"""
+    if os.path.isdir(target):
+        max_depth = args.max_depth if args.recursive else 0
+        excluded_paths = _target_excluded_paths(target, args)
+        return DirectoryScanner(target, max_depth=max_depth, excluded_paths=excluded_paths, scan_filter=args.scan_filter).scan()
+    return iter([target])
+
+def _open_target_cache(target, args):
+    """Ouvre le cache incrémental d'un répertoire cible, ou None s'il est désactivé ou inaccessible"""
+    if args.no_cache or args.dry_run or not Config.CACHE_ENABLED or not os.path.isdir(target):
+        return None
+    try:
+        cache = IncrementalCache(os.path.join(target, Config.CACHE_FILENAME), root=target)
+    except (sqlite3.Error, OSError):
+        return None
+    if args.invalidate_cache:
+        cache.invalidate()
+    return cache
+
+def _journal_path(args, target):
+    """Chemin du journal d'annulation d'une cible : --journal, sinon dans le répertoire cible (ou celui du fichier cible)"""
+    if args.journal:
+        return args.journal
+    directory = target if os.path.isdir(target) else os.path.dirname(target) or os.curdir
+    return os.path.join(directory, Config.JOURNAL_FILENAME)
+
+def _open_journal(args, journal_path):
+    """Ouvre le journal d'annulation, ou None s'il est désactivé : sans --no-journal, aucune écriture sans journal"""
+    if args.no_journal or args.dry_run or not Config.JOURNAL_ENABLED:
+        return None
+    try:
+        return UndoJournal(journal_path)
+    except OSError as error:
+        raise ValueError(f"journal inaccessible : {journal_path} ({error.strerror}), "
+                         f"--journal FICHIER pour l'écrire ailleurs ou --no-journal pour s'en passer") from error
+
+def _run_targets(args, writer, totals, metrics):
+    """Traite les chemins cibles (application directe ou phase plan) et retourne le nombre de chemins introuvables"""
+    missing_paths = 0
+    plan_stream = open(args.plan, 'w', encoding='utf-8') if args.plan else None
+    if plan_stream is not None:
+        TimestampPlan.write_header(plan_stream)
+    # --journal : un seul journal pour toutes les cibles (pas de journal en phase plan, rien n'est écrit)
+    shared_journal = _open_journal(args, args.journal) if args.journal and plan_stream is None else None
+    
+    try:
+        for target in args.paths:
+            if not os.path.exists(target):
+                print(f"Chemin introuvable : {target}", file=sys.stderr)
+                missing_paths += 1
+                continue
+            
+            if args.processes and os.path.isdir(target):
+                _run_sharded_target(target, args, writer, totals, metrics, shared_journal)
+                continue
+            
+            files = _iter_target_files(target, args)
+            if plan_stream is not None:
+                # Phase plan : lecture seule, seules les modifications prévues vont dans le plan
+                processor = AutoProcessor(workers=args.workers, keep_results=False, metrics=metrics)
+                for path, new_date, status, source, stat_result in processor.iter_plan(files):
+                    processor.record_result(path, new_date, status, source)
+                    writer.write(path, new_date, status, source)
+                    if status == FileStatus.PENDING:
+                        TimestampPlan.write_record(plan_stream, path, stat_result, new_date)
+                totals.update(processor.status_counts)
+                continue
+            
+            cache = _open_target_cache(target, args)
+            journal = shared_journal or _open_journal(args, _journal_path(args, target))
+            processor = AutoProcessor(workers=args.workers, cache=cache, dry_run=args.dry_run, keep_results=False,
+                                      metrics=metrics, journal=journal)
+            try:
+                for result in processor.iter_results(files):
+                    processor.record_result(*result)
+                    writer.write(*result)
+            finally:
+                if cache is not None:
+                    cache.close()
+                if journal is not None and journal is not shared_journal:
+                    journal.close()
+            totals.update(processor.status_counts)
+    finally:
+        if plan_stream is not None:
+            plan_stream.close()
+        if shared_journal is not None:
+            shared_journal.close()
+    return missing_paths
+
+def _run_sharded_target(target, args, writer, totals, metrics, shared_journal=None):
+    """Traite un répertoire en mode multi-processus, seuls les fichiers non traités sont écrits en sortie"""
+    excluded_paths = _target_excluded_paths(target, args)
+    # Cache vérifié (version, fuseau, --invalidate-cache) une fois ici, puis ouvert par chaque processus
+    cache = _open_target_cache(target, args)
+    if cache is not None:
+        cache.close()
+    journal = shared_journal or _open_journal(args, _journal_path(args, target))
+    try:
+        if journal is not None:
+            # Parts laissées par une exécution interrompue : plus anciennes que celles de cette exécution
+            journal.merge_parts()
+        processor = ShardedProcessor(processes=args.processes, max_depth=args.max_depth if args.recursive else 0,
+                                     dry_run=args.dry_run, excluded_paths=excluded_paths, metrics=metrics,
+                                     scan_filter=args.scan_filter, cache_path=cache.cache_path if cache is not None else None,
+                                     journal_path=journal.journal_path if journal is not None else None)
+        for summary in processor.run(target):
+            totals.update(summary['counts'])
+            for path, status in summary['unprocessed']:
+                writer.write(path, None, status)
+    finally:
+        if journal is not None:
+            journal.merge_parts()
+            if journal is not shared_journal:
+                journal.close()
+
+def _run_apply_plan(args, writer, totals, metrics):
+    """Phase apply : applique un fichier de plan en flux"""
+    shard_index, shard_count = args.shard
+    # Journal par défaut à côté du plan : les chemins du plan peuvent venir de plusieurs répertoires
+    journal = _open_journal(args, args.journal or os.path.join(os.path.dirname(os.path.abspath(args.apply_plan)),
+                                                               Config.JOURNAL_FILENAME))
+    processor = AutoProcessor(workers=args.workers, dry_run=args.dry_run, keep_results=False, metrics=metrics, journal=journal)
+    try:
+        with open(args.apply_plan, encoding='utf-8') as plan_stream:
+            records = TimestampPlan.read_records(plan_stream, shard_index, shard_count)
+            for result in processor.iter_plan_results(records):
+                processor.record_result(*result)
+                writer.write(*result)
+    finally:
+        if journal is not None:
+            journal.close()
+    totals.update(processor.status_counts)
+
+def _run_undo(args, writer, totals, metrics):
+    """Annulation : rétablit les dates d'origine d'un journal, de la ligne la plus récente à la plus ancienne"""
+    for path, original_date, status, source in UndoJournal.iter_undo(args.undo, args.workers, args.dry_run, metrics):
+        totals[status] += 1
+        writer.write(path, original_date, status, source)
+    # Journal entièrement annulé : renommé pour qu'une exécution suivante reparte d'un journal vide
+    if not args.dry_run and not totals[FileStatus.FAILED]:
+        UndoJournal.mark_undone(args.undo)
+
+def _run_watch(args, writer, totals, metrics):
+    """Mode surveillance : traite les fichiers arrivés dans les répertoires cibles jusqu'à l'interruption"""
+    roots = [target for target in args.paths if os.path.isdir(target)]
+    if len(roots) != len(args.paths):
+        raise ValueError("--watch n'accepte que des répertoires existants")
+    max_depth = args.max_depth if args.recursive else 0
+    
+    # Journal par défaut dans le répertoire surveillé ; avec plusieurs répertoires, il doit être choisi
+    if args.journal is None and len(roots) > 1 and not (args.no_journal or args.dry_run or not Config.JOURNAL_ENABLED):
+        raise ValueError("plusieurs répertoires surveillés : --journal FICHIER ou --no-journal requis")
+    journal_path = args.journal or os.path.join(roots[0], Config.JOURNAL_FILENAME)
+    journal = _open_journal(args, journal_path)
+    
+    watcher = None
+    if InotifyWatcher.available():
+        try:
+            watcher = InotifyWatcher(roots, max_depth, scan_filter=args.scan_filter)
+        except OSError as error:
+            print(f"inotify indisponible ({error.strerror}) : scrutation toutes les {Config.WATCH_POLL_INTERVAL} s", file=sys.stderr)
+    if watcher is None:
+        watcher = PollingWatcher(roots, max_depth, scan_filter=args.scan_filter)
+    
+    processor = AutoProcessor(workers=args.workers, dry_run=args.dry_run, keep_results=False, metrics=metrics, journal=journal)
+    excluded_paths = [__file__] + ([args.output] if args.output else []) + ([args.metrics] if args.metrics else [])
+    excluded_paths += UndoJournal.owned_paths(journal_path)
+    daemon = WatchDaemon(watcher, processor, writer.write, excluded_paths=excluded_paths, scan_filter=args.scan_filter)
+    print(f"Surveillance de {', '.join(roots)} (Ctrl+C pour arrêter)", file=sys.stderr)
+    
+    # SIGTERM (arrêt du service) termine proprement comme Ctrl+C
+    previous_handler = signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        while True:
+            if daemon.run_once():
+                writer.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        watcher.close()
+        if journal is not None:
+            journal.close()
+        totals.update(processor.status_counts)
+
+def run_batch(argv=None):
+    """Point d'entrée du mode batch : traite les cibles et retourne un code de sortie"""
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+    if args.plan and args.apply_plan:
+        parser.error("--plan et --apply-plan sont incompatibles")
+    if args.processes and (args.plan or args.apply_plan):
+        parser.error("--processes est incompatible avec --plan et --apply-plan")
+    if args.watch and (args.plan or args.apply_plan or args.processes):
+        parser.error("--watch est incompatible avec --plan, --apply-plan et --processes")
+    if args.apply_plan and not os.path.isfile(args.apply_plan):
+        parser.error(f"fichier de plan introuvable : {args.apply_plan}")
+    if args.undo and (args.plan or args.apply_plan or args.watch or args.processes):
+        parser.error("--undo est incompatible avec --plan, --apply-plan, --watch et --processes")
+    if args.undo and not os.path.isfile(args.undo):
+        parser.error(f"journal introuvable : {args.undo}")
+    if args.journal and args.no_journal:
+        parser.error("--journal est incompatible avec --no-journal")
+    if args.timezone:
+        try:
+            FileSystemUtils.converter = TimestampConverter(args.timezone)
+        except ValueError as error:
+            parser.error(str(error))
+    # Règles de Config complétées par la ligne de commande, compilées une fois pour tout le parcours
+    args.scan_filter = ScanFilter.from_config(args.include, args.exclude, args.include_ext, args.exclude_ext,
+                                              min_size=args.min_size, max_size=args.max_size,
+                                              min_age=args.min_age, max_age=args.max_age)
+    
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    writer = BatchResultWriter(output, args.format)
+    totals = collections.Counter()
+    metrics = RunMetrics() if args.metrics else None
+    missing_paths = 0
+    
+    try:
+        if args.apply_plan:
+            _run_apply_plan(args, writer, totals, metrics)
+        elif args.undo:
+            _run_undo(args, writer, totals, metrics)
+        elif args.watch:
+            _run_watch(args, writer, totals, metrics)
+        else:
+            missing_paths = _run_targets(args, writer, totals, metrics)
+    except ValueError as error:
+        print(f"Erreur : {error}", file=sys.stderr)
+        return ExitCode.USAGE
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        else:
+            output.flush()
+    
+    # Résumé sur la sortie d'erreur pour ne pas polluer le flux d'enregistrements
+    summary = ", ".join(f"{status}={count}" for status, count in sorted(totals.items()))
+    print(f"{sum(totals.values())} fichiers : {summary or 'aucun'}", file=sys.stderr)
+    if DateTimeParser.registry.hits:
+        hits = ", ".join(f"{name}={count}" for name, count in DateTimeParser.registry.hits.most_common())
+        print(f"Motifs : {hits}", file=sys.stderr)
+    if args.scan_filter is not None and args.scan_filter.skipped:
+        skipped = ", ".join(f"{rule}={count}" for rule, count in args.scan_filter.skipped.most_common())
+        print(f"Filtrés : {skipped}", file=sys.stderr)
+        if metrics is not None:
+            metrics.record_filtered(args.scan_filter.skipped)
+    if metrics is not None:
+        metrics.export(args.metrics, args.metrics_format)
+    
+    if totals[FileStatus.FAILED] or totals[FileStatus.STALE] or missing_paths:
+        return ExitCode.FAILED
+    if not totals:
+        return ExitCode.NO_FILES
+    if totals[FileStatus.NO_DATE]:
+        return ExitCode.UNPROCESSED
+    return ExitCode.SUCCESS
+
+def main(argv=None):
+    """Mode interactif sans argument, mode batch sinon"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        process_directory()
+        return ExitCode.SUCCESS
+    return run_batch(argv)
 
 # ===================================
-# SECTION 12: POINT D'ENTRÉE
+# SECTION 13: POINT D'ENTRÉE
 # ===================================
 
 if __name__ == "__main__":
-    process_directory()
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Benchmark - Débit de l'extraction de date depuis les noms de fichiers
+
+Compare l'ancienne implémentation (re.findall non compilé + strptime) au
+moteur multi-motifs (DateTimeParser.extract_date_from_filename et extract_many),
+en noms par seconde, sur un mélange de noms valides, invalides et sans date.
+Mesure aussi le parsing par groupe (extract_group_date) sur des noms uniques
+et sur des groupes fichier + annexes + rafale partageant un radical.
+
+Usage :
+    python benchmarks/bench_parse.py --names 200000
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_timestamp import DateTimeParser
+
+
+def legacy_extract_date_from_filename(filename):
+    """Implémentation d'origine, conservée comme référence"""
+    number_parts = re.findall(r'\d+', filename)
+
+    date_part = None
+    time_part = None
+
+    for part in number_parts:
+        if len(part) == 8 and part.isdigit():
+            date_part = part
+        elif len(part) == 6 and part.isdigit():
+            time_part = part
+
+    try:
+        if date_part and time_part:
+            return datetime.datetime.strptime(
+                f"{date_part[:4]}-{date_part[4:6]}-{date_part[6:8]} {time_part[:2]}:{time_part[2:4]}:{time_part[4:6]}",
+                "%Y-%m-%d %H:%M:%S"
+            )
+    except ValueError:
+        pass
+
+    return None
+
+
+def generate_names(count, seed=0):
+    """Génère un mélange reproductible de noms de fichiers"""
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.7:
+            names.append(f"IMG_{rng.randint(2000, 2030)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}_"
+                         f"{rng.randint(0, 23):02d}{rng.randint(0, 59):02d}{rng.randint(0, 59):02d}.jpg")
+        elif kind < 0.8:
+            names.append(f"scan_{rng.randint(2000, 2030)}{rng.randint(13, 99)}{rng.randint(1, 28):02d}_123456.pdf")
+        else:
+            names.append(f"document_{i}_copie ({rng.randint(1, 9)}).docx")
+    return names
+
+
+SIDECAR_SUFFIXES = (".jpg", ".jpg.xmp", ".xmp", ".jpg.json", "_BURST001_COVER.jpg", "_BURST002.jpg", " (1).jpg")
+
+
+def generate_groups(count, seed=0):
+    """Génère count noms répartis en groupes radical + annexes + rafale"""
+    stems = [name[:-len(".jpg")] for name in generate_names(-(-count // len(SIDECAR_SUFFIXES)), seed) if name.endswith(".jpg")]
+    return [stem + suffix for stem in stems for suffix in SIDECAR_SUFFIXES][:count]
+
+
+def measure(label, function, names, repeat):
+    """Mesure le meilleur débit sur repeat passages (mémo de groupes vidé avant chaque passage)"""
+    best = None
+    for _ in range(repeat):
+        DateTimeParser.grouper._parse_key.cache_clear()
+        start = time.perf_counter()
+        function(names)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} {best:>9.3f} s {len(names) / best:>14,.0f} noms/s".replace(",", " "))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de l'extraction de date depuis les noms de fichiers")
+    parser.add_argument('--names', type=int, default=200000, help="Nombre de noms générés")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre de passages (le meilleur est retenu)")
+    args = parser.parse_args()
+
+    names = generate_names(args.names)
+
+    # Sur ces noms (au plus un couple date/heure), les deux implémentations doivent donner les mêmes résultats
+    for name in names:
+        assert legacy_extract_date_from_filename(name) == DateTimeParser.extract_date_from_filename(name), name
+
+    print(f"{args.names} noms, Python {sys.version.split()[0]}")
+    before = measure("avant (findall + strptime)", lambda n: [legacy_extract_date_from_filename(x) for x in n], names, args.repeat)
+    after = measure("extract_date_from_filename", lambda n: [DateTimeParser.extract_date_from_filename(x) for x in n], names, args.repeat)
+    batch = measure("extract_many", lambda n: list(DateTimeParser.extract_many(n)), names, args.repeat)
+    print(f"Accélération : {before / after:.1f}x (unitaire), {before / batch:.1f}x (lot)")
+
+    # Le radical d'un groupe donne la même date que chacun de ses membres
+    groups = generate_groups(args.names)
+    for name in groups:
+        assert DateTimeParser.extract_group_date(name) == DateTimeParser.extract_date_from_filename(name), name
+
+    print(f"\nGroupes de {len(SIDECAR_SUFFIXES)} fichiers (annexes et rafales)")
+    unique = measure("extract_group_date (noms uniques)", lambda n: [DateTimeParser.extract_group_date(x) for x in n], names, args.repeat)
+    single = measure("extract_date_from_filename (groupes)", lambda n: [DateTimeParser.extract_date_from_filename(x) for x in n], groups, args.repeat)
+    grouped = measure("extract_group_date (groupes)", lambda n: [DateTimeParser.extract_group_date(x) for x in n], groups, args.repeat)
+    print(f"Groupes : {single / grouped:.1f}x ; surcoût sur noms uniques : {unique / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Benchmark - Suite reproductible par étape (parcours, parsing, écriture, affichage)
+
+Génère une arborescence synthétique dans un répertoire temporaire (nombre de
+fichiers, profondeur, mélange de motifs de noms, part de noms sans date) puis
+chronomètre séparément chaque étape :
+    scan      DirectoryScanner sur toute l'arborescence
+    parse     DateTimeParser.extract_many sur tous les noms
+    apply     FileSystemUtils.set_file_timestamp, séquentiel
+    pipeline  AutoProcessor.iter_results complet (parcours + parsing + écriture, threads)
+    render    barre de progression et encadré de résultats vers un tampon mémoire
+
+Les résultats sont écrits en JSON (commit, version de Python, paramètres,
+durée et débit par étape) pour être comparés d'un commit à l'autre.
+
+Usage :
+    python benchmarks/bench_suite.py --sizes 10000 100000 1000000 --output results.json
+    python benchmarks/bench_suite.py --sizes 10000 --compare results.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_timestamp import (
+    AutoProcessor, BoxRenderer, DateTimeParser, DirectoryScanner, FileSystemUtils,
+    TextFormatter, ThrottledProgressRenderer,
+)
+
+# Gabarits de noms par motif ; les champs sont remplis à partir d'une date aléatoire
+NAME_TEMPLATES = {
+    'date_time': "IMG_{Y}{m}{d}_{H}{M}{S}_{i}.jpg",
+    'iso_separated': "{Y}-{m}-{d}_{H}-{M}-{S}_{i}.mp4",
+    'compact_t': "{Y}{m}{d}T{H}{M}{S}_{i}.heic",
+    'date_time_millis': "PXL_{Y}{m}{d}_{H}{M}{S}{ms}_{i}.jpg",
+    'epoch_millis': "{epoch_ms}_{i}.png",
+}
+DEFAULT_MIX = "date_time=0.6,iso_separated=0.1,compact_t=0.1,date_time_millis=0.15,epoch_millis=0.05"
+EPOCH_2015 = 1420070400
+EPOCH_2025 = 1735689600
+
+
+def parse_mix(value):
+    """Convertit 'motif=poids,motif=poids' en liste de (motif, poids)"""
+    mix = []
+    for item in value.split(','):
+        name, weight = item.split('=')
+        if name not in NAME_TEMPLATES:
+            raise argparse.ArgumentTypeError(f"motif inconnu : {name} (disponibles : {', '.join(NAME_TEMPLATES)})")
+        mix.append((name, float(weight)))
+    return mix
+
+
+def generate_name(rng, mix, unmatched_ratio, index):
+    """Génère un nom de fichier selon le mélange de motifs"""
+    if rng.random() < unmatched_ratio:
+        return f"document_{index}_copie ({rng.randint(1, 9)}).docx"
+    name = rng.choices([n for n, _ in mix], weights=[w for _, w in mix])[0]
+    epoch = rng.randint(EPOCH_2015, EPOCH_2025)
+    date = time.localtime(epoch)
+    return NAME_TEMPLATES[name].format(
+        Y=f"{date.tm_year:04d}", m=f"{date.tm_mon:02d}", d=f"{date.tm_mday:02d}",
+        H=f"{date.tm_hour:02d}", M=f"{date.tm_min:02d}", S=f"{date.tm_sec:02d}",
+        ms=f"{rng.randint(0, 999):03d}", epoch_ms=epoch * 1000 + rng.randint(0, 999), i=index,
+    )
+
+
+def generate_tree(root, file_count, depth, fanout, mix, unmatched_ratio, seed):
+    """Crée file_count fichiers vides répartis dans une arborescence de profondeur depth"""
+    rng = random.Random(seed)
+    directories = [root]
+    level = [root]
+    for _ in range(depth):
+        level = [os.path.join(parent, f"dir_{i}") for parent in level for i in range(fanout)]
+        directories.extend(level)
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+
+    for index in range(file_count):
+        directory = directories[rng.randrange(len(directories))]
+        open(os.path.join(directory, generate_name(rng, mix, unmatched_ratio, index)), 'w').close()
+    return len(directories)
+
+
+def timed(function):
+    """Exécute function et retourne (durée en secondes, résultat)"""
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def run_stages(root, workers):
+    """Chronomètre chaque étape sur l'arborescence générée"""
+    stages = {}
+
+    elapsed, entries = timed(lambda: list(DirectoryScanner(root).scan()))
+    stages['scan'] = (elapsed, len(entries))
+
+    names = [entry.name for entry in entries]
+    elapsed, parsed = timed(lambda: [date for _, date in DateTimeParser.extract_many(names)])
+    stages['parse'] = (elapsed, len(names))
+
+    dated = [(entry.path, date) for entry, date in zip(entries, parsed) if date]
+    elapsed, _ = timed(lambda: [FileSystemUtils.set_file_timestamp(path, date) for path, date in dated])
+    stages['apply'] = (elapsed, len(dated))
+
+    processor = AutoProcessor(workers=workers, skip_unchanged=False, keep_results=False)
+    elapsed, count = timed(lambda: sum(1 for _ in processor.iter_results(DirectoryScanner(root).scan())))
+    stages['pipeline'] = (elapsed, count)
+
+    def render():
+        buffer = io.StringIO()
+        progress = ThrottledProgressRenderer(len(entries), stream=buffer, enabled=True)
+        for index, entry in enumerate(entries, 1):
+            progress.update(index, entry.path)
+        progress.finish(len(entries))
+        with contextlib.redirect_stdout(buffer):
+            BoxRenderer.print_auto_box("FICHIERS TRAITÉS", "green",
+                                       [TextFormatter.format_file_line_with_date(path, date) for path, date in dated])
+    elapsed, _ = timed(render)
+    stages['render'] = (elapsed, len(entries))
+
+    return {
+        name: {'seconds': round(seconds, 6), 'items': items, 'items_per_second': round(items / seconds) if seconds else None}
+        for name, (seconds, items) in stages.items()
+    }
+
+
+def git_commit():
+    """Retourne le commit courant du dépôt, ou None hors d'un dépôt git"""
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(runs, previous_path):
+    """Affiche le rapport de durée par étape par rapport à un fichier de résultats précédent"""
+    with open(previous_path, encoding='utf-8') as stream:
+        previous = {run['files']: run['stages'] for run in json.load(stream)['runs']}
+    for run in runs:
+        if run['files'] not in previous:
+            continue
+        print(f"\nComparaison à {previous_path} ({run['files']} fichiers) :")
+        for name, stage in run['stages'].items():
+            before = previous[run['files']].get(name)
+            if before and stage['seconds']:
+                print(f"  {name:<10} {before['seconds']:>9.3f} s -> {stage['seconds']:>9.3f} s  ({before['seconds'] / stage['seconds']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks par étape sur une arborescence synthétique")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000], help="Nombres de fichiers (ex: 10000 100000 1000000)")
+    parser.add_argument('--depth', type=int, default=2, help="Profondeur de l'arborescence")
+    parser.add_argument('--fanout', type=int, default=4, help="Sous-répertoires par répertoire")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Mélange de motifs (défaut : {DEFAULT_MIX})")
+    parser.add_argument('--unmatched', type=float, default=0.1, help="Part de noms sans date (défaut : 0.1)")
+    parser.add_argument('--workers', type=int, default=8, help="Threads pour l'étape pipeline")
+    parser.add_argument('--seed', type=int, default=0, help="Graine du générateur (reproductibilité)")
+    parser.add_argument('--tmpdir', help="Répertoire où créer l'arborescence (défaut : répertoire temporaire du système)")
+    parser.add_argument('--output', help="Fichier JSON de résultats (défaut : sortie standard)")
+    parser.add_argument('--compare', help="Fichier JSON d'une exécution précédente à comparer")
+    args = parser.parse_args()
+
+    runs = []
+    for size in args.sizes:
+        root = tempfile.mkdtemp(prefix='auto_timestamp_bench_', dir=args.tmpdir)
+        try:
+            generation_seconds, directory_count = timed(
+                lambda: generate_tree(root, size, args.depth, args.fanout, args.mix, args.unmatched, args.seed))
+            print(f"{size} fichiers dans {directory_count} répertoires générés en {generation_seconds:.1f} s", file=sys.stderr)
+            stages = run_stages(root, args.workers)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+        for name, stage in stages.items():
+            print(f"  {name:<10} {stage['seconds']:>9.3f} s {stage['items_per_second'] or 0:>12,} /s".replace(",", " "), file=sys.stderr)
+        runs.append({'files': size, 'directories': directory_count, 'stages': stages})
+
+    results = {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'parameters': {
+            'depth': args.depth, 'fanout': args.fanout, 'mix': dict(args.mix),
+            'unmatched': args.unmatched, 'workers': args.workers, 'seed': args.seed,
+        },
+        'runs': runs,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            json.dump(results, stream, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        print_comparison(runs, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark - Débit de AutoProcessor selon le nombre de threads
+
+Crée des fichiers horodatés dans un répertoire temporaire et mesure le temps
+d'application des timestamps pour chaque nombre de threads demandé.
+L'option --latency ajoute une attente avant chaque écriture pour simuler
+un montage NFS/SMB où chaque os.utime est un aller-retour réseau.
+L'option --journal mesure aussi chaque cas avec le journal d'annulation
+(validation par groupes), pour en vérifier le surcoût.
+
+Usage :
+    python benchmarks/bench_workers.py --files 2000 --latency 0.005 --workers 1 2 4 8 16 32 --journal
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_timestamp import AutoProcessor, FileSystemUtils, UndoJournal
+
+
+def create_files(directory, count):
+    """Crée count fichiers vides dont le nom contient une date et une heure"""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"IMG_2025{1 + i % 12:02d}{1 + i % 28:02d}_{i % 24:02d}{i % 60:02d}{i % 60:02d}_{i}.jpg")
+        open(path, 'w').close()
+        paths.append(path)
+    return paths
+
+
+def simulate_latency(latency):
+    """Remplace set_file_timestamp par une version qui attend latency secondes avant d'écrire"""
+    original = FileSystemUtils.set_file_timestamp
+
+    def slow_set_file_timestamp(filename, new_date, **kwargs):
+        time.sleep(latency)
+        return original(filename, new_date, **kwargs)
+
+    FileSystemUtils.set_file_timestamp = staticmethod(slow_set_file_timestamp)
+
+
+def run(paths, workers, journal_path=None):
+    """Applique les timestamps avec workers threads (journalisés si journal_path) et retourne le temps écoulé"""
+    journal = UndoJournal(journal_path) if journal_path else None
+    processor = AutoProcessor(workers=workers, skip_unchanged=False, journal=journal)
+    start = time.perf_counter()
+    for result in processor.iter_results(paths):
+        processor.record_result(*result)
+    if journal is not None:
+        journal.close()
+    elapsed = time.perf_counter() - start
+    assert len(processor.processed_files) == len(paths)
+    if journal_path:
+        os.remove(journal_path)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de AutoProcessor selon le nombre de threads")
+    parser.add_argument('--files', type=int, default=2000, help="Nombre de fichiers générés")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latence simulée par écriture, en secondes")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32], help="Nombres de threads testés")
+    parser.add_argument('--journal', action='store_true', help="Mesurer aussi chaque cas avec le journal d'annulation")
+    args = parser.parse_args()
+
+    if args.latency:
+        simulate_latency(args.latency)
+
+    with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as journal_directory:
+        paths = create_files(directory, args.files)
+        journal_path = os.path.join(journal_directory, 'journal') if args.journal else None
+        print(f"{args.files} fichiers, latence simulée {args.latency * 1000:.1f} ms, Python {sys.version.split()[0]}")
+        print(f"{'threads':>8} {'temps (s)':>10} {'fichiers/s':>12} {'accélération':>13}" + (f" {'journal (s)':>12} {'surcoût':>8}" if args.journal else ""))
+
+        baseline = None
+        for workers in args.workers:
+            elapsed = run(paths, workers)
+            baseline = baseline or elapsed
+            line = f"{workers:>8} {elapsed:>10.3f} {args.files / elapsed:>12.0f} {baseline / elapsed:>12.1f}x"
+            if journal_path:
+                journaled = run(paths, workers, journal_path)
+                line += f" {journaled:>12.3f} {(journaled / elapsed - 1) * 100:>7.1f}%"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1471 @@
+"""Tests d'auto_timestamp (pytest)"""
+
+import io
+import os
+import sys
+import re
+import csv
+import glob
+import json
+import struct
+import time
+import random
+import asyncio
+import threading
+import collections
+import datetime
+import zoneinfo
+import importlib.util
+
+import pytest
+
+import auto_timestamp
+from auto_timestamp import (
+    Config, DatePatternRegistry, FileStatus, DateSource, RunMetrics, AutoProcessor, MetadataExtractor, FileSystemUtils,
+    FileGrouper, DirectoryScanner, DateTimeParser, ShardedProcessor, UndoJournal, ExitCode,
+    IncrementalCache, ThrottledProgressRenderer, TimestampConverter, BatchResultWriter,
+    TimestampPlan, SystemUtils, PosixBackend, WindowsBackend, WatchDaemon, PollingWatcher, InotifyWatcher,
+    ManualFileIndex, BoxRenderer, ResultsDisplayManager, ResultStore,
+    GlobSet, ScanFilter, BulkDateRules, ManualProcessor,
+)
+
+
+def make_file(directory, name, content=b'', mtime_ns=None):
+    """Crée un fichier (dates fixées à mtime_ns si fourni) et retourne son chemin"""
+    path = os.path.join(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as stream:
+        stream.write(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def make_directory(tmp_path, name, filenames, mtime_ns=10**18):
+    """Crée un répertoire de fichiers vides aux dates fixées et retourne son chemin"""
+    directory = str(tmp_path / name)
+    os.makedirs(directory, exist_ok=True)
+    for filename in filenames:
+        make_file(directory, filename, mtime_ns=mtime_ns)
+    return directory
+
+
+def exif_jpeg(date_text):
+    """JPEG minimal : segment APP1 EXIF avec DateTimeOriginal (TIFF petit-boutiste), sans données image"""
+    value = date_text.encode('ascii') + b'\x00'
+    ifd0 = struct.pack('<H', 1) + struct.pack('<HHII', 0x8769, 4, 1, 26) + struct.pack('<I', 0)
+    exif_ifd = struct.pack('<H', 1) + struct.pack('<HHII', 0x9003, 2, len(value), 44) + struct.pack('<I', 0)
+    tiff = b'II' + struct.pack('<HI', 42, 8) + ifd0 + exif_ifd + value
+    return b'\xff\xd8\xff\xe1' + struct.pack('>H', 8 + len(tiff)) + b'Exif\x00\x00' + tiff + b'\xff\xd9'
+
+
+# ===================================
+# Motifs de date et diagnostics d'échec (user-010, user-012)
+# ===================================
+
+@pytest.mark.parametrize('filename, reason', [
+    ('notes.txt', 'no_digits'),
+    ('scan 12.pdf', 'no_pattern'),
+    ('IMG_20250101.jpg', 'date_only'),
+    ('clip_153000.mp4', 'time_only'),
+    ('IMG_20251399_120000.jpg', 'invalid_date'),
+    ('IMG_20250230.jpg 120000', 'invalid_date'),
+])
+def test_miss_reason(filename, reason):
+    registry = DatePatternRegistry(Config.FILENAME_PATTERNS)
+    assert registry.extract(filename) == (None, None)
+    assert registry.miss_reason(filename) == reason
+
+
+def test_metrics_count_date_only_names_separately():
+    metrics = RunMetrics()
+    metrics.observe_file('photos/IMG_20250101.jpg', FileStatus.NO_DATE, 0.001, {})
+    metrics.observe_file('photos/IMG_20251399_120000.jpg', FileStatus.NO_DATE, 0.001, {})
+    assert metrics.misses == {'date_only': 1, 'invalid_date': 1}
+
+
+# ===================================
+# Dates des en-têtes EXIF / QuickTime (user-021)
+# ===================================
+
+def test_metadata_extractor_reads_exif_date(tmp_path):
+    path = make_file(str(tmp_path), 'DSC0001.jpg', exif_jpeg('2024:03:10 14:30:00'))
+    assert MetadataExtractor.extract(path) == (datetime.datetime(2024, 3, 10, 14, 30), DateSource.EXIF)
+
+
+@pytest.mark.parametrize('noatime', [True, False])
+def test_metadata_dated_files_are_matched_on_rerun(tmp_path, monkeypatch, noatime):
+    if not noatime:
+        # Plateformes sans O_NOATIME : la date d'accès d'avant la lecture est rétablie
+        monkeypatch.setattr(MetadataExtractor, 'NOATIME_FLAG', 0)
+    path = make_file(str(tmp_path), 'DSC0001.jpg', exif_jpeg('2024:03:10 14:30:00'))
+    
+    statuses = []
+    for _ in range(3):
+        processor = AutoProcessor(workers=1, keep_results=False)
+        statuses.append(processor._compute_file(path)[2])
+    assert statuses == [FileStatus.CHANGED, FileStatus.MATCHED, FileStatus.MATCHED]
+    expected_ns = FileSystemUtils.to_ns(datetime.datetime(2024, 3, 10, 14, 30))
+    assert os.stat(path).st_atime_ns == expected_ns
+
+
+def test_metadata_stat_is_taken_before_header_read(tmp_path, monkeypatch):
+    path = make_file(str(tmp_path), 'DSC0002.jpg', exif_jpeg('2024:03:10 14:30:00'), mtime_ns=10**18)
+    original = os.stat(path)
+    seen = []
+    extract = MetadataExtractor.extract
+    
+    def touching_extract(filename, stat_result=None):
+        seen.append(stat_result)
+        # Lecture qui déplace la date d'accès (relatime sans O_NOATIME)
+        os.utime(path, ns=(original.st_atime_ns + 10**9, original.st_mtime_ns))
+        return extract(filename, stat_result)
+    monkeypatch.setattr(MetadataExtractor, 'extract', staticmethod(touching_extract))
+    
+    appended = []
+    
+    class Journal:
+        def append(self, path, stat_result, applied_ns):
+            appended.append(stat_result.st_atime_ns)
+    
+    processor = AutoProcessor(workers=1, keep_results=False, journal=Journal())
+    assert processor._compute_file(path)[2] == FileStatus.CHANGED
+    assert seen[0].st_atime_ns == original.st_atime_ns
+    assert appended == [original.st_atime_ns]
+
+
+# ===================================
+# Regroupement par radical (user-015)
+# ===================================
+
+@pytest.mark.parametrize('filename, key', [
+    ('X_20251011_153000.jpg', 'X_20251011_153000'),
+    ('X_20251011_153000.jpg.json', 'X_20251011_153000'),
+    ('X_20251011_153000.jpg.supplemental-metadata.json', 'X_20251011_153000'),
+    ('X_20251011_153000_BURST002_COVER.jpg', 'X_20251011_153000'),
+    ('X_20251011_153000 (1).jpg', 'X_20251011_153000'),
+    ('DSC0001.xmp', 'DSC0001'),
+    ('archive.2024', 'archive.2024'),
+    ('DSC0001.JPG.XMP', 'DSC0001'),
+])
+def test_group_key(filename, key):
+    assert FileGrouper.group_key(filename) == key
+
+
+@pytest.mark.parametrize('filename, other', [
+    ('report.final.pdf', 'report.jpg'),
+    ('Invoice.March.pdf', 'Invoice.pdf'),
+    ('report.final.xmp', 'report.jpg'),
+])
+def test_group_key_keeps_other_dotted_parts(filename, other):
+    assert FileGrouper.group_key(filename) != FileGrouper.group_key(other)
+
+
+def test_unrelated_dotted_name_does_not_take_a_group_date(tmp_path):
+    directory = str(tmp_path)
+    make_file(directory, 'report.jpg', exif_jpeg('2019:05:04 10:11:12'))
+    make_file(directory, 'report.final.pdf', mtime_ns=10**18)
+    results = run_grouped(tmp_path, 1)
+    assert results['report.jpg'][1:] == (FileStatus.CHANGED, DateSource.EXIF)
+    assert results['report.final.pdf'] == (None, FileStatus.NO_DATE, None)
+    assert os.stat(os.path.join(directory, 'report.final.pdf')).st_mtime_ns == 10**18
+
+
+def run_grouped(tmp_path, workers):
+    files = DirectoryScanner(str(tmp_path)).scan()
+    processor = AutoProcessor(workers=workers, keep_results=False, group_by_stem=True)
+    return {os.path.relpath(path, str(tmp_path)): (date, status, source)
+            for path, date, status, source in processor.iter_results(files)}
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_sidecars_take_the_date_of_their_group(tmp_path, workers):
+    directory = str(tmp_path)
+    make_file(directory, 'DSC0001.jpg', exif_jpeg('2024:03:10 14:30:00'))
+    make_file(directory, 'DSC0001.xmp')
+    make_file(directory, 'DSC0001.jpg.json')
+    make_file(directory, 'DSC00010.txt')
+    make_file(directory, 'other/DSC0001.xmp')
+    
+    results = run_grouped(tmp_path, workers)
+    date = datetime.datetime(2024, 3, 10, 14, 30)
+    assert results['DSC0001.jpg'] == (date, FileStatus.CHANGED, DateSource.EXIF)
+    assert results['DSC0001.xmp'] == (date, FileStatus.CHANGED, DateSource.GROUP)
+    assert results['DSC0001.jpg.json'] == (date, FileStatus.CHANGED, DateSource.GROUP)
+    assert results['DSC00010.txt'] == (None, FileStatus.NO_DATE, None)
+    # Un même radical dans un autre répertoire est un autre groupe
+    assert results[os.path.join('other', 'DSC0001.xmp')] == (None, FileStatus.NO_DATE, None)
+    assert os.stat(os.path.join(directory, 'DSC0001.xmp')).st_mtime_ns == FileSystemUtils.to_ns(date)
+    
+    rerun = run_grouped(tmp_path, workers)
+    assert rerun['DSC0001.xmp'] == (date, FileStatus.MATCHED, DateSource.GROUP)
+
+
+def test_result_store_keeps_group_source(tmp_path):
+    directory = str(tmp_path)
+    make_file(directory, 'DSC0001.jpg', exif_jpeg('2024:03:10 14:30:00'))
+    make_file(directory, 'DSC0001.xmp')
+    processor = AutoProcessor(group_by_stem=True)
+    processor.process_files_with_progress(DirectoryScanner(directory).scan())
+    sources = {os.path.basename(path): source for path, _, _, source in processor.processed_files.records()}
+    assert sources == {'DSC0001.jpg': DateSource.EXIF, 'DSC0001.xmp': DateSource.GROUP}
+
+
+def test_grouped_rerun_with_cache_skips_parsing(tmp_path):
+    directory = str(tmp_path / 'photos')
+    make_file(directory, 'DSC0001.jpg', exif_jpeg('2024:03:10 14:30:00'))
+    make_file(directory, 'DSC0001.xmp')
+    make_file(directory, 'IMG_20250101_120000.jpg')
+    cache_path = str(tmp_path / 'cache.sqlite')
+    
+    def run():
+        with IncrementalCache(cache_path, root=directory) as cache:
+            processor = AutoProcessor(workers=2, keep_results=False, group_by_stem=True, cache=cache)
+            return dict((os.path.basename(path), status) for path, _, status, _ in
+                        processor.iter_results(DirectoryScanner(directory).scan()))
+    
+    assert set(run().values()) == {FileStatus.CHANGED}
+    hits = sum(DateTimeParser.registry.hits.values())
+    assert set(run().values()) == {FileStatus.CACHED}
+    assert sum(DateTimeParser.registry.hits.values()) == hits
+
+
+def test_grouped_results_cover_each_file_once(tmp_path):
+    directory = str(tmp_path)
+    for index in range(50):
+        make_file(directory, f'd{index % 3}/IMG_{index:04d}.xmp')
+        make_file(directory, f'd{index % 3}/IMG_{index:04d}_20250101_120000.jpg')
+    metrics = RunMetrics()
+    processor = AutoProcessor(workers=3, keep_results=False, group_by_stem=True, metrics=metrics)
+    paths = [result[0] for result in processor.iter_results(DirectoryScanner(directory).scan())]
+    assert len(paths) == len(set(paths)) == 100
+    assert metrics.files == 100
+
+
+# ===================================
+# API asyncio (user-017)
+# ===================================
+
+def test_apply_timestamps_parses_each_name_once(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    paths = [make_file(directory, 'IMG_20250101_120000.jpg'), make_file(directory, 'notes.txt'),
+             make_file(directory, 'DSC0001.jpg', exif_jpeg('2024:03:10 14:30:00'))]
+    parsed = []
+    extract = DateTimeParser.extract_date_from_filename
+    monkeypatch.setattr(DateTimeParser, 'extract_date_from_filename',
+                        staticmethod(lambda name: parsed.append(name) or extract(name)))
+    
+    results = asyncio.run(auto_timestamp.apply_timestamps(paths, concurrency=2, group_by_stem=False))
+    assert [(os.path.basename(path), status, source) for path, _, status, source in results] == [
+        ('IMG_20250101_120000.jpg', FileStatus.CHANGED, DateSource.FILENAME),
+        ('notes.txt', FileStatus.NO_DATE, None),
+        ('DSC0001.jpg', FileStatus.CHANGED, DateSource.EXIF),
+    ]
+    assert sorted(parsed) == sorted(os.path.basename(path) for path in paths)
+
+
+def test_iter_timestamps_stops_early(tmp_path):
+    paths = [make_file(str(tmp_path), f'IMG_20250101_1200{index:02d}.jpg') for index in range(20)]
+    
+    async def first_two():
+        results = []
+        iterator = auto_timestamp.iter_timestamps(paths, concurrency=2)
+        async for result in iterator:
+            results.append(result)
+            if len(results) == 2:
+                break
+        await iterator.aclose()
+        return results
+    
+    assert [result[0] for result in asyncio.run(first_two())] == paths[:2]
+
+
+# ===================================
+# Mode multi-processus (user-009)
+# ===================================
+
+def test_oversized_directory_is_listed_once_and_sliced_by_group(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    for index in range(40):
+        make_file(directory, f'IMG_20250101_12{index:02d}00.jpg')
+        make_file(directory, f'IMG_20250101_12{index:02d}00.jpg.json')
+    options = ShardedProcessor(processes=4, split_threshold=10, dry_run=True).options
+    
+    listed = []
+    iter_directory = DirectoryScanner.iter_directory
+    monkeypatch.setattr(DirectoryScanner, 'iter_directory',
+                        lambda self, *args: listed.append(args[0]) or iter_directory(self, *args))
+    first = ShardedProcessor.process_shard(directory, directory, 0, None, options)
+    slices = first['slices']
+    assert len(slices) == 3
+    others = [ShardedProcessor.process_shard(directory, directory, 0, names, options) for names in slices]
+    assert listed == [directory]
+    
+    assert sum(sum(summary['counts'].values()) for summary in [first] + others) == 80
+    for names in slices:
+        # Un fichier et son annexe sont dans la même tranche
+        listed_names = [name for name, _ in names]
+        assert all(name[:-len('.json')] in listed_names for name in listed_names if name.endswith('.json'))
+
+
+def read_statuses(output_path):
+    with open(output_path, encoding='utf-8') as stream:
+        return collections.Counter(json.loads(line)['status'] for line in stream)
+
+
+def test_processes_mode_uses_cache_and_journal(tmp_path, capsys):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'sub/VID_20240202_101000.mp4', 'notes.txt'])
+    output = str(tmp_path / 'out.jsonl')
+    assert auto_timestamp.run_batch([directory, '-r', '-p', '2', '-o', output]) == ExitCode.UNPROCESSED
+    journal_path = os.path.join(directory, Config.JOURNAL_FILENAME)
+    assert len(list(UndoJournal.read_records_reversed(journal_path))) == 2
+    assert not os.path.exists(UndoJournal.parts_directory(journal_path))
+    
+    capsys.readouterr()
+    auto_timestamp.run_batch([directory, '-r', '-p', '2', '-o', output])
+    assert read_statuses(output) == {FileStatus.NO_DATE: 1}
+    assert "cached=2, no_date=1" in capsys.readouterr().err
+    assert len(list(UndoJournal.read_records_reversed(journal_path))) == 2
+
+
+# ===================================
+# Journal d'annulation et --undo (user-022)
+# ===================================
+
+def test_undo_journal_round_trip(tmp_path):
+    journal_path = str(tmp_path / 'undo.journal')
+    with UndoJournal(journal_path, commit_records=2) as journal:
+        for index in range(5):
+            journal.append(f'file{index}', os.stat(__file__), index)
+    records = list(UndoJournal.read_records_reversed(journal_path, block_size=16))
+    assert [os.path.basename(record[0]) for record in records] == [f'file{index}' for index in reversed(range(5))]
+    assert [record[3] for record in records] == [4, 3, 2, 1, 0]
+
+
+def test_undo_journal_ignores_truncated_last_line(tmp_path):
+    journal_path = str(tmp_path / 'undo.journal')
+    with UndoJournal(journal_path) as journal:
+        journal.append('file', os.stat(__file__), 1)
+    with open(journal_path, 'a', encoding='utf-8') as stream:
+        stream.write('["trunc')
+    assert len(list(UndoJournal.read_records_reversed(journal_path))) == 1
+
+
+def test_undo_restores_original_times(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'VID_20240202_101000.mp4'])
+    original = {name: os.stat(os.path.join(directory, name)).st_mtime_ns for name in os.listdir(directory)}
+    output = str(tmp_path / 'out.jsonl')
+    assert auto_timestamp.run_batch([directory, '-o', output]) == ExitCode.SUCCESS
+    journal_path = os.path.join(directory, Config.JOURNAL_FILENAME)
+    
+    assert auto_timestamp.run_batch(['--undo', journal_path, '-o', output]) == ExitCode.SUCCESS
+    assert read_statuses(output) == {FileStatus.CHANGED: 2}
+    for name, mtime_ns in original.items():
+        assert os.stat(os.path.join(directory, name)).st_mtime_ns == mtime_ns
+    assert not os.path.exists(journal_path)
+    assert os.path.exists(journal_path + '.undone')
+
+
+def test_undo_never_overwrites_an_undone_journal(tmp_path):
+    journal_path = str(tmp_path / 'undo.journal')
+    for _ in range(3):
+        UndoJournal(journal_path).close()
+        UndoJournal.mark_undone(journal_path)
+    assert sorted(os.listdir(str(tmp_path))) == ['undo.journal.undone', 'undo.journal.undone.2', 'undo.journal.undone.3']
+
+
+def test_apply_plan_is_journaled_next_to_the_plan(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg'])
+    plan = str(tmp_path / 'archive.plan')
+    output = str(tmp_path / 'out.jsonl')
+    assert auto_timestamp.run_batch([directory, '--plan', plan, '-o', output]) == ExitCode.SUCCESS
+    assert read_statuses(output) == {FileStatus.PENDING: 1}
+    
+    assert auto_timestamp.run_batch(['--apply-plan', plan, '-o', output]) == ExitCode.SUCCESS
+    assert read_statuses(output) == {FileStatus.CHANGED: 1}
+    records = list(UndoJournal.read_records_reversed(str(tmp_path / Config.JOURNAL_FILENAME)))
+    assert [record[2] for record in records] == [10**18]
+
+
+def test_batch_refuses_to_write_without_journal(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg'])
+    blocked = str(tmp_path / 'missing' / 'undo.journal')
+    output = str(tmp_path / 'out.jsonl')
+    assert auto_timestamp.run_batch([directory, '--journal', blocked, '-o', output]) == ExitCode.USAGE
+    assert os.stat(os.path.join(directory, 'IMG_20250101_120000.jpg')).st_mtime_ns == 10**18
+    
+    other = make_directory(tmp_path, 'other', [])
+    assert auto_timestamp.run_batch([directory, other, '--watch', '-o', output]) == ExitCode.USAGE
+
+
+# ===================================
+# Parcours par os.scandir (user-001)
+# ===================================
+
+def scanned_paths(root, **options):
+    return [os.path.relpath(entry.path, root) for entry in DirectoryScanner(root, **options).scan()]
+
+
+def test_scanner_walks_depth_first_in_name_order(tmp_path):
+    root = make_directory(tmp_path, 'root', ['b.txt', 'a.txt', 'sub/c.txt', 'sub/deeper/d.txt', 'z/e.txt'])
+    assert scanned_paths(root) == ['a.txt', 'b.txt', os.path.join('sub', 'c.txt'),
+                                   os.path.join('sub', 'deeper', 'd.txt'), os.path.join('z', 'e.txt')]
+    assert scanned_paths(root, max_depth=0) == ['a.txt', 'b.txt']
+    assert scanned_paths(root, max_depth=1) == ['a.txt', 'b.txt', os.path.join('sub', 'c.txt'), os.path.join('z', 'e.txt')]
+
+
+def test_scanner_is_lazy(tmp_path):
+    root = make_directory(tmp_path, 'root', [f'{index}.txt' for index in range(5)])
+    files = DirectoryScanner(root).scan()
+    assert next(files).name == '0.txt'
+
+
+def test_scanner_excludes_program_files(tmp_path):
+    root = make_directory(tmp_path, 'root', ['a.txt', Config.CACHE_FILENAME])
+    assert scanned_paths(root, excluded_paths=[os.path.join(root, Config.CACHE_FILENAME)]) == ['a.txt']
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink') or os.name == 'nt', reason="liens symboliques")
+def test_scanner_symlink_policies(tmp_path):
+    root = make_directory(tmp_path, 'root', ['a.txt', 'sub/b.txt'])
+    os.symlink(os.path.join(root, 'a.txt'), os.path.join(root, 'link.txt'))
+    os.symlink(os.path.join(root, 'sub'), os.path.join(root, 'sublink'))
+    os.symlink(root, os.path.join(root, 'sub', 'loop'))
+    
+    assert scanned_paths(root, symlink_policy='skip') == ['a.txt', os.path.join('sub', 'b.txt')]
+    assert scanned_paths(root, symlink_policy='files') == ['a.txt', 'link.txt', os.path.join('sub', 'b.txt')]
+    # 'follow' : les répertoires déjà parcourus (boucles, liens vers un répertoire vu) ne sont pas repris
+    assert sorted(scanned_paths(root, symlink_policy='follow')) == ['a.txt', 'link.txt', os.path.join('sub', 'b.txt')]
+
+
+def test_scanner_rejects_unknown_options(tmp_path):
+    with pytest.raises(ValueError):
+        DirectoryScanner(str(tmp_path), symlink_policy='always')
+    with pytest.raises(ValueError):
+        DirectoryScanner(str(tmp_path), order='size')
+
+
+# ===================================
+# Application parallèle (user-002)
+# ===================================
+
+def test_parallel_results_keep_input_order_with_bounded_queue():
+    processor = AutoProcessor(workers=4, max_in_flight=6, group_by_stem=False)
+    lock = threading.Lock()
+    submitted = []
+    
+    def items():
+        for index in range(40):
+            with lock:
+                submitted.append(index)
+            yield index
+    
+    def slow_square(value):
+        time.sleep(0.001 * (value % 3))
+        return value * value
+    
+    results = []
+    for result in processor._iter_ordered(slow_square, items()):
+        # Au plus max_in_flight tâches en cours, plus l'élément lu en attente de place dans la file
+        assert len(submitted) - len(results) <= 6 + 1
+        results.append(result)
+    assert results == [value * value for value in range(40)]
+
+
+def test_process_files_with_progress_sorts_results(tmp_path, capsys):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'notes.txt', 'IMG_20250102_120000.jpg'])
+    processor = AutoProcessor(workers=3)
+    assert processor.process_files_with_progress(DirectoryScanner(directory).scan()) == 3
+    assert [os.path.basename(path) for path, _ in processor.processed_files] == ['IMG_20250101_120000.jpg',
+                                                                                'IMG_20250102_120000.jpg']
+    assert [os.path.basename(path) for path in processor.unprocessed_files] == ['notes.txt']
+
+
+def test_parallel_early_stop_cancels_pending_tasks():
+    processor = AutoProcessor(workers=2, max_in_flight=4)
+    started = []
+    
+    def record(value):
+        started.append(value)
+        time.sleep(0.01)
+        return value
+    
+    iterator = processor._iter_ordered(record, iter(range(1000)))
+    assert [next(iterator), next(iterator)] == [0, 1]
+    iterator.close()
+    assert len(started) < 10
+
+
+# ===================================
+# Progression limitée dans le temps (user-003)
+# ===================================
+
+class FakeStream(io.StringIO):
+    """Flux mémoire qui se fait passer pour un terminal ou non"""
+    
+    def __init__(self, tty):
+        super().__init__()
+        self.tty = tty
+    
+    def isatty(self):
+        return self.tty
+
+
+def test_progress_redraws_at_most_once_per_interval():
+    stream = FakeStream(tty=True)
+    progress = ThrottledProgressRenderer(total=10000, refresh_rate=1, stream=stream)
+    for current in range(1, 10001):
+        progress.update(current, 'fichier')
+    # Première mise à jour dessinée, les suivantes tombent dans l'intervalle d'une seconde
+    assert stream.getvalue().count('fichiers/s') == 1
+    progress.finish(10000)
+    assert stream.getvalue().count('fichiers/s') == 2
+    assert 'Terminé!' in stream.getvalue()
+
+
+def test_progress_shows_eta_with_known_total():
+    stream = FakeStream(tty=True)
+    progress = ThrottledProgressRenderer(total=100, stream=stream)
+    progress.start_time -= 1.0
+    progress.update(50, 'fichier')
+    assert 'ETA 0:00:01' in stream.getvalue()
+
+
+def test_progress_disabled_when_not_a_tty():
+    stream = FakeStream(tty=False)
+    progress = ThrottledProgressRenderer(total=3, stream=stream)
+    assert not progress.enabled
+    progress.update(1, 'fichier')
+    progress.finish(3)
+    assert stream.getvalue() == ''
+
+
+# ===================================
+# Extraction rapide des dates de nom (user-004)
+# ===================================
+
+@pytest.mark.parametrize('filename, expected', [
+    ('IMG_20250102_030405.jpg', datetime.datetime(2025, 1, 2, 3, 4, 5)),
+    ('PXL_20250102_030405123.jpg', datetime.datetime(2025, 1, 2, 3, 4, 5, 123000)),
+    ('Screenshot 2025-01-02 at 03.04.05.png', None),
+    ('Screenshot 2025-01-02 03.04.05.png', datetime.datetime(2025, 1, 2, 3, 4, 5)),
+    ('20250102T030405.mov', datetime.datetime(2025, 1, 2, 3, 4, 5)),
+    ('20250102030405.jpg', datetime.datetime(2025, 1, 2, 3, 4, 5)),
+    ('VID_20250102_030405 (1).mp4', datetime.datetime(2025, 1, 2, 3, 4, 5)),
+    ('IMG_20250230_030405.jpg', None),
+    ('IMG_20250102_250405.jpg', None),
+    ('120250102_030405.jpg', None),
+])
+def test_extract_date_from_filename(filename, expected):
+    assert DateTimeParser.extract_date_from_filename(filename) == expected
+
+
+def test_extract_falls_back_to_separate_date_and_time():
+    assert DateTimeParser.extract_date_and_source('2025-01-02/IMG 20250102 x 030405.jpg') == (
+        datetime.datetime(2025, 1, 2, 3, 4, 5), 'date+time')
+
+
+def test_extract_many_keeps_order_and_misses():
+    names = ['IMG_20250102_030405.jpg', 'notes.txt', 'IMG_20250103_030405.jpg']
+    assert list(DateTimeParser.extract_many(names)) == [
+        ('IMG_20250102_030405.jpg', datetime.datetime(2025, 1, 2, 3, 4, 5)),
+        ('notes.txt', None),
+        ('IMG_20250103_030405.jpg', datetime.datetime(2025, 1, 3, 3, 4, 5)),
+    ]
+
+
+# ===================================
+# Dates déjà correctes (user-005)
+# ===================================
+
+def test_rerun_skips_files_whose_times_already_match(tmp_path, monkeypatch):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'IMG_20250102_120000.jpg'])
+    first = AutoProcessor()
+    first.process_files_with_progress(DirectoryScanner(directory).scan())
+    assert first.status_counts[FileStatus.CHANGED] == 2
+    
+    writes = []
+    monkeypatch.setattr(os, 'utime', lambda *args, **kwargs: writes.append(args))
+    rerun = AutoProcessor()
+    rerun.process_files_with_progress(DirectoryScanner(directory).scan())
+    assert rerun.status_counts == {FileStatus.MATCHED: 2}
+    assert writes == []
+
+
+def test_timestamp_matches_within_tolerance():
+    date = datetime.datetime(2025, 1, 1, 12, 0, 0)
+    timestamp_ns = FileSystemUtils.to_ns(date)
+    close = os.stat_result((0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, timestamp_ns + 500_000_000,
+                            timestamp_ns - 500_000_000, timestamp_ns))
+    assert FileSystemUtils.timestamp_matches(close, date)
+    assert not FileSystemUtils.timestamp_matches(close, date, tolerance=0.1)
+
+
+def test_skip_unchanged_disabled_always_writes(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg'])
+    AutoProcessor().process_files_with_progress(DirectoryScanner(directory).scan())
+    rerun = AutoProcessor(skip_unchanged=False)
+    rerun.process_files_with_progress(DirectoryScanner(directory).scan())
+    assert rerun.status_counts == {FileStatus.CHANGED: 1}
+
+
+# ===================================
+# Cache incrémental (user-006)
+# ===================================
+
+def run_cached(directory, cache_path, root=None):
+    """Traite un répertoire avec le cache et retourne {nom: statut}"""
+    with IncrementalCache(cache_path, root=root or directory) as cache:
+        processor = AutoProcessor(keep_results=False, cache=cache)
+        return {os.path.basename(path): status for path, _, status, _ in
+                processor.iter_results(DirectoryScanner(root or directory).scan())}
+
+
+def test_cache_skips_unchanged_files_and_retries_modified_ones(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'IMG_20250102_120000.jpg'])
+    cache_path = str(tmp_path / 'cache.sqlite')
+    assert set(run_cached(directory, cache_path).values()) == {FileStatus.CHANGED}
+    
+    with open(os.path.join(directory, 'IMG_20250102_120000.jpg'), 'ab') as stream:
+        stream.write(b'x')
+    assert run_cached(directory, cache_path) == {
+        'IMG_20250101_120000.jpg': FileStatus.CACHED,
+        'IMG_20250102_120000.jpg': FileStatus.CHANGED,
+    }
+
+
+def test_cache_keys_are_relative_to_the_root(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg'])
+    cache_path = str(tmp_path / 'cache.sqlite')
+    run_cached(directory, cache_path)
+    # Même cible désignée par un autre chemin : les entrées restent valides
+    other_form = os.path.join(str(tmp_path), '.', 'photos')
+    assert run_cached(other_form, cache_path) == {'IMG_20250101_120000.jpg': FileStatus.CACHED}
+
+
+def test_cache_evicts_least_recently_seen_entries(tmp_path):
+    cache_path = str(tmp_path / 'cache.sqlite')
+    stat_result = os.stat(str(tmp_path))
+    with IncrementalCache(cache_path, max_entries=2) as cache:
+        cache.record('a', stat_result, stat_result.st_mtime_ns, 0)
+        cache.record('b', stat_result, stat_result.st_mtime_ns, 0)
+    with IncrementalCache(cache_path, max_entries=2) as cache:
+        assert cache.lookup('b', stat_result) is not None
+        cache.record('c', stat_result, stat_result.st_mtime_ns, 0)
+    with IncrementalCache(cache_path, max_entries=2) as cache:
+        assert cache.lookup('a', stat_result) is None
+        assert cache.lookup('b', stat_result) is not None
+        assert cache.lookup('c', stat_result) is not None
+
+
+def test_cache_is_invalidated_by_timezone_change(tmp_path, monkeypatch):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg'])
+    cache_path = str(tmp_path / 'cache.sqlite')
+    monkeypatch.setattr(FileSystemUtils, 'converter', TimestampConverter('UTC'))
+    run_cached(directory, cache_path)
+    monkeypatch.setattr(FileSystemUtils, 'converter', TimestampConverter('+02:00'))
+    assert run_cached(directory, cache_path) == {'IMG_20250101_120000.jpg': FileStatus.CHANGED}
+
+
+def test_cache_is_invalidated_by_pattern_change(tmp_path, monkeypatch):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg'])
+    cache_path = str(tmp_path / 'cache.sqlite')
+    run_cached(directory, cache_path)
+    assert run_cached(directory, cache_path) == {'IMG_20250101_120000.jpg': FileStatus.CACHED}
+    monkeypatch.setattr(DateTimeParser, 'registry', DatePatternRegistry(reversed(Config.FILENAME_PATTERNS)))
+    assert run_cached(directory, cache_path) == {'IMG_20250101_120000.jpg': FileStatus.MATCHED}
+
+
+# ===================================
+# Mode batch (user-007)
+# ===================================
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as stream:
+        return [json.loads(line) for line in stream]
+
+
+def test_batch_streams_jsonl_records(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'sub/IMG_20250102_120000.jpg'])
+    output = str(tmp_path / 'out.jsonl')
+    assert auto_timestamp.run_batch([directory, '-r', '-o', output]) == ExitCode.SUCCESS
+    records = sorted(read_jsonl(output), key=lambda record: record['path'])
+    assert [(os.path.relpath(record['path'], directory), record['status'], record['timestamp'], record['source'])
+            for record in records] == [
+        ('IMG_20250101_120000.jpg', FileStatus.CHANGED, '2025-01-01T12:00:00', DateSource.FILENAME),
+        (os.path.join('sub', 'IMG_20250102_120000.jpg'), FileStatus.CHANGED, '2025-01-02T12:00:00', DateSource.FILENAME),
+    ]
+    # Le cache et le journal créés dans la cible ne sont pas traités comme des fichiers
+    assert auto_timestamp.run_batch([directory, '-r', '-o', output]) == ExitCode.SUCCESS
+    assert {record['status'] for record in read_jsonl(output)} == {FileStatus.CACHED}
+
+
+def test_batch_csv_output_and_dry_run(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg'])
+    output = str(tmp_path / 'out.csv')
+    assert auto_timestamp.run_batch([directory, '-n', '-f', 'csv', '-o', output]) == ExitCode.SUCCESS
+    with open(output, encoding='utf-8') as stream:
+        rows = list(csv.reader(stream))
+    assert rows[0] == list(BatchResultWriter.CSV_FIELDS)
+    assert rows[1][1:] == [FileStatus.PENDING, '2025-01-01T12:00:00', DateSource.FILENAME]
+    assert os.stat(os.path.join(directory, 'IMG_20250101_120000.jpg')).st_mtime_ns == 10**18
+
+
+@pytest.mark.parametrize('filenames, extra, code', [
+    (['IMG_20250101_120000.jpg', 'notes.txt'], [], ExitCode.UNPROCESSED),
+    ([], [], ExitCode.NO_FILES),
+    (['IMG_20250101_120000.jpg'], ['missing'], ExitCode.FAILED),
+])
+def test_batch_exit_codes(tmp_path, filenames, extra, code):
+    directory = make_directory(tmp_path, 'photos', filenames)
+    paths = [directory] + [str(tmp_path / name) for name in extra]
+    assert auto_timestamp.run_batch(paths + ['-o', str(tmp_path / 'out.jsonl')]) == code
+
+
+def test_main_without_arguments_is_interactive(monkeypatch):
+    calls = []
+    monkeypatch.setattr(auto_timestamp, 'process_directory', lambda: calls.append(True))
+    assert auto_timestamp.main([]) == ExitCode.SUCCESS
+    assert calls == [True]
+
+
+# ===================================
+# Phases plan et apply (user-008)
+# ===================================
+
+def test_plan_records_current_times_and_aware_target(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileSystemUtils, 'converter', TimestampConverter('+02:00'))
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'notes.txt'])
+    plan = str(tmp_path / 'archive.plan')
+    assert auto_timestamp.run_batch([directory, '--plan', plan, '-o', str(tmp_path / 'out.jsonl')]) == ExitCode.UNPROCESSED
+    with open(plan, encoding='utf-8') as stream:
+        assert json.loads(stream.readline()) == {'format': TimestampPlan.FORMAT_NAME, 'version': TimestampPlan.VERSION}
+        stream.seek(0)
+        records = list(TimestampPlan.read_records(stream))
+    path = os.path.join(directory, 'IMG_20250101_120000.jpg')
+    assert records == [(path, 10**18, 10**18, datetime.datetime.fromisoformat('2025-01-01T12:00:00+02:00'))]
+    # Phase plan en lecture seule
+    assert os.stat(path).st_mtime_ns == 10**18
+    
+    # Plan appliqué à l'identique sur une machine d'un autre fuseau
+    monkeypatch.setattr(FileSystemUtils, 'converter', TimestampConverter('UTC'))
+    assert auto_timestamp.run_batch(['--apply-plan', plan, '--no-journal', '-o', str(tmp_path / 'out.jsonl')]) == ExitCode.SUCCESS
+    assert os.stat(path).st_mtime_ns == FileSystemUtils.to_ns(datetime.datetime(2025, 1, 1, 10, 0, 0))
+
+
+def test_apply_plan_skips_files_modified_since_the_plan(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'IMG_20250102_120000.jpg'])
+    plan = str(tmp_path / 'archive.plan')
+    output = str(tmp_path / 'out.jsonl')
+    auto_timestamp.run_batch([directory, '--plan', plan, '-o', output])
+    modified = os.path.join(directory, 'IMG_20250102_120000.jpg')
+    os.utime(modified, ns=(10**18, 10**18 + 10**9))
+    assert auto_timestamp.run_batch(['--apply-plan', plan, '-o', output]) == ExitCode.FAILED
+    assert {os.path.basename(record['path']): record['status'] for record in read_jsonl(output)} == {
+        'IMG_20250101_120000.jpg': FileStatus.CHANGED,
+        'IMG_20250102_120000.jpg': FileStatus.STALE,
+    }
+    assert os.stat(modified).st_mtime_ns == 10**18 + 10**9
+
+
+def test_plan_shards_partition_the_records(tmp_path):
+    directory = make_directory(tmp_path, 'photos', [f'IMG_2025010{day}_120000.jpg' for day in range(1, 8)])
+    plan = str(tmp_path / 'archive.plan')
+    auto_timestamp.run_batch([directory, '--plan', plan, '-o', str(tmp_path / 'out.jsonl')])
+    shards = []
+    for index in range(3):
+        with open(plan, encoding='utf-8') as stream:
+            shards.append([record[0] for record in TimestampPlan.read_records(stream, index, 3)])
+    assert sorted(sum(shards, [])) == sorted(glob.glob(os.path.join(directory, '*.jpg')))
+    assert [len(shard) for shard in shards] == [3, 2, 2]
+
+
+def test_apply_plan_rejects_invalid_plan(tmp_path):
+    plan = make_file(str(tmp_path), 'bad.plan', b'["x", 0, 0, "2025-01-01T12:00:00"]\n')
+    assert auto_timestamp.run_batch(['--apply-plan', plan, '--no-journal', '-o', str(tmp_path / 'out.jsonl')]) == ExitCode.USAGE
+
+
+# ===================================
+# Registre de motifs (user-010)
+# ===================================
+
+@pytest.mark.parametrize('filename, expected, pattern', [
+    ('IMG_20250101_120000_20250102.jpg', datetime.datetime(2025, 1, 1, 12, 0, 0), 'date_time'),
+    ('2025-10-11_15-30-00.mp4', datetime.datetime(2025, 10, 11, 15, 30, 0), 'iso_separated'),
+    ('20251011T153000.jpg', datetime.datetime(2025, 10, 11, 15, 30, 0), 'compact_t'),
+    ('PXL_20251011_153000123.jpg', datetime.datetime(2025, 10, 11, 15, 30, 0, 123000), 'date_time_millis'),
+    ('IMG_20251011_153000 2025-10-12_15-30-00.jpg', datetime.datetime(2025, 10, 12, 15, 30, 0), 'iso_separated'),
+])
+def test_registry_picks_the_highest_priority_pattern(filename, expected, pattern):
+    registry = DatePatternRegistry(Config.FILENAME_PATTERNS)
+    assert registry.extract(filename) == (expected, pattern)
+    assert registry.hits == {pattern: 1}
+
+
+def test_registry_reads_epoch_milliseconds():
+    registry = DatePatternRegistry(Config.FILENAME_PATTERNS)
+    date, pattern = registry.extract('signal-1735732800000.jpg')
+    assert pattern == 'epoch_millis'
+    assert FileSystemUtils.to_ns(date) == 1735732800000 * 1_000_000
+
+
+def test_registry_register_with_priority():
+    registry = DatePatternRegistry(Config.FILENAME_PATTERNS)
+    generation = registry.generation
+    registry.register('day_first', r'(?P<d>\d{2})\.(?P<m>\d{2})\.(?P<Y>\d{4}) (?P<H>\d{2})h(?P<M>\d{2})m(?P<S>\d{2})', priority=0)
+    assert registry.pattern_names[0] == 'day_first'
+    assert registry.generation == generation + 1
+    assert registry.extract('11.10.2025 15h30m00.jpg') == (datetime.datetime(2025, 10, 11, 15, 30, 0), 'day_first')
+
+
+@pytest.mark.parametrize('name, regex', [
+    ('date_time', r'(?P<Y>\d{4})(?P<m>\d{2})(?P<d>\d{2})'),
+    ('no_fields', r'\d{8}'),
+    ('broken', r'(?P<Y>\d{4}'),
+])
+def test_registry_rejects_invalid_patterns_without_changing(name, regex):
+    registry = DatePatternRegistry(Config.FILENAME_PATTERNS)
+    names = registry.pattern_names
+    with pytest.raises((ValueError, re.error)):
+        registry.register(name, regex)
+    assert registry.pattern_names == names
+    assert registry.extract('IMG_20250101_120000.jpg')[1] == 'date_time'
+
+
+def test_grouper_memo_follows_registry_changes():
+    registry = DatePatternRegistry(Config.FILENAME_PATTERNS)
+    grouper = FileGrouper(registry)
+    filename = 'note 2025.10.11 15.30.00.txt'
+    assert grouper.extract(filename) == (None, None)
+    registry.register('dotted', r'(?P<Y>\d{4})\.(?P<m>\d{2})\.(?P<d>\d{2}) (?P<H>\d{2})\.(?P<M>\d{2})\.(?P<S>\d{2})')
+    assert grouper.extract(filename) == (datetime.datetime(2025, 10, 11, 15, 30, 0), 'dotted')
+
+
+# ===================================
+# Suite de benchmarks (user-011)
+# ===================================
+
+@pytest.fixture
+def bench_suite():
+    """Module benchmarks/bench_suite.py (hors paquet : chargé par son chemin)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'bench_suite.py')
+    spec = importlib.util.spec_from_file_location('bench_suite', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def tree_names(root):
+    return sorted(os.path.relpath(os.path.join(directory, name), root)
+                  for directory, _, names in os.walk(root) for name in names)
+
+
+def test_bench_generator_is_reproducible(tmp_path, bench_suite):
+    mix = bench_suite.parse_mix(bench_suite.DEFAULT_MIX)
+    for name in ('a', 'b'):
+        assert bench_suite.generate_tree(str(tmp_path / name), 200, 2, 3, mix, 0.25, seed=7) == 1 + 3 + 9
+    assert tree_names(str(tmp_path / 'a')) == tree_names(str(tmp_path / 'b'))
+    assert len(tree_names(str(tmp_path / 'a'))) == 200
+
+
+@pytest.mark.parametrize('pattern', ['date_time', 'iso_separated', 'compact_t', 'date_time_millis', 'epoch_millis'])
+def test_bench_names_match_their_pattern(bench_suite, pattern):
+    rng = random.Random(0)
+    for index in range(50):
+        name = bench_suite.generate_name(rng, [(pattern, 1.0)], 0.0, index)
+        assert DateTimeParser.extract_date_and_source(name)[1] == pattern
+    assert DateTimeParser.extract_date_from_filename(bench_suite.generate_name(rng, [(pattern, 1.0)], 1.0, 0)) is None
+
+
+def test_bench_main_writes_per_stage_results(tmp_path, bench_suite, monkeypatch, capsys):
+    output = str(tmp_path / 'results.json')
+    monkeypatch.setattr(sys, 'argv', ['bench_suite.py', '--sizes', '40', '--depth', '1', '--workers', '2',
+                                      '--tmpdir', str(tmp_path), '--output', output])
+    bench_suite.main()
+    with open(output, encoding='utf-8') as stream:
+        results = json.load(stream)
+    run, = results['runs']
+    assert run['files'] == 40
+    assert set(run['stages']) == {'scan', 'parse', 'apply', 'pipeline', 'render'}
+    assert run['stages']['scan']['items'] == 40
+    # Arborescence temporaire supprimée après la mesure
+    assert os.listdir(str(tmp_path)) == ['results.json']
+
+
+# ===================================
+# Écriture relative aux descripteurs de répertoire (user-013)
+# ===================================
+
+posix_only = pytest.mark.skipif(SystemUtils.backend is not PosixBackend or os.utime not in os.supports_dir_fd,
+                                reason="dir_fd requis")
+
+
+@posix_only
+def test_entries_are_written_relative_to_their_directory_fd(tmp_path, monkeypatch):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'sub/IMG_20250102_120000.jpg'])
+    calls = []
+    utime = os.utime
+    
+    def recording_utime(path, *args, **kwargs):
+        calls.append((path, kwargs.get('dir_fd')))
+        return utime(path, *args, **kwargs)
+    
+    monkeypatch.setattr(os, 'utime', recording_utime)
+    processor = AutoProcessor(keep_results=False, group_by_stem=False)
+    assert {status for _, _, status, _ in processor.iter_results(DirectoryScanner(directory).scan())} == {FileStatus.CHANGED}
+    # Noms seuls (pas de chemin à résoudre), un descripteur par répertoire
+    assert sorted(path for path, _ in calls) == ['IMG_20250101_120000.jpg', 'IMG_20250102_120000.jpg']
+    assert all(dir_fd is not None for _, dir_fd in calls)
+    assert calls[0][1] != calls[1][1]
+
+
+@posix_only
+def test_directory_renamed_after_scan_is_still_written(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg'])
+    entries = list(DirectoryScanner(directory).scan())
+    moved = str(tmp_path / 'moved')
+    os.rename(directory, moved)
+    assert FileSystemUtils.set_entry_timestamp(entries[0], datetime.datetime(2025, 1, 1, 12, 0, 0))
+    assert os.stat(os.path.join(moved, 'IMG_20250101_120000.jpg')).st_mtime_ns == \
+        FileSystemUtils.to_ns(datetime.datetime(2025, 1, 1, 12, 0, 0))
+
+
+@posix_only
+def test_file_replaced_by_symlink_after_scan_does_not_write_the_target(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg'])
+    outside = make_file(str(tmp_path), 'outside.txt', mtime_ns=10**18)
+    entries = list(DirectoryScanner(directory).scan())
+    path = os.path.join(directory, 'IMG_20250101_120000.jpg')
+    os.remove(path)
+    os.symlink(outside, path)
+    FileSystemUtils.set_entry_timestamp(entries[0], datetime.datetime(2025, 1, 1, 12, 0, 0))
+    assert os.stat(outside).st_mtime_ns == 10**18
+
+
+def swap_for_symlink(path, target):
+    """Remplace path (fichier ou répertoire) par un lien symbolique vers target"""
+    if os.path.isdir(path):
+        os.rename(path, path + '.old')
+    else:
+        os.remove(path)
+    os.symlink(target, path)
+
+
+@posix_only
+@pytest.mark.parametrize('names', [None, [('IMG_20000101_000000.jpg', False)]])
+def test_shard_does_not_follow_a_directory_replaced_by_symlink(tmp_path, names):
+    root = make_directory(tmp_path, 'root', ['sub/IMG_20000101_000000.jpg'])
+    outside = make_directory(tmp_path, 'outside', ['IMG_20000101_000000.jpg'])
+    swap_for_symlink(os.path.join(root, 'sub'), outside)
+    options = ShardedProcessor(processes=2).options
+    summary = ShardedProcessor.process_shard(root, os.path.join(root, 'sub'), 1, names, options)
+    assert summary['counts'] == {}
+    assert os.stat(os.path.join(outside, 'IMG_20000101_000000.jpg')).st_mtime_ns == 10**18
+
+
+@posix_only
+def test_shard_slice_writes_through_the_directory_fd(tmp_path):
+    root = make_directory(tmp_path, 'root', ['sub/IMG_20000101_000000.jpg', 'sub/IMG_20000102_000000.jpg'])
+    outside = make_file(str(tmp_path), 'outside.jpg', mtime_ns=10**18)
+    swap_for_symlink(os.path.join(root, 'sub', 'IMG_20000102_000000.jpg'), outside)
+    names = [('IMG_20000101_000000.jpg', False), ('IMG_20000102_000000.jpg', False)]
+    summary = ShardedProcessor.process_shard(root, os.path.join(root, 'sub'), 1, names, ShardedProcessor(processes=2).options)
+    assert summary['counts'][FileStatus.CHANGED] >= 1
+    assert os.stat(os.path.join(root, 'sub', 'IMG_20000101_000000.jpg')).st_mtime_ns == \
+        FileSystemUtils.to_ns(datetime.datetime(2000, 1, 1))
+    # Fichier remplacé par un lien après le listage : la cible n'est pas modifiée
+    assert os.stat(outside).st_mtime_ns == 10**18
+
+
+# ===================================
+# Conversion des dates en nanosecondes (user-014)
+# ===================================
+
+def paris_converter():
+    try:
+        return TimestampConverter('Europe/Paris')
+    except ValueError:
+        pytest.skip("base de fuseaux IANA indisponible")
+
+
+def utc_ns(*fields):
+    return int(datetime.datetime(*fields, tzinfo=datetime.timezone.utc).timestamp()) * 1_000_000_000
+
+
+@pytest.mark.parametrize('timezone, expected', [
+    ('UTC', utc_ns(2025, 1, 1, 12, 0, 0)),
+    ('+02:00', utc_ns(2025, 1, 1, 10, 0, 0)),
+    ('-0530', utc_ns(2025, 1, 1, 17, 30, 0)),
+])
+def test_converter_fixed_offsets(timezone, expected):
+    converter = TimestampConverter(timezone)
+    assert converter.to_ns(datetime.datetime(2025, 1, 1, 12, 0, 0, 123000)) == expected + 123_000_000
+    assert converter.from_ns(expected + 123_000_000) == datetime.datetime(2025, 1, 1, 12, 0, 0, 123000)
+
+
+def test_converter_dst_gap_and_ambiguous_hour():
+    converter = paris_converter()
+    # Heure inexistante (passage à l'heure d'été) : avancée d'une heure, comme datetime
+    assert converter.to_ns(datetime.datetime(2025, 3, 30, 2, 30)) == utc_ns(2025, 3, 30, 1, 30)
+    # Heure ambiguë (retour à l'heure d'hiver) : première occurrence, seconde avec fold=1
+    assert converter.to_ns(datetime.datetime(2025, 10, 26, 2, 30)) == utc_ns(2025, 10, 26, 0, 30)
+    assert converter.to_ns(datetime.datetime(2025, 10, 26, 2, 30, fold=1)) == utc_ns(2025, 10, 26, 1, 30)
+    assert converter.from_ns(utc_ns(2025, 10, 26, 1, 30)).fold == 1
+    assert converter.from_ns(utc_ns(2025, 10, 26, 0, 30)).fold == 0
+
+
+def test_converter_matches_zoneinfo():
+    converter = paris_converter()
+    zone = zoneinfo.ZoneInfo('Europe/Paris')
+    rng = random.Random(0)
+    for _ in range(2000):
+        seconds = rng.randint(utc_ns(1990, 1, 1) // 10**9, utc_ns(2037, 12, 31) // 10**9)
+        local = datetime.datetime.fromtimestamp(seconds, zone).replace(tzinfo=None)
+        assert converter.from_ns(seconds * 10**9).replace(fold=0) == local
+        expected = int(local.replace(tzinfo=zone).timestamp()) * 10**9
+        assert converter.to_ns(local) == expected
+
+
+def test_converter_to_aware_and_unknown_timezone():
+    converter = paris_converter()
+    assert converter.to_aware(datetime.datetime(2025, 7, 1, 12, 0)).isoformat() == '2025-07-01T12:00:00+02:00'
+    assert converter.to_aware(datetime.datetime(2025, 1, 1, 12, 0)).isoformat() == '2025-01-01T12:00:00+01:00'
+    with pytest.raises(ValueError):
+        TimestampConverter('Mars/Olympus_Mons')
+
+
+def test_written_timestamp_keeps_milliseconds(tmp_path):
+    directory = make_directory(tmp_path, 'photos', ['PXL_20250101_120000123.jpg'])
+    AutoProcessor().process_files_with_progress(DirectoryScanner(directory).scan())
+    mtime_ns = os.stat(os.path.join(directory, 'PXL_20250101_120000123.jpg')).st_mtime_ns
+    assert mtime_ns == FileSystemUtils.to_ns(datetime.datetime(2025, 1, 1, 12, 0, 0, 123000))
+    assert mtime_ns % 10**9 == 123_000_000
+
+
+# ===================================
+# Mode surveillance (user-016)
+# ===================================
+
+class FakeWatcher:
+    """Surveillance simulée : chaque appel à read_events rend le lot d'événements suivant"""
+    
+    def __init__(self, roots, events=()):
+        self.roots = list(roots)
+        self.events = collections.deque(events)
+        self.acknowledged = []
+    
+    def read_events(self, timeout):
+        return (self.events.popleft(), False) if self.events else ([], False)
+    
+    def acknowledge(self, paths):
+        self.acknowledged.extend(paths)
+    
+    def rescan(self):
+        return iter(())
+
+
+def make_daemon(directory, events, **options):
+    results = []
+    watcher = FakeWatcher([directory], events)
+    processor = AutoProcessor(keep_results=False)
+    daemon = WatchDaemon(watcher, processor, lambda *result: results.append(result), **options)
+    return daemon, watcher, results
+
+
+def test_watch_debounces_repeated_events(tmp_path):
+    directory = make_directory(tmp_path, 'inbox', ['IMG_20250101_120000.jpg'])
+    path = os.path.join(directory, 'IMG_20250101_120000.jpg')
+    daemon, watcher, results = make_daemon(directory, [[path], [path]], debounce=0.05)
+    daemon.run_once()
+    daemon.run_once()
+    assert daemon.run_once() == 0 and results == []
+    time.sleep(0.06)
+    assert daemon.run_once() == 1
+    assert [(os.path.basename(result[0]), result[2]) for result in results] == [('IMG_20250101_120000.jpg', FileStatus.CHANGED)]
+    assert watcher.acknowledged == [path]
+
+
+def test_watch_processes_small_batches_and_bounds_the_queue(tmp_path):
+    names = [f'IMG_202501{day:02d}_120000.jpg' for day in range(1, 11)]
+    directory = make_directory(tmp_path, 'inbox', names)
+    paths = [os.path.join(directory, name) for name in names]
+    daemon, _, results = make_daemon(directory, [paths], debounce=3600, batch_size=3, max_pending=4)
+    daemon.run_once()
+    # File débordée : les plus anciens partent sans attendre la fin de l'anti-rebond, par lots de batch_size
+    assert daemon.run_once() == 3
+    assert daemon.run_once() == 3
+    assert daemon.run_once() == 0
+    assert [result[0] for result in results] == paths[:6]
+
+
+def test_watch_skips_excluded_and_vanished_files(tmp_path):
+    directory = make_directory(tmp_path, 'inbox', ['IMG_20250101_120000.jpg', 'out.jsonl'])
+    paths = [os.path.join(directory, name) for name in ('IMG_20250101_120000.jpg', 'out.jsonl', 'gone.tmp')]
+    daemon, _, results = make_daemon(directory, [paths], debounce=0, excluded_paths=[paths[1]])
+    daemon.run_once()
+    assert daemon.run_once() == 1
+    assert [os.path.basename(result[0]) for result in results] == ['IMG_20250101_120000.jpg']
+
+
+def test_polling_watcher_reports_new_files_once(tmp_path):
+    directory = make_directory(tmp_path, 'inbox', ['existing.jpg'])
+    watcher = PollingWatcher([directory], interval=0.01)
+    path = make_file(directory, 'IMG_20250101_120000.jpg')
+    assert watcher.read_events(None) == ([path], False)
+    os.utime(path, ns=(10**18, 10**18))
+    watcher.acknowledge([path])
+    assert watcher.read_events(None) == ([], False)
+
+
+@pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify indisponible")
+def test_inotify_watcher_reports_closed_files_and_new_directories(tmp_path):
+    directory = make_directory(tmp_path, 'inbox', [])
+    watcher = InotifyWatcher([directory])
+    try:
+        path = make_file(directory, 'IMG_20250101_120000.jpg')
+        nested = make_file(directory, 'new/IMG_20250102_120000.jpg')
+        paths = []
+        deadline = time.monotonic() + 2
+        while len(set(paths)) < 2 and time.monotonic() < deadline:
+            paths.extend(watcher.read_events(0.1)[0])
+        assert set(paths) == {path, nested}
+    finally:
+        watcher.close()
+
+
+# ===================================
+# Index du mode manuel (user-018)
+# ===================================
+
+@pytest.fixture
+def manual_index():
+    files = [f'scan_{number:03d}.pdf' for number in range(1, 26)] + ['IMG_2025_holiday.jpg', 'Notes.TXT']
+    return ManualFileIndex(files, page_size=10)
+
+
+def test_manual_index_resolves_names_numbers_and_copied_lines(manual_index):
+    assert manual_index.resolve('Notes.TXT') == 27
+    assert manual_index.resolve('3') == 3
+    assert manual_index.resolve('3.') == 3
+    assert manual_index.resolve('│  12. scan_012.pdf') == 12
+    assert manual_index.resolve('99') is None
+    assert manual_index.resolve('²') is None
+    assert manual_index.resolve('1²') is None
+    manual_index.remove(3)
+    assert manual_index.resolve('3') is None
+    assert manual_index.resolve('scan_003.pdf') is None
+    assert len(manual_index) == 26
+
+
+def test_manual_index_paginates_and_keeps_page_in_range(manual_index):
+    assert manual_index.page_count == 3
+    assert manual_index.page_lines()[0] == '   1. scan_001.pdf'
+    manual_index.turn_page(5)
+    assert manual_index.page == 2
+    assert manual_index.page_lines() == ['  21. scan_021.pdf', '  22. scan_022.pdf', '  23. scan_023.pdf', '  24. scan_024.pdf',
+                                         '  25. scan_025.pdf', '  26. IMG_2025_holiday.jpg', '  27. Notes.TXT']
+    for number in range(21, 28):
+        manual_index.remove(number)
+    assert manual_index.page == 1
+
+
+def test_manual_index_filters_by_substring_then_fuzzy(manual_index):
+    manual_index.set_filter('NOTES')
+    assert manual_index.visible_numbers() == [27] and not manual_index.fuzzy
+    manual_index.set_filter('_01')
+    assert manual_index.visible_numbers() == list(range(10, 20))
+    manual_index.remove(12)
+    assert 12 not in manual_index.visible_numbers()
+    manual_index.set_filter('i2025h')
+    assert manual_index.visible_numbers() == [26] and manual_index.fuzzy
+    manual_index.set_filter('')
+    assert manual_index.visible_count == 26
+
+
+def test_manual_exact_name_wins_over_commands(monkeypatch, capsys):
+    answers = iter(['n', '', '=i', '', '/x', '', ''])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    monkeypatch.setattr(SystemUtils, 'clear_screen', lambda: None)
+    processor = ManualProcessor()
+    selected = []
+    monkeypatch.setattr(processor, 'process_file_manually', lambda filename: selected.append(filename) or True)
+    processed, remaining = processor.manual_timestamp_modification(['n', '=i', '/x', 'other.txt'])
+    assert selected == ['n', '=i', '/x']
+    assert remaining == ['other.txt']
+
+
+# ===================================
+# Affichage par blocs et résumé des résultats (user-019)
+# ===================================
+
+class CountingStream(io.StringIO):
+    """Flux mémoire qui compte les appels d'écriture"""
+    
+    writes = 0
+    
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_box_lines_are_written_in_large_chunks(monkeypatch):
+    monkeypatch.setattr(Config, 'RENDER_CHUNK_SIZE', 1000)
+    lines = [f"ligne {index:04d}" for index in range(1000)]
+    stream = CountingStream()
+    BoxRenderer.write_lines(lines, stream)
+    assert stream.getvalue() == "\n".join(lines) + "\n"
+    assert stream.writes == -(-len(stream.getvalue()) // 1000)
+
+
+def dated_files(count, start=datetime.datetime(2025, 1, 1, 12, 0), step=datetime.timedelta(hours=6)):
+    return [(f"IMG_{index:05d}.jpg", start + index * step) for index in range(count)]
+
+
+def test_summary_counts_per_day_and_shows_head_and_tail(monkeypatch):
+    monkeypatch.setattr(Config, 'RESULTS_TOP_N', 2)
+    lines = [line for line, _ in ResultsDisplayManager.summary_lines([(dated_files(12), "green")], 'liste.txt')]
+    assert lines[0] == "12 fichiers traités, répartition par jour :"
+    assert lines[1].split() == ['2025-01-01', '2', 'fichiers']
+    assert lines[2].split() == ['2025-01-02', '4', 'fichiers']
+    assert lines[4].split() == ['2025-01-04', '2', 'fichiers']
+    body = "\n".join(lines)
+    assert 'IMG_00000.jpg' in body and 'IMG_00001.jpg' in body and 'IMG_00011.jpg' in body
+    assert 'IMG_00005.jpg' not in body
+    assert "… 8 autres fichiers …" in body
+    assert lines[-1] == "Liste complète : liste.txt"
+
+
+def test_summary_falls_back_to_months_then_years(monkeypatch):
+    monkeypatch.setattr(Config, 'RESULTS_SUMMARY_ROWS', 5)
+    label, periods = ResultsDisplayManager._period_counts([(dated_files(40, step=datetime.timedelta(days=3)), "green")])
+    assert (label, [period for period, _ in periods]) == ("mois", ['2025-01', '2025-02', '2025-03', '2025-04'])
+    label, periods = ResultsDisplayManager._period_counts([(dated_files(10, step=datetime.timedelta(days=400)), "green")])
+    assert label == "période" and sum(count for _, count in periods) == 10
+
+
+def test_final_results_write_full_listing_for_large_sets(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, 'RESULTS_FULL_LIST_MAX', 20)
+    auto = ResultStore()
+    for path, date in dated_files(30):
+        auto.append(path, date, FileStatus.CHANGED, DateSource.FILENAME)
+    manual = [("scan.pdf", datetime.datetime(2024, 5, 1, 8, 0))]
+    ResultsDisplayManager.show_final_results(auto, manual, ['notes.txt'])
+    output = capsys.readouterr().out
+    assert "31 fichiers traités" in output and 'IMG_00015.jpg' not in output
+    with open(Config.RESULTS_LISTING_FILENAME, encoding='utf-8') as stream:
+        rows = [line.rstrip("\n").split("\t") for line in stream]
+    assert rows[0] == ['statut', 'date', 'origine', 'fichier']
+    assert rows[1] == ['auto', '2025-01-01 12:00:00', DateSource.FILENAME, 'IMG_00000.jpg']
+    assert rows[-2:] == [['manuel', '2024-05-01 08:00:00', '', 'scan.pdf'], ['non traité', '', '', 'notes.txt']]
+
+
+# ===================================
+# Stockage compact des résultats (user-020)
+# ===================================
+
+def sample_results(count):
+    """Résultats variés : répertoires partagés, dates avant 1970 et microsecondes, noms non décodables, sans date"""
+    results = []
+    for index in range(count):
+        path = os.path.join('archive', f'dir_{index % 3}', f'IMG_{index:04d}.jpg' if index % 7 else f'bad_\udcff_{index}.jpg')
+        date = None if index % 5 == 4 else datetime.datetime(1965 + index % 80, 1 + index % 12, 1 + index % 28, 12, 0, 0, index)
+        results.append((path, date, FileStatus.NO_DATE if date is None else FileStatus.CHANGED,
+                        None if date is None else DateSource.FILENAME))
+    return results
+
+
+@pytest.mark.parametrize('spill_threshold', [0, 200])
+def test_result_store_round_trip(spill_threshold):
+    results = sample_results(100)
+    store = ResultStore(spill_threshold=spill_threshold)
+    try:
+        for result in results:
+            store.append(*result)
+        assert bool(store._segments) == bool(spill_threshold)
+        assert len(store) == 100
+        assert list(store.records()) == results
+        assert list(store) == [result[:2] for result in results]
+        assert store[0] == results[0][:2]
+        assert store[-1] == results[-1][:2]
+        assert store[40:43] == [result[:2] for result in results[40:43]]
+        with pytest.raises(IndexError):
+            store[100]
+        assert store.day_counts() == collections.Counter(date.date() for _, date, _, _ in results if date)
+    finally:
+        store.close()
+
+
+def test_undated_result_store_yields_paths():
+    store = ResultStore(dated=False)
+    store.append(os.path.join('a', 'notes.txt'))
+    store.append('top.txt')
+    assert list(store) == [os.path.join('a', 'notes.txt'), 'top.txt']
+    assert store + ['other.txt'] == [os.path.join('a', 'notes.txt'), 'top.txt', 'other.txt']
+
+
+def test_result_store_interns_directories():
+    store = ResultStore()
+    for index in range(1000):
+        store.append(os.path.join('a very long directory name', f'{index}.jpg'), datetime.datetime(2025, 1, 1))
+    assert len(store._directories) == 1
+    assert store.nbytes < 1000 * (ResultStore.ENTRY_BYTES + 8)
+
+
+# ===================================
+# Backend système (user-023)
+# ===================================
+
+def test_backend_is_chosen_once_for_the_platform():
+    assert SystemUtils.backend is (WindowsBackend if os.name == 'nt' else PosixBackend)
+
+
+def test_posix_console_operations_spawn_no_process(monkeypatch, capsys):
+    def no_spawn(*args, **kwargs):
+        raise AssertionError("processus lancé")
+    
+    monkeypatch.setattr(os, 'system', no_spawn)
+    monkeypatch.setattr(SystemUtils, 'backend', PosixBackend)
+    SystemUtils.clear_screen()
+    SystemUtils.maximize_cmd()
+    PosixBackend.prepare_console()
+    assert capsys.readouterr().out == PosixBackend.CLEAR_SEQUENCE
+
+
+@pytest.mark.skipif(SystemUtils.backend is not PosixBackend, reason="backend POSIX")
+def test_posix_backend_sets_times_and_reports_failures(tmp_path):
+    path = make_file(str(tmp_path), 'IMG_20250101_120000.jpg')
+    assert PosixBackend.set_file_times(path, 1_700_000_000_123_456_789)
+    assert os.stat(path).st_mtime_ns == os.stat(path).st_atime_ns == 1_700_000_000_123_456_789
+    assert not PosixBackend.set_file_times(str(tmp_path / 'missing.jpg'), 1_700_000_000_000_000_000)
+    # st_ctime (changement d'inode) n'est pas comparé : les dates restent reconnues comme correctes
+    assert not PosixBackend.SETS_CREATION_TIME
+    assert FileSystemUtils.timestamp_matches(os.stat(path), FileSystemUtils.converter.from_ns(1_700_000_000_123_456_789))
+
+
+# ===================================
+# Filtres d'inclusion / exclusion (user-024)
+# ===================================
+
+def test_glob_set_returns_the_matching_pattern():
+    globs = GlobSet(['*.part', '*.tmp', 'Thumbs.db', '.~lock*', 'IMG_[0-9]*'])
+    assert globs.match('video.mp4.part') == '*.part'
+    assert globs.match('Thumbs.db') == 'Thumbs.db'
+    assert globs.match('.~lock.doc#') == '.~lock*'
+    assert globs.match('IMG_1.jpg') == 'IMG_[0-9]*'
+    assert globs.match('IMG_x.jpg') is None
+    assert globs.match('thumbs.db') is None
+    assert GlobSet(['*.TMP', 'Thumbs.db'], ignore_case=True).match('THUMBS.DB') == 'Thumbs.db'
+    assert GlobSet(['*.TMP'], ignore_case=True).match('a.tmp') == '*.TMP'
+    assert not GlobSet([])
+
+
+def test_scan_filter_prunes_during_the_walk(tmp_path):
+    root = make_directory(tmp_path, 'root', [
+        'IMG_20250101_120000.jpg', 'IMG_20250101_120000.JPG.part', 'notes.txt',
+        '.thumbnails/a.jpg', '.thumbnails/b.jpg', 'keep/IMG_20250102_120000.jpg', 'keep/cache/c.jpg',
+    ])
+    scan_filter = ScanFilter(exclude=['.thumbnails', 'keep/cache'], exclude_extensions=['part'], include_extensions=['jpg'])
+    assert scanned_paths(root, scan_filter=scan_filter) == [
+        'IMG_20250101_120000.jpg', os.path.join('keep', 'IMG_20250102_120000.jpg')]
+    # Un répertoire écarté compte pour un : son contenu n'est jamais lu
+    assert scan_filter.skipped == {'exclude:.thumbnails': 1, 'exclude:keep/cache'.replace('/', os.sep): 1,
+                                   'exclude-ext:.part': 1, 'include': 1}
+
+
+def test_scan_filter_reads_stat_only_for_size_and_age_rules():
+    calls = []
+    
+    def stat():
+        calls.append(True)
+        return os.stat_result((0, 0, 0, 0, 0, 0, 10, 0, int(time.time()) - 3600, 0))
+    
+    assert not ScanFilter(exclude=['*.tmp'], min_size=100).accepts_file('a.tmp', '', stat)
+    assert calls == []
+    size_filter = ScanFilter(min_size=100)
+    assert not size_filter.accepts_file('a.jpg', '', stat)
+    assert size_filter.skipped == {'min-size': 1}
+    assert ScanFilter(max_age=7200).accepts_file('a.jpg', '', stat)
+    assert not ScanFilter(min_age=7200).accepts_file('a.jpg', '', stat)
+    assert len(calls) == 3
+
+
+def test_batch_reports_filtered_counts(tmp_path, capsys):
+    directory = make_directory(tmp_path, 'photos', ['IMG_20250101_120000.jpg', 'IMG_20250101_120000.jpg.part', 'Thumbs.db',
+                                                    'IMG_20250102_120000.mov'])
+    output = str(tmp_path / 'out.jsonl')
+    # Règles par défaut de Config (téléchargements partiels, fichiers système) complétées par la ligne de commande
+    assert auto_timestamp.run_batch([directory, '--exclude-ext', 'mov', '-o', output]) == ExitCode.SUCCESS
+    assert read_statuses(output) == {FileStatus.CHANGED: 1}
+    filtered = next(line for line in capsys.readouterr().err.splitlines() if line.startswith('Filtrés : '))
+    assert sorted(filtered[len('Filtrés : '):].split(', ')) == ['exclude-ext:.mov=1', 'exclude-ext:.part=1', 'exclude:Thumbs.db=1']
+    assert sorted(ScanFilter.from_config(exclude_extensions=['mov']).spec['exclude_extensions']) == ['crdownload', 'mov', 'part', 'tmp']
+
+
+def test_scan_filter_is_disabled_without_rules(monkeypatch):
+    for name in ('SCAN_INCLUDE', 'SCAN_EXCLUDE', 'SCAN_INCLUDE_EXTENSIONS', 'SCAN_EXCLUDE_EXTENSIONS'):
+        monkeypatch.setattr(Config, name, ())
+    assert ScanFilter.from_config() is None
+    assert ScanFilter.from_config(min_size=1).spec['min_size'] == 1
+
+
+# ===================================
+# Règles d'attribution en lot (user-025)
+# ===================================
+
+def test_interpolation_spreads_dates_between_neighbours_in_natural_order():
+    anchors = [(os.path.join('a', 'IMG_2.jpg'), datetime.datetime(2025, 1, 1, 12, 0)),
+               (os.path.join('a', 'IMG_10.jpg'), datetime.datetime(2025, 1, 1, 12, 30)),
+               (os.path.join('b', 'IMG_1.jpg'), datetime.datetime(2024, 1, 1))]
+    rules = BulkDateRules(anchors)
+    paths = [os.path.join('a', name) for name in ('IMG_1.jpg', 'IMG_3.jpg', 'IMG_9.jpg', 'IMG_11.jpg')]
+    assert dict(rules.interpolate(paths + [os.path.join('c', 'IMG_5.jpg')])) == {
+        paths[0]: datetime.datetime(2025, 1, 1, 12, 0),
+        paths[1]: datetime.datetime(2025, 1, 1, 12, 10),
+        paths[2]: datetime.datetime(2025, 1, 1, 12, 20),
+        paths[3]: datetime.datetime(2025, 1, 1, 12, 30),
+    }
+
+
+def test_parent_directory_dates():
+    rules = BulkDateRules()
+    paths = [os.path.join('2025-08-24 mariage', 'scan.pdf'), os.path.join('trip_20240102_153000', 'day', 'a.jpg'),
+             os.path.join('misc', 'b.jpg'), os.path.join('20251399', 'c.jpg')]
+    assert dict(rules.parent_directory(paths)) == {
+        paths[0]: datetime.datetime(2025, 8, 24, *Config.MANUAL_RULE_TIME),
+        paths[1]: datetime.datetime(2024, 1, 2, 15, 30, 0),
+    }
+
+
+def test_glob_rule_matches_names_or_relative_paths():
+    paths = ['scan.PDF', os.path.join('docs', 'a.pdf'), os.path.join('docs', 'a.txt'), os.path.join('other', 'b.pdf')]
+    date = datetime.datetime(2025, 8, 24, 17, 36)
+    assert [path for path, _ in BulkDateRules.glob(paths, '*.pdf', date)] == [paths[0], paths[1], paths[3]]
+    assert [path for path, _ in BulkDateRules.glob(paths, 'docs/*', date)] == [paths[1], paths[2]]
+
+
+def test_manual_rules_preview_then_apply_in_one_batch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_directory(tmp_path, '2025-08-24', ['scan_1.pdf', 'scan_2.pdf', 'notes.txt'])
+    files = [os.path.join('2025-08-24', name) for name in ('scan_1.pdf', 'scan_2.pdf', 'notes.txt')]
+    journal = UndoJournal(str(tmp_path / 'undo.journal'))
+    processor = ManualProcessor(journal=journal)
+    index = ManualFileIndex(files)
+    
+    label, proposals = processor.propose_dates('g *.pdf 24/08/2025 17:36', files)
+    assert label == f"{BulkDateRules.GLOB} *.pdf"
+    assert proposals == dict.fromkeys(files[:2], datetime.datetime(2025, 8, 24, 17, 36))
+    # L'aperçu n'écrit rien
+    assert os.stat(files[0]).st_mtime_ns == 10**18
+    
+    assert processor.apply_dates(index, [1, 2], proposals) == (2, 0)
+    journal.close()
+    assert index.remaining() == [files[2]]
+    assert os.stat(files[0]).st_mtime_ns == FileSystemUtils.to_ns(datetime.datetime(2025, 8, 24, 17, 36))
+    assert [source for _, _, _, source in processor.processed_files.records()] == [DateSource.RULE] * 2
+    assert len(list(UndoJournal.read_records_reversed(str(tmp_path / 'undo.journal')))) == 2
+    
+    label, proposals = processor.propose_dates('d', index.remaining())
+    assert (label, proposals) == (BulkDateRules.DIRECTORY, {files[2]: datetime.datetime(2025, 8, 24, *Config.MANUAL_RULE_TIME)})
+    with pytest.raises(ValueError):
+        processor.propose_dates('g *.pdf', files)